@@ -1,7 +1,8 @@
 from django.urls import path
 
-from apps.audit.api.views import AuditLogListView
+from apps.audit.api.views import AuditLogExportView, AuditLogListView
 
 urlpatterns = [
     path("logs/", AuditLogListView.as_view(), name="audit-logs"),
+    path("logs/export/", AuditLogExportView.as_view(), name="audit-logs-export"),
 ]
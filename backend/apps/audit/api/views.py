@@ -1,14 +1,60 @@
-from rest_framework.generics import ListAPIView
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView, ListAPIView
 
 from apps.audit.api.serializers import AuditLogSerializer
 from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_export_service import CONTENT_TYPES, AuditExportService
+from apps.common.pagination import KeysetPagination
 from apps.common.permissions import IsAdmin
 
+# ?timestamp__gte=…&timestamp__lt=… select a time range
+AUDIT_LOG_FILTERS = {
+    "action": ["exact"],
+    "resource_type": ["exact"],
+    "user_id": ["exact"],
+    "timestamp": ["gte", "lt"],
+}
+
 
 class AuditLogListView(ListAPIView):
-    """Read-only list of audit logs. Admin access only."""
+    """
+    Read-only list of audit logs, newest first. Admin access only.
+    Keyset-paginated on (timestamp, id): no COUNT, no OFFSET scans.
+    """
 
     serializer_class = AuditLogSerializer
     permission_classes = [IsAdmin]
     queryset = AuditLog.objects.all()
-    filterset_fields = ["action", "resource_type", "user_id"]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-timestamp", "-id")
+    filterset_fields = AUDIT_LOG_FILTERS
+
+
+class AuditLogExportView(GenericAPIView):
+    """
+    Stream the filtered audit logs, oldest first, as NDJSON (default) or
+    CSV (``?output=csv``). Admin access only.
+    """
+
+    permission_classes = [IsAdmin]
+    queryset = AuditLog.objects.all()
+    pagination_class = None
+    filterset_fields = AUDIT_LOG_FILTERS
+
+    def get(self, request):
+        output = request.query_params.get("output", "ndjson")
+        if output not in CONTENT_TYPES:
+            raise ValidationError(
+                {"output": [f"Must be one of: {', '.join(CONTENT_TYPES)}."]}
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(
+            AuditExportService.stream(queryset, output),
+            content_type=CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="audit_logs.{output}"'
+        # Stop nginx-style proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
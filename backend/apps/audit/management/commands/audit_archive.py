@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from apps.audit.services.audit_partition_service import AuditPartitionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive audit log months older than the retention period to gzip JSONL "
+        "and drop them from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=None,
+            help="Months to keep in the database (default: AUDIT_RETENTION_MONTHS).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the months that would be archived without touching them.",
+        )
+
+    def handle(self, *args, **options):
+        created = AuditPartitionService.ensure_partitions()
+        if created:
+            self.stdout.write(f"Created partitions: {', '.join(created)}")
+
+        expired = AuditPartitionService.expired(options["retention_months"])
+        if not expired:
+            self.stdout.write("Nothing to archive.")
+            return
+
+        for partition in expired:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {partition.name}")
+                continue
+            entry = AuditPartitionService.archive(partition)
+            self.stdout.write(
+                f"Archived {partition.name}: {entry['rows']} rows, "
+                f"{entry['bytes']} bytes -> {entry['file']}"
+            )
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Archived {len(expired)} month(s)."))
@@ -0,0 +1,94 @@
+import os
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.audit.services.audit_chain_service import AuditChainService
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it
+    if not apps.ready:
+        django.setup()
+
+
+def _parse_moment(value: str):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Not a date or datetime: {value!r}")
+        moment = datetime(day.year, day.month, day.day)
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verify the audit log hash chain and Merkle checkpoints, rehashing "
+        "checkpointed blocks in parallel, and report throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since", help="Only blocks with entries at or after this date/datetime."
+        )
+        parser.add_argument(
+            "--until", help="Only blocks with entries before this date/datetime."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (1 = verify in this process).",
+        )
+
+    def handle(self, *args, **options):
+        since = _parse_moment(options["since"]) if options["since"] else None
+        until = _parse_moment(options["until"]) if options["until"] else None
+        workers = max(1, options["workers"])
+
+        started = time.monotonic()
+        segments, errors = AuditChainService.plan(since, until)
+        if workers == 1 or len(segments) < 2:
+            results = [
+                AuditChainService.verify_segment(segment) for segment in segments
+            ]
+        else:
+            # Workers open their own connections; don't hand them ours
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker
+            ) as pool:
+                results = list(
+                    pool.map(AuditChainService.verify_segment, segments, chunksize=4)
+                )
+        elapsed = time.monotonic() - started
+
+        counts = {"ok": 0, "partial": 0, "archived": 0, "failed": 0}
+        rows = 0
+        for result in results:
+            counts[result["status"]] += 1
+            rows += result["rows"]
+            errors.extend(result["errors"])
+        for error in errors:
+            self.stderr.write(error)
+
+        self.stdout.write(
+            f"Verified {rows} entries in {len(results)} blocks in {elapsed:.2f}s "
+            f"({rows / elapsed if elapsed else 0:,.0f} entries/s, "
+            f"{workers} worker(s)): "
+            f"{counts['ok']} ok, {counts['partial']} partly archived, "
+            f"{counts['archived']} archived, {counts['failed']} failed"
+        )
+        if errors:
+            raise CommandError(
+                f"Audit chain verification failed ({len(errors)} problem(s))."
+            )
+        self.stdout.write(self.style.SUCCESS("Audit chain intact."))
@@ -0,0 +1,12 @@
+from apps.audit.services.audit_writer import AuditWriter
+
+
+class AuditBufferMiddleware:
+    """Write the audit entries a request records in one batch when it finishes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with AuditWriter.buffered():
+            return self.get_response(request)
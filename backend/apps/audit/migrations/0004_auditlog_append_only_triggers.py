@@ -0,0 +1,75 @@
+"""
+Database-level immutability for audit_logs.
+
+Row triggers reject UPDATE and DELETE for every role, including the
+table owner the application connects as, so the log stays append-only
+even for raw SQL or QuerySet.update(). TRUNCATE stays available as the
+explicit maintenance path (test database flushes, partition archival).
+
+SQLite only gets the UPDATE trigger: its flush (tests, ``manage.py
+flush``) is a plain DELETE. Other backends keep the ORM-level
+protection only.
+"""
+
+from django.db import migrations
+
+POSTGRES_FORWARD = """
+CREATE OR REPLACE FUNCTION audit_logs_append_only() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'audit_logs is append-only (% rejected)', TG_OP
+        USING ERRCODE = 'insufficient_privilege';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER audit_logs_no_update_delete
+    BEFORE UPDATE OR DELETE ON audit_logs
+    FOR EACH ROW EXECUTE FUNCTION audit_logs_append_only();
+"""
+
+POSTGRES_REVERSE = """
+DROP TRIGGER IF EXISTS audit_logs_no_update_delete ON audit_logs;
+DROP FUNCTION IF EXISTS audit_logs_append_only();
+"""
+
+SQLITE_FORWARD = [
+    """
+    CREATE TRIGGER IF NOT EXISTS audit_logs_no_update
+    BEFORE UPDATE ON audit_logs
+    BEGIN
+        SELECT RAISE(ABORT, 'audit_logs is append-only (UPDATE rejected)');
+    END;
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS audit_logs_no_update;",
+]
+
+
+def _run(schema_editor, postgres, sqlite):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        # No params: "%" in the function body is not a placeholder
+        schema_editor.execute(postgres, params=None)
+    elif vendor == "sqlite":
+        for statement in sqlite:
+            schema_editor.execute(statement, params=None)
+
+
+def add_triggers(apps, schema_editor):
+    _run(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_triggers(apps, schema_editor):
+    _run(schema_editor, POSTGRES_REVERSE, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_auditlog_timestamp_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_triggers, drop_triggers),
+    ]
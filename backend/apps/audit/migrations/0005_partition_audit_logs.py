@@ -0,0 +1,114 @@
+"""
+Monthly range partitioning of audit_logs on PostgreSQL.
+
+The table is rebuilt as ``PARTITION BY RANGE (timestamp)`` with one
+partition per month (``audit_logs_pYYYYMM``) from the oldest row to a
+few months ahead, plus ``audit_logs_default`` for anything outside them.
+Rows, indexes (under their Django names) and the append-only trigger
+are carried over. A partitioned table's primary key must contain the
+partition key, so the database key becomes ``(id, timestamp)``; Django
+still addresses rows by ``id``.
+
+Later months are created by AuditPartitionService.ensure_partitions().
+Other backends keep a single table (see AuditPartitionService).
+"""
+
+from datetime import date
+
+from django.db import migrations
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _index_definitions(cursor, table: str) -> list[tuple[str, str]]:
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s AND indexname <> %s",
+        [table, f"{table}_pkey"],
+    )
+    return cursor.fetchall()
+
+
+def partition_audit_logs(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes = _index_definitions(cursor, "audit_logs")
+        cursor.execute("SELECT min(timestamp)::date FROM audit_logs")
+        oldest = cursor.fetchone()[0]
+        cursor.execute("SELECT current_date")
+        today = cursor.fetchone()[0]
+
+    start = (oldest or today).replace(day=1)
+    end = _add_months(today.replace(day=1), MONTHS_AHEAD + 1)
+
+    statements = [
+        "DROP TRIGGER IF EXISTS audit_logs_no_update_delete ON audit_logs",
+        "ALTER TABLE audit_logs RENAME TO audit_logs_legacy",
+        "ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey",
+        *(f'DROP INDEX "{name}"' for name, _ in indexes),
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        'PARTITION BY RANGE ("timestamp")',
+        'ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, "timestamp")',
+        "CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT",
+    ]
+    month = start
+    while month < end:
+        following = _add_months(month, 1)
+        statements.append(
+            f"CREATE TABLE audit_logs_p{month:%Y%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{following.isoformat()} 00:00+00')"
+        )
+        month = following
+    statements += [
+        # Created on the parent, so every partition (present and future) gets them
+        *(definition for _, definition in indexes),
+        "INSERT INTO audit_logs SELECT * FROM audit_logs_legacy",
+        "DROP TABLE audit_logs_legacy",
+        "CREATE TRIGGER audit_logs_no_update_delete BEFORE UPDATE OR DELETE ON audit_logs "
+        "FOR EACH ROW EXECUTE FUNCTION audit_logs_append_only()",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+def unpartition_audit_logs(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        indexes = _index_definitions(cursor, "audit_logs")
+
+    statements = [
+        "DROP TRIGGER IF EXISTS audit_logs_no_update_delete ON audit_logs",
+        "ALTER TABLE audit_logs RENAME TO audit_logs_partitioned",
+        "ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey "
+        "TO audit_logs_partitioned_pkey",
+        *(f'DROP INDEX "{name}"' for name, _ in indexes),
+        "CREATE TABLE audit_logs (LIKE audit_logs_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id)",
+        *(definition for _, definition in indexes),
+        "INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned",
+        "DROP TABLE audit_logs_partitioned CASCADE",
+        "CREATE TRIGGER audit_logs_no_update_delete BEFORE UPDATE OR DELETE ON audit_logs "
+        "FOR EACH ROW EXECUTE FUNCTION audit_logs_append_only()",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_auditlog_append_only_triggers"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_logs, unpartition_audit_logs),
+    ]
@@ -0,0 +1,240 @@
+# Generated by Django 5.1.15 on 2026-10-17 08:27
+"""
+Hash chain for audit_logs (see AuditChainService).
+
+Existing entries are chained in (timestamp, id) order and checkpointed,
+with the append-only trigger lifted for the backfill only. Adding
+columns on SQLite rebuilds the table, which drops its trigger, so the
+triggers are (re)created at the end for audit_logs and audit_checkpoints.
+
+The hashing is frozen below as it was when this migration was written,
+so later changes to AuditChainService cannot change how it backfills.
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+from django.db.models import Q
+from encrypted_model_fields.fields import EncryptedMixin
+
+GENESIS_HASH = "0" * 64
+HEAD_ID = 1
+
+HASHED_FIELDS = (
+    "id",
+    "user_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "timestamp",
+    "changes",
+    "electronic_signature",
+)
+
+POSTGRES_TRIGGERS = [
+    "CREATE TRIGGER audit_logs_no_update_delete BEFORE UPDATE OR DELETE ON audit_logs "
+    "FOR EACH ROW EXECUTE FUNCTION audit_logs_append_only()",
+    "CREATE TRIGGER audit_checkpoints_no_update_delete BEFORE UPDATE OR DELETE "
+    "ON audit_checkpoints FOR EACH ROW EXECUTE FUNCTION audit_logs_append_only()",
+]
+
+SQLITE_LOG_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS audit_logs_no_update
+BEFORE UPDATE ON audit_logs
+BEGIN
+    SELECT RAISE(ABORT, 'audit_logs is append-only (UPDATE rejected)');
+END;
+"""
+
+SQLITE_CHECKPOINT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS audit_checkpoints_no_update
+BEFORE UPDATE ON audit_checkpoints
+BEGIN
+    SELECT RAISE(ABORT, 'audit_checkpoints is append-only (UPDATE rejected)');
+END;
+"""
+
+BACKFILL_BATCH = 2000
+
+
+def entry_hash(AuditLog, entry, sequence, prev_hash):
+    payload = {"sequence": sequence, "prev_hash": prev_hash}
+    for name in HASHED_FIELDS:
+        field = AuditLog._meta.get_field(name)
+        value = getattr(entry, field.attname)
+        if value is None:
+            pass
+        elif isinstance(field, EncryptedMixin):
+            value = str(value)
+        elif isinstance(field, models.DateTimeField):
+            value = value.astimezone(dt_timezone.utc).isoformat(timespec="microseconds")
+        elif isinstance(field, models.UUIDField):
+            value = str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+        elif not isinstance(field, models.JSONField):
+            value = field.to_python(value)
+        payload[name] = value
+    data = json.dumps(
+        payload,
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def merkle_root(hashes):
+    level = [hashlib.sha256(b"\x00" + bytes.fromhex(h)).digest() for h in hashes]
+    while len(level) > 1:
+        paired = [
+            hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def chain_existing_entries(apps, schema_editor):
+    AuditLog = apps.get_model("audit", "AuditLog")
+    AuditCheckpoint = apps.get_model("audit", "AuditCheckpoint")
+    AuditChainHead = apps.get_model("audit", "AuditChainHead")
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "DROP TRIGGER IF EXISTS audit_logs_no_update_delete ON audit_logs", params=None,
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TRIGGER IF EXISTS audit_logs_no_update", params=None)
+
+    interval = settings.AUDIT_CHECKPOINT_INTERVAL
+    sequence, prev_hash = 0, GENESIS_HASH
+    block = []
+    after = Q()
+    while True:
+        # Keyset pages over (timestamp, id), one UPDATE statement per page
+        batch = list(AuditLog.objects.filter(after).order_by("timestamp", "id")[:BACKFILL_BATCH])
+        if not batch:
+            break
+        for entry in batch:
+            sequence += 1
+            entry.sequence = sequence
+            entry.prev_hash = prev_hash
+            entry.entry_hash = entry_hash(AuditLog, entry, sequence, prev_hash)
+            block.append((prev_hash, entry.entry_hash, entry.timestamp))
+            prev_hash = entry.entry_hash
+            if sequence % interval == 0:
+                timestamps = [row[2] for row in block]
+                AuditCheckpoint.objects.create(
+                    sequence_start=sequence - interval + 1,
+                    sequence_end=sequence,
+                    prev_hash=block[0][0],
+                    end_hash=entry.entry_hash,
+                    merkle_root=merkle_root([row[1] for row in block]),
+                    first_timestamp=min(timestamps),
+                    last_timestamp=max(timestamps),
+                )
+                block = []
+        AuditLog.objects.bulk_update(batch, ["sequence", "prev_hash", "entry_hash"])
+        last = batch[-1]
+        after = Q(timestamp__gt=last.timestamp) | Q(timestamp=last.timestamp, id__gt=last.id)
+    AuditChainHead.objects.create(pk=HEAD_ID, sequence=sequence, entry_hash=prev_hash)
+
+    if vendor == "postgresql":
+        for statement in POSTGRES_TRIGGERS:
+            schema_editor.execute(statement, params=None)
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_LOG_TRIGGER, params=None)
+        schema_editor.execute(SQLITE_CHECKPOINT_TRIGGER, params=None)
+
+
+def restore_sqlite_trigger(apps, schema_editor):
+    # Reverse only: removing the columns rebuilds the table without it
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(SQLITE_LOG_TRIGGER, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0005_partition_audit_logs"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_trigger),
+        migrations.CreateModel(
+            name="AuditChainHead",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence", models.BigIntegerField(default=0)),
+                ("entry_hash", models.CharField(max_length=64)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "audit_chain_head",
+            },
+        ),
+        migrations.CreateModel(
+            name="AuditCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sequence_start", models.BigIntegerField(unique=True)),
+                ("sequence_end", models.BigIntegerField(unique=True)),
+                ("prev_hash", models.CharField(max_length=64)),
+                ("end_hash", models.CharField(max_length=64)),
+                ("merkle_root", models.CharField(max_length=64)),
+                ("first_timestamp", models.DateTimeField(db_index=True)),
+                ("last_timestamp", models.DateTimeField(db_index=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "audit_checkpoints",
+                "ordering": ["sequence_start"],
+            },
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="entry_hash",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="prev_hash",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="sequence",
+            field=models.BigIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(chain_existing_entries, migrations.RunPython.noop),
+    ]
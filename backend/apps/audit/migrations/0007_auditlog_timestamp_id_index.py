@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-17 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0006_audit_hash_chain"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["timestamp", "id"], name="audit_logs_ts_id_idx"),
+        ),
+    ]
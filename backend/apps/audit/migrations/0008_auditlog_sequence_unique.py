@@ -0,0 +1,77 @@
+"""
+Unique audit log sequence numbers.
+
+A unique index on a partitioned PostgreSQL table must contain the
+partition key, so there it covers (sequence, timestamp); sequences are
+still assigned one batch at a time under the chain head lock
+(AuditChainService.append) and audit_verify reports any duplicate.
+Other backends get a plain unique constraint. Altering the column
+rebuilds the table on SQLite, so its append-only trigger is recreated.
+"""
+
+from django.db import migrations, models
+
+SQLITE_LOG_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS audit_logs_no_update
+BEFORE UPDATE ON audit_logs
+BEGIN
+    SELECT RAISE(ABORT, 'audit_logs is append-only (UPDATE rejected)');
+END;
+"""
+
+POSTGRES_INDEX = "audit_logs_sequence_ts_uniq"
+
+
+def _sequence_field(model, unique):
+    field = models.BigIntegerField(null=True, editable=False, unique=unique, db_index=not unique)
+    field.set_attributes_from_name("sequence")
+    field.model = model
+    return field
+
+
+def _alter_sequence(apps, schema_editor, unique):
+    AuditLog = apps.get_model("audit", "AuditLog")
+    schema_editor.alter_field(
+        AuditLog, _sequence_field(AuditLog, not unique), _sequence_field(AuditLog, unique),
+    )
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(SQLITE_LOG_TRIGGER, params=None)
+
+
+def make_sequence_unique(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f'CREATE UNIQUE INDEX "{POSTGRES_INDEX}" ON audit_logs (sequence, "timestamp")',
+            params=None,
+        )
+        return
+    _alter_sequence(apps, schema_editor, unique=True)
+
+
+def drop_sequence_unique(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{POSTGRES_INDEX}"', params=None)
+        return
+    _alter_sequence(apps, schema_editor, unique=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0007_auditlog_timestamp_id_index"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(make_sequence_unique, drop_sequence_unique),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="auditlog",
+                    name="sequence",
+                    field=models.BigIntegerField(editable=False, null=True, unique=True),
+                ),
+            ],
+        ),
+    ]
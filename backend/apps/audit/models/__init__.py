@@ -1,3 +1,4 @@
+from apps.audit.models.audit_chain import AuditChainHead, AuditCheckpoint
 from apps.audit.models.audit_log import AuditLog
 
-__all__ = ["AuditLog"]
+__all__ = ["AuditChainHead", "AuditCheckpoint", "AuditLog"]
@@ -0,0 +1,58 @@
+from django.db import models
+
+
+class AuditCheckpoint(models.Model):
+    """
+    Merkle root over one block of AUDIT_CHECKPOINT_INTERVAL chained audit
+    entries. Blocks are contiguous and each one starts from the previous
+    block's end hash, so the checkpoints form a chain of their own that
+    outlives archived entries.
+    """
+
+    sequence_start = models.BigIntegerField(unique=True)
+    sequence_end = models.BigIntegerField(unique=True)
+    prev_hash = models.CharField(max_length=64)
+    end_hash = models.CharField(max_length=64)
+    merkle_root = models.CharField(max_length=64)
+    # Time span of the block's entries, to map time ranges to blocks
+    first_timestamp = models.DateTimeField(db_index=True)
+    last_timestamp = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "audit_checkpoints"
+        ordering = ["sequence_start"]
+
+    def __str__(self):
+        return (
+            f"Checkpoint {self.sequence_start}-{self.sequence_end} "
+            f"{self.merkle_root[:12]}"
+        )
+
+    def save(self, *args, **kwargs):
+        """Insert-only, like AuditLog."""
+        if not self._state.adding:
+            raise ValueError("Audit checkpoints are immutable and cannot be updated.")
+        kwargs["force_insert"] = True
+        kwargs.pop("force_update", None)
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Audit checkpoints are immutable and cannot be deleted.")
+
+
+class AuditChainHead(models.Model):
+    """
+    Single row holding the last chained sequence number and hash.
+    Writers lock it to append, which serializes chain extension.
+    """
+
+    sequence = models.BigIntegerField(default=0)
+    entry_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "audit_chain_head"
+
+    def __str__(self):
+        return f"Audit chain head at {self.sequence}"
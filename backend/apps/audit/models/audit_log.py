@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 from apps.common.encryption import EncryptedCharField, EncryptedTextField
 
@@ -32,13 +33,27 @@ class AuditLog(models.Model):
     resource_id = models.CharField(max_length=255, db_index=True)
     ip_address = EncryptedCharField(max_length=45, null=True, blank=True)
     user_agent = EncryptedTextField(blank=True, default="")
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Stamped when the event is recorded, not when the batch is written
+    timestamp = models.DateTimeField(
+        default=timezone.now, editable=False, db_index=True
+    )
     changes = models.JSONField(default=dict, blank=True)
     electronic_signature = EncryptedTextField(blank=True, default="")
+    # Hash chain (AuditChainService): position in the log, the previous
+    # entry's hash and this entry's hash over its content and prev_hash.
+    # On partitioned PostgreSQL the unique index is (sequence, timestamp),
+    # see migration 0008
+    sequence = models.BigIntegerField(null=True, editable=False, unique=True)
+    prev_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
+    entry_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
 
     class Meta:
         db_table = "audit_logs"
         ordering = ["-timestamp"]
+        indexes = [
+            # Keyset pagination and time-range exports
+            models.Index(fields=["timestamp", "id"], name="audit_logs_ts_id_idx"),
+        ]
         # Prevent any modifications via Django ORM
         managed = True
 
@@ -46,9 +61,15 @@ class AuditLog(models.Model):
         return f"[{self.timestamp}] {self.action} on {self.resource_type} by {self.user_id}"
 
     def save(self, *args, **kwargs):
-        """Override save to prevent updates on existing records."""
-        if self.pk and AuditLog.objects.filter(pk=self.pk).exists():
+        """
+        Insert-only save. New entries go straight to INSERT (no existence
+        SELECT); saving a loaded or already-saved entry is refused. The
+        database also rejects UPDATE/DELETE (migration 0004).
+        """
+        if not self._state.adding:
             raise ValueError("Audit logs are immutable and cannot be updated.")
+        kwargs["force_insert"] = True
+        kwargs.pop("force_update", None)
         super().save(*args, **kwargs)
 
     def delete(self, *args, **kwargs):
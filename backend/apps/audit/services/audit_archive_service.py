@@ -0,0 +1,204 @@
+"""
+Compressed archives of retired audit log partitions.
+
+Each retired month becomes ``<partition>.jsonl.gz`` in AUDIT_ARCHIVE_DIR:
+one JSON object per row, ordered by (timestamp, id), with the encrypted
+columns kept as stored (ciphertext). ``manifest.json`` lists every
+archive with its time range, row count and SHA-256, so an archive can be
+checked before it is trusted and readers can skip archives outside the
+requested window.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from encrypted_model_fields.fields import EncryptedMixin
+
+from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_export_service import AuditExportService
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class ArchiveCorrupted(Exception):
+    """An archive's checksum or row count does not match its manifest entry."""
+
+
+class AuditArchiveService:
+    """Writes, lists, verifies and streams audit log archives."""
+
+    # ------------------------------------------------------------------ #
+    # Writing                                                             #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def export(partition: str, start: datetime, end: datetime) -> dict:
+        """
+        Stream the rows with ``start <= timestamp < end`` into
+        ``<partition>.jsonl.gz`` and return its (verified) manifest entry.
+        Memory use is one fetch of AUDIT_ARCHIVE_CHUNK_ROWS rows.
+        """
+        directory = AuditArchiveService.archive_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        filename = f"{partition}.jsonl.gz"
+        temp_path = directory / f".{filename}.tmp"
+
+        fields = AuditLog._meta.concrete_fields
+        rows, first, last = 0, None, None
+        with gzip.open(temp_path, "wt", encoding="utf-8") as out:
+            for row in AuditArchiveService._raw_rows(start, end):
+                record = {
+                    field.attname: AuditExportService.serialize(field, value)
+                    for field, value in zip(fields, row)
+                }
+                out.write(json.dumps(record, separators=(",", ":")) + "\n")
+                rows += 1
+                first = first or record["timestamp"]
+                last = record["timestamp"]
+
+        entry = {
+            "partition": partition,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "file": filename,
+            "rows": rows,
+            "bytes": temp_path.stat().st_size,
+            "sha256": AuditArchiveService._sha256(temp_path),
+            "first_timestamp": first,
+            "last_timestamp": last,
+            "columns": [field.attname for field in fields],
+            "archived_at": timezone.now().isoformat(),
+        }
+        os.replace(temp_path, directory / filename)
+        AuditArchiveService.verify(entry)
+        return entry
+
+    @staticmethod
+    def record(entry: dict) -> None:
+        """Add or replace ``entry`` in the manifest (atomic file replace)."""
+        manifest = AuditArchiveService.manifest()
+        archives = [
+            a for a in manifest["archives"] if a["partition"] != entry["partition"]
+        ]
+        archives.append(entry)
+        manifest["archives"] = sorted(archives, key=lambda a: a["start"])
+
+        directory = AuditArchiveService.archive_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        temp_path = directory / f".{MANIFEST_NAME}.tmp"
+        temp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(temp_path, directory / MANIFEST_NAME)
+
+    # ------------------------------------------------------------------ #
+    # Reading                                                             #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def archive_dir() -> Path:
+        return Path(settings.AUDIT_ARCHIVE_DIR)
+
+    @staticmethod
+    def manifest() -> dict:
+        path = AuditArchiveService.archive_dir() / MANIFEST_NAME
+        if not path.exists():
+            return {"version": MANIFEST_VERSION, "archives": []}
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def verify(entry: dict, count_rows: bool = True) -> None:
+        """Raise ArchiveCorrupted unless the file matches its checksum and row count."""
+        path = AuditArchiveService.archive_dir() / entry["file"]
+        if not path.exists() or AuditArchiveService._sha256(path) != entry["sha256"]:
+            raise ArchiveCorrupted(f"Checksum mismatch for {entry['file']}")
+        if not count_rows:
+            return
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            rows = sum(1 for _ in archive)
+        if rows != entry["rows"]:
+            raise ArchiveCorrupted(
+                f"{entry['file']} holds {rows} rows, manifest says {entry['rows']}"
+            )
+
+    @staticmethod
+    def iter_entries(
+        start: datetime = None,
+        end: datetime = None,
+        decrypt: bool = False,
+        verify: bool = True,
+        **filters,
+    ):
+        """
+        Stream archived rows with ``start <= timestamp < end``, oldest
+        first, one archive at a time. ``filters`` match fields exactly
+        (e.g. ``user_id=…``, ``resource_type="TriageResult"``). With
+        ``decrypt`` the encrypted columns are returned in clear text.
+        ``start``/``end`` must be timezone-aware.
+        """
+        encrypted = [
+            field for field in AuditLog._meta.concrete_fields
+            if isinstance(field, EncryptedMixin)
+        ]
+        filters = {key: str(value) for key, value in filters.items()}
+
+        for entry in AuditArchiveService.manifest()["archives"]:
+            if end is not None and datetime.fromisoformat(entry["start"]) >= end:
+                continue
+            if start is not None and datetime.fromisoformat(entry["end"]) <= start:
+                continue
+            if verify:
+                AuditArchiveService.verify(entry, count_rows=False)
+
+            path = AuditArchiveService.archive_dir() / entry["file"]
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                for line in archive:
+                    record = json.loads(line)
+                    stamp = datetime.fromisoformat(record["timestamp"])
+                    if start is not None and stamp < start:
+                        continue
+                    if end is not None and stamp >= end:
+                        continue
+                    if any(
+                        str(record.get(key)) != value for key, value in filters.items()
+                    ):
+                        continue
+                    if decrypt:
+                        for field in encrypted:
+                            record[field.attname] = field.to_python(
+                                record[field.attname]
+                            )
+                    yield record
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _raw_rows(start: datetime, end: datetime):
+        """Rows as stored (not decrypted), through a server-side cursor if supported."""
+        queryset = AuditLog.objects.filter(
+            timestamp__gte=start, timestamp__lt=end,
+        ).order_by("timestamp", "id")
+        for batch in AuditExportService.raw_batches(
+            queryset,
+            [field.attname for field in AuditLog._meta.concrete_fields],
+            settings.AUDIT_ARCHIVE_CHUNK_ROWS,
+        ):
+            yield from batch
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
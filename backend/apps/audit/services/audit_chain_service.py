@@ -0,0 +1,335 @@
+"""
+Tamper-evident hash chain over the audit log.
+
+Every entry written by AuditWriter gets the next ``sequence`` number,
+the previous entry's hash as ``prev_hash`` and ``entry_hash`` =
+SHA-256 over its decrypted content, sequence and prev_hash. Changing,
+removing or reordering any entry breaks the chain from that point on.
+
+Every AUDIT_CHECKPOINT_INTERVAL entries an AuditCheckpoint records the
+Merkle root of the block and the hashes at its ends. Verifying a time
+range only rehashes the blocks that cover it (found through the
+checkpoint indexes) and checks the short checkpoint chain, instead of
+rehashing the whole table. Blocks whose entries were archived and
+dropped (AuditPartitionService) stay covered by their checkpoints.
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Max, Min
+from encrypted_model_fields.fields import EncryptedMixin
+
+from apps.audit.models.audit_chain import AuditChainHead, AuditCheckpoint
+from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_archive_service import AuditArchiveService
+
+GENESIS_HASH = "0" * 64
+HEAD_ID = 1
+
+# Content covered by entry_hash (sequence and prev_hash are added)
+HASHED_FIELDS = (
+    "id",
+    "user_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "timestamp",
+    "changes",
+    "electronic_signature",
+)
+
+
+class AuditChainService:
+    """Appends to, checkpoints and verifies the audit hash chain."""
+
+    # ------------------------------------------------------------------ #
+    # Hashing                                                             #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def entry_hash(entry, sequence: int, prev_hash: str) -> str:
+        """Hash of ``entry``'s content; unchanged by a database round trip."""
+        payload = {"sequence": sequence, "prev_hash": prev_hash}
+        for name in HASHED_FIELDS:
+            field = AuditLog._meta.get_field(name)
+            value = getattr(entry, field.attname)
+            if value is None:
+                pass
+            elif isinstance(field, EncryptedMixin):
+                value = str(value)
+            elif isinstance(field, models.DateTimeField):
+                value = value.astimezone(dt_timezone.utc).isoformat(
+                    timespec="microseconds"
+                )
+            elif isinstance(field, models.UUIDField):
+                value = str(
+                    value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+                )
+            elif not isinstance(field, models.JSONField):
+                value = field.to_python(value)
+            payload[name] = value
+        data = json.dumps(
+            payload,
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def merkle_root(hashes: list[str]) -> str:
+        """Root of a binary Merkle tree over hex hashes (odd nodes are promoted)."""
+        if not hashes:
+            return GENESIS_HASH
+        level = [hashlib.sha256(b"\x00" + bytes.fromhex(h)).digest() for h in hashes]
+        while len(level) > 1:
+            paired = [
+                hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+                for i in range(0, len(level) - 1, 2)
+            ]
+            if len(level) % 2:
+                paired.append(level[-1])
+            level = paired
+        return level[0].hex()
+
+    # ------------------------------------------------------------------ #
+    # Appending                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def append(entries: list[AuditLog]) -> None:
+        """
+        Chain and insert ``entries``. Must run inside a transaction: the
+        head row stays locked until commit, so concurrent writers extend
+        the chain one batch at a time.
+        """
+        head = AuditChainService._lock_head()
+        sequence, prev_hash = head.sequence, head.entry_hash
+        for entry in entries:
+            sequence += 1
+            entry.sequence = sequence
+            entry.prev_hash = prev_hash
+            entry.entry_hash = AuditChainService.entry_hash(entry, sequence, prev_hash)
+            prev_hash = entry.entry_hash
+        AuditLog.objects.bulk_create(
+            entries, batch_size=settings.AUDIT_FLUSH_BATCH_SIZE
+        )
+
+        interval = settings.AUDIT_CHECKPOINT_INTERVAL
+        for end in range(
+            (head.sequence // interval + 1) * interval, sequence + 1, interval
+        ):
+            AuditChainService._checkpoint(end - interval + 1, end)
+        AuditChainHead.objects.filter(pk=head.pk).update(
+            sequence=sequence, entry_hash=prev_hash
+        )
+
+    @staticmethod
+    def _lock_head() -> AuditChainHead:
+        head = AuditChainHead.objects.select_for_update().filter(pk=HEAD_ID).first()
+        if head is not None:
+            return head
+        # Missing (fresh or flushed database): resume from the last chained entry
+        last = (
+            AuditLog.objects.filter(sequence__isnull=False)
+            .order_by("-sequence")
+            .values_list("sequence", "entry_hash")
+            .first()
+        )
+        sequence, entry_hash = last or (0, GENESIS_HASH)
+        AuditChainHead.objects.get_or_create(
+            pk=HEAD_ID, defaults={"sequence": sequence, "entry_hash": entry_hash},
+        )
+        return AuditChainHead.objects.select_for_update().get(pk=HEAD_ID)
+
+    @staticmethod
+    def _checkpoint(start: int, end: int) -> AuditCheckpoint:
+        rows = list(
+            AuditLog.objects.filter(sequence__gte=start, sequence__lte=end)
+            .order_by("sequence")
+            .values_list("prev_hash", "entry_hash", "timestamp")
+        )
+        timestamps = [row[2] for row in rows]
+        return AuditCheckpoint.objects.create(
+            sequence_start=start,
+            sequence_end=end,
+            prev_hash=rows[0][0],
+            end_hash=rows[-1][1],
+            merkle_root=AuditChainService.merkle_root([row[1] for row in rows]),
+            first_timestamp=min(timestamps),
+            last_timestamp=max(timestamps),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Verification                                                        #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def plan(
+        since: datetime = None, until: datetime = None
+    ) -> tuple[list[dict], list[str]]:
+        """
+        Segments to rehash for entries in ``[since, until)`` and the
+        errors found in the checkpoint chain itself. Each segment is a
+        checkpointed block (or the not yet checkpointed tail) and is verified
+        independently by ``verify_segment``.
+        """
+        retired = [
+            datetime.fromisoformat(entry["end"])
+            for entry in AuditArchiveService.manifest()["archives"]
+            if entry.get("retired")
+        ]
+        archived_before = max(retired).isoformat() if retired else None
+
+        errors = []
+        segments = []
+        expected_start, expected_prev = 1, GENESIS_HASH
+        for checkpoint in AuditCheckpoint.objects.order_by("sequence_start").iterator():
+            if (
+                checkpoint.sequence_start != expected_start
+                or checkpoint.prev_hash != expected_prev
+            ):
+                errors.append(
+                    f"Checkpoint {checkpoint.sequence_start}-{checkpoint.sequence_end} "
+                    "does not continue the previous checkpoint"
+                )
+            expected_start, expected_prev = (
+                checkpoint.sequence_end + 1,
+                checkpoint.end_hash,
+            )
+            if since is not None and checkpoint.last_timestamp < since:
+                continue
+            if until is not None and checkpoint.first_timestamp >= until:
+                continue
+            segments.append({
+                "start": checkpoint.sequence_start,
+                "end": checkpoint.sequence_end,
+                "prev_hash": checkpoint.prev_hash,
+                "end_hash": checkpoint.end_hash,
+                "merkle_root": checkpoint.merkle_root,
+                "first_timestamp": checkpoint.first_timestamp.isoformat(),
+                "last_timestamp": checkpoint.last_timestamp.isoformat(),
+                "archived_before": archived_before,
+            })
+
+        head = AuditChainHead.objects.filter(pk=HEAD_ID).first()
+        if head is not None and head.sequence >= expected_start:
+            tail = AuditLog.objects.filter(sequence__gte=expected_start).aggregate(
+                first=Min("timestamp"), last=Max("timestamp"),
+            )
+            segments.append({
+                "start": expected_start,
+                "end": head.sequence,
+                "prev_hash": expected_prev,
+                "end_hash": head.entry_hash,
+                "merkle_root": None,
+                "first_timestamp": tail["first"] and tail["first"].isoformat(),
+                "last_timestamp": tail["last"] and tail["last"].isoformat(),
+                # Archival never reaches the newest entries
+                "archived_before": None,
+            })
+
+        unchained = AuditLog.objects.filter(sequence__isnull=True)
+        if since is not None:
+            unchained = unchained.filter(timestamp__gte=since)
+        if until is not None:
+            unchained = unchained.filter(timestamp__lt=until)
+        count = unchained.count()
+        if count:
+            errors.append(f"{count} audit entries are not part of the hash chain")
+        return segments, errors
+
+    @staticmethod
+    def verify_segment(segment: dict) -> dict:
+        """
+        Rehash the entries of one segment and check their links, the
+        block's end hash and (for complete blocks) its Merkle root.
+        Entries missing from the start of a block are accepted only if
+        the block predates the newest retired archive.
+        """
+        start, end = segment["start"], segment["end"]
+        errors = []
+        hashes = []
+        expected_sequence, expected_prev = None, None
+        first_sequence = None
+        for entry in (
+            AuditLog.objects.filter(sequence__gte=start, sequence__lte=end)
+            .order_by("sequence")
+            .iterator(chunk_size=2000)
+        ):
+            if first_sequence is None:
+                first_sequence = entry.sequence
+                expected_sequence = entry.sequence
+                expected_prev = (
+                    segment["prev_hash"] if entry.sequence == start else entry.prev_hash
+                )
+            if entry.sequence != expected_sequence:
+                errors.append(
+                    f"Entries {expected_sequence}-{entry.sequence - 1} are missing"
+                )
+            elif entry.prev_hash != expected_prev:
+                errors.append(
+                    f"Entry {entry.sequence} does not link to its predecessor"
+                )
+            if (
+                AuditChainService.entry_hash(entry, entry.sequence, entry.prev_hash)
+                != entry.entry_hash
+            ):
+                errors.append(f"Entry {entry.sequence} ({entry.id}) was modified")
+            hashes.append(entry.entry_hash)
+            expected_sequence, expected_prev = entry.sequence + 1, entry.entry_hash
+
+        status = "ok"
+        archived_before = segment["archived_before"]
+        if first_sequence is None or first_sequence > start:
+            # Leading entries gone: fine only where archival has reached
+            reached = (
+                segment["last_timestamp"]
+                if first_sequence is None
+                else segment["first_timestamp"]
+            )
+            if (
+                archived_before is not None
+                and reached is not None
+                and datetime.fromisoformat(reached)
+                < datetime.fromisoformat(archived_before)
+            ):
+                status = "archived" if first_sequence is None else "partial"
+            else:
+                errors.append(
+                    f"Entries {start}-{(first_sequence or end + 1) - 1} are missing"
+                )
+
+        if first_sequence is not None:
+            if expected_sequence != end + 1:
+                errors.append(f"Entries {expected_sequence}-{end} are missing")
+            elif expected_prev != segment["end_hash"]:
+                errors.append(
+                    f"Segment {start}-{end} does not end at its recorded hash"
+                )
+            if (
+                not errors
+                and first_sequence == start
+                and segment["merkle_root"] is not None
+                and AuditChainService.merkle_root(hashes) != segment["merkle_root"]
+            ):
+                errors.append(
+                    f"Merkle root of {start}-{end} does not match its checkpoint"
+                )
+
+        return {
+            "start": start,
+            "end": end,
+            "rows": len(hashes),
+            "status": "failed" if errors else status,
+            "errors": errors,
+        }
@@ -0,0 +1,153 @@
+"""
+Streaming audit log exports.
+
+Rows are read as stored through a server-side cursor, one fetch of
+AUDIT_EXPORT_CHUNK_ROWS at a time, without building model instances.
+The encrypted columns of each fetch are decrypted together and the
+fetch is serialized into a single chunk of the response, so memory use
+stays constant however many rows an export covers.
+"""
+
+import csv
+import io
+import json
+import uuid
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from encrypted_model_fields.fields import EncryptedMixin
+
+from apps.audit.models.audit_log import AuditLog
+
+EXPORT_FIELDS = (
+    "id",
+    "sequence",
+    "timestamp",
+    "user_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "ip_address",
+    "user_agent",
+    "changes",
+    "electronic_signature",
+    "entry_hash",
+)
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class AuditExportService:
+    """Reads audit rows in raw batches and streams them as NDJSON or CSV."""
+
+    @staticmethod
+    def raw_batches(queryset, fields, chunk_rows: int):
+        """
+        Yield lists of stored (still encrypted) ``fields`` tuples for
+        ``queryset``, in its order, through a server-side cursor where
+        the database supports one.
+        """
+        sql, params = queryset.values_list(*fields).query.sql_with_params()
+        # PostgreSQL named cursors only stream inside a transaction
+        with transaction.atomic(), connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                batch = cursor.fetchmany(chunk_rows)
+                if not batch:
+                    return
+                yield batch
+
+    @staticmethod
+    def serialize(field, value):
+        """JSON-safe form of a stored value (ciphertext is left as is)."""
+        if value is None:
+            return None
+        if isinstance(field, models.UUIDField):
+            return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+        if isinstance(field, models.DateTimeField):
+            if isinstance(value, str):
+                value = parse_datetime(value)
+            if timezone.is_naive(value):
+                # SQLite stores UTC without an offset
+                value = value.replace(tzinfo=dt_timezone.utc)
+            return value.isoformat()
+        if isinstance(field, models.JSONField):
+            return json.loads(value) if isinstance(value, str) else value
+        return value
+
+    @staticmethod
+    def records(queryset, chunk_rows: int = None):
+        """
+        Yield lists of decrypted export records (dicts) for ``queryset``
+        ordered oldest first, one list per fetch.
+        """
+        chunk_rows = chunk_rows or settings.AUDIT_EXPORT_CHUNK_ROWS
+        fields = [AuditLog._meta.get_field(name) for name in EXPORT_FIELDS]
+        encrypted = [
+            i for i, field in enumerate(fields) if isinstance(field, EncryptedMixin)
+        ]
+        queryset = queryset.order_by("timestamp", "id")
+
+        for batch in AuditExportService.raw_batches(
+            queryset, [field.attname for field in fields], chunk_rows,
+        ):
+            columns = [list(column) for column in zip(*batch)]
+            for i in encrypted:
+                columns[i] = [fields[i].to_python(value) for value in columns[i]]
+            yield [
+                {
+                    field.name: AuditExportService.serialize(field, value)
+                    for field, value in zip(fields, row)
+                }
+                for row in zip(*columns)
+            ]
+
+    @staticmethod
+    def stream(queryset, output: str = "ndjson"):
+        """Response body chunks for ``queryset`` in ``output`` (a CONTENT_TYPES key)."""
+        if output == "csv":
+            yield AuditExportService._csv([EXPORT_FIELDS])
+            for records in AuditExportService.records(queryset):
+                yield AuditExportService._csv(
+                    [
+                        [
+                            (
+                                json.dumps(record[name])
+                                if name == "changes"
+                                else record[name]
+                            )
+                            for name in EXPORT_FIELDS
+                        ]
+                        for record in records
+                    ]
+                )
+            return
+
+        for records in AuditExportService.records(queryset):
+            yield "".join(
+                json.dumps(record, separators=(",", ":")) + "\n" for record in records
+            )
+
+    @staticmethod
+    def _csv(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [AuditExportService._csv_cell(value) for value in row] for row in rows
+        )
+        return buffer.getvalue()
+
+    @staticmethod
+    def _csv_cell(value):
+        """Quote user-controlled text that a spreadsheet would run as a formula."""
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return "'" + value
+        return value
@@ -0,0 +1,212 @@
+"""
+Monthly audit log partitions.
+
+PostgreSQL: audit_logs is range-partitioned by month (migration 0005),
+so inserts and recent-window queries only touch the current partition
+and its indexes, however many years of logs exist. Partitions are
+created ahead of time and, once past AUDIT_RETENTION_MONTHS, archived
+(see AuditArchiveService), detached and dropped. Rows that landed in
+the default partition (no partition existed for their month yet) are
+moved into their own monthly partitions, so they get archived too.
+
+SQLite (development): partitioning is emulated. A "partition" is one
+month of rows in the single table, and retiring it deletes those rows
+after the archive has been verified.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_archive_service import AuditArchiveService
+
+logger = logging.getLogger(__name__)
+
+TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class AuditPartition(NamedTuple):
+    name: str
+    month: date
+
+    @property
+    def start(self) -> datetime:
+        return datetime(self.month.year, self.month.month, 1, tzinfo=dt_timezone.utc)
+
+    @property
+    def end(self) -> datetime:
+        following = add_months(self.month, 1)
+        return datetime(following.year, following.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _partition(month: date) -> AuditPartition:
+    return AuditPartition(f"{TABLE}_p{month:%Y%m}", month.replace(day=1))
+
+
+class AuditPartitionService:
+    """Creates, lists and retires monthly audit log partitions."""
+
+    @staticmethod
+    def native() -> bool:
+        return connection.vendor == "postgresql"
+
+    @staticmethod
+    def partitions() -> list[AuditPartition]:
+        """Live partitions, oldest first (months with rows, on SQLite)."""
+        if not AuditPartitionService.native():
+            return [
+                _partition(month)
+                for month in AuditLog.objects.dates("timestamp", "month", order="ASC")
+            ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = %s",
+                [TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        months = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return [_partition(month) for month in sorted(months)]
+
+    @staticmethod
+    def ensure_partitions(months_ahead: int = None) -> list[str]:
+        """
+        Create any missing partitions from this month to ``months_ahead``
+        later, and partitions for the months with rows in the default
+        partition (see ``_split_default``).
+        """
+        if not AuditPartitionService.native():
+            return []
+        months_ahead = (
+            settings.AUDIT_PARTITION_MONTHS_AHEAD
+            if months_ahead is None
+            else months_ahead
+        )
+        created = AuditPartitionService._split_default()
+        existing = {p.name for p in AuditPartitionService.partitions()}
+        this_month = timezone.now().date().replace(day=1)
+
+        for offset in range(months_ahead + 1):
+            partition = _partition(add_months(this_month, offset))
+            if partition.name in existing:
+                continue
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{partition.name}" '
+                        f'PARTITION OF "{TABLE}" FOR VALUES FROM (%s) TO (%s)',
+                        [partition.start, partition.end],
+                    )
+            except DatabaseError:
+                logger.exception("Could not create audit partition %s", partition.name)
+                continue
+            created.append(partition.name)
+        return created
+
+    @staticmethod
+    def _split_default() -> list[str]:
+        """
+        Give every month with rows in the default partition its own
+        partition and move those rows into it; returns the new names.
+
+        PostgreSQL refuses to create a partition whose range already has
+        rows in the default, so the default is detached, the partitions
+        and a fresh default are created and the old rows are re-inserted
+        through the parent (routing each to its partition), in one
+        transaction. Rows are only inserted, never updated or deleted, so
+        the append-only trigger is not involved.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT "
+                "date_trunc('month', \"timestamp\" AT TIME ZONE 'UTC')::date "
+                f'FROM "{DEFAULT_PARTITION}"'
+            )
+            months = sorted(row[0] for row in cursor.fetchall())
+        if not months:
+            return []
+
+        partitions = [_partition(month) for month in months]
+        default, detached = DEFAULT_PARTITION, f"{DEFAULT_PARTITION}_split"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{default}"')
+            cursor.execute(f'ALTER TABLE "{default}" RENAME TO "{detached}"')
+            for partition in partitions:
+                cursor.execute(
+                    f'CREATE TABLE "{partition.name}" PARTITION OF "{TABLE}" '
+                    "FOR VALUES FROM (%s) TO (%s)",
+                    [partition.start, partition.end],
+                )
+            cursor.execute(f'CREATE TABLE "{default}" PARTITION OF "{TABLE}" DEFAULT')
+            cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{detached}"')
+            cursor.execute(f'DROP TABLE "{detached}"')
+        names = [partition.name for partition in partitions]
+        logger.info(
+            "Moved audit rows out of the default partition into %s", ", ".join(names),
+        )
+        return names
+
+    @staticmethod
+    def expired(retention_months: int = None) -> list[AuditPartition]:
+        """Partitions entirely older than the retention horizon."""
+        retention_months = (
+            settings.AUDIT_RETENTION_MONTHS
+            if retention_months is None
+            else retention_months
+        )
+        horizon = add_months(timezone.now().date().replace(day=1), -retention_months)
+        return [p for p in AuditPartitionService.partitions() if p.month < horizon]
+
+    @staticmethod
+    def archive(partition: AuditPartition) -> dict:
+        """
+        Export ``partition`` to a verified archive, register it in the
+        manifest, then detach and drop it (delete its rows on SQLite).
+        Safe to re-run after a crash at any step.
+        """
+        entry = AuditArchiveService.export(
+            partition.name, partition.start, partition.end
+        )
+        entry["retired"] = False
+        AuditArchiveService.record(entry)
+
+        AuditPartitionService._retire(partition)
+        entry["retired"] = True
+        AuditArchiveService.record(entry)
+        logger.info(
+            "Archived %s (%d rows) to %s", partition.name, entry["rows"], entry["file"]
+        )
+        return entry
+
+    @staticmethod
+    def _retire(partition: AuditPartition) -> None:
+        if AuditPartitionService.native():
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE "{TABLE}" DETACH PARTITION "{partition.name}"'
+                )
+                cursor.execute(f'DROP TABLE "{partition.name}"')
+            return
+        AuditLog.objects.filter(
+            timestamp__gte=partition.start, timestamp__lt=partition.end,
+        ).delete()
@@ -1,13 +1,22 @@
+from django.utils import timezone
+
 from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_writer import AuditWriter
+from apps.common.tracing import timed
 
 
 class AuditService:
     """
     Single entry point for writing audit logs.
     All mutations in the system should call this service.
+
+    Entries are stamped when recorded and written in batches by
+    AuditWriter: on commit of the surrounding transaction, at the end
+    of the request, or by the background flusher (AUDIT_WRITE_MODE).
     """
 
     @staticmethod
+    @timed("audit.record")
     def log_action(
         user_id: str,
         action: str,
@@ -18,8 +27,8 @@ class AuditService:
         changes: dict = None,
         electronic_signature: str = "",
     ) -> AuditLog:
-        """Create an immutable audit log entry."""
-        return AuditLog.objects.create(
+        """Record an immutable audit log entry (written as described above)."""
+        entry = AuditLog(
             user_id=user_id,
             action=action,
             resource_type=resource_type,
@@ -28,4 +37,34 @@ class AuditService:
             user_agent=user_agent,
             changes=changes or {},
             electronic_signature=electronic_signature,
+            timestamp=timezone.now(),
         )
+        AuditWriter.record([entry])
+        return entry
+
+    @staticmethod
+    @timed("audit.record")
+    def log_actions(entries: list[dict]) -> list[AuditLog]:
+        """
+        Record many audit log entries at once. Each entry is a dict keyed
+        like log_action()'s arguments: ``user_id``, ``action``,
+        ``resource_type`` and ``resource_id`` are required; ``ip_address``,
+        ``user_agent``, ``changes`` and ``electronic_signature`` are optional.
+        """
+        now = timezone.now()
+        logs = [
+            AuditLog(
+                user_id=entry["user_id"],
+                action=entry["action"],
+                resource_type=entry["resource_type"],
+                resource_id=entry["resource_id"],
+                ip_address=entry.get("ip_address"),
+                user_agent=entry.get("user_agent", ""),
+                changes=entry.get("changes") or {},
+                electronic_signature=entry.get("electronic_signature", ""),
+                timestamp=now,
+            )
+            for entry in entries
+        ]
+        AuditWriter.record(logs)
+        return logs
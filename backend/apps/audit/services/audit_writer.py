@@ -0,0 +1,261 @@
+"""
+Batched audit log writes.
+
+AuditService hands every entry to ``AuditWriter.record``:
+
+- Inside a transaction, entries wait for the commit and all entries of
+  that transaction are written with one bulk insert, by a single
+  on_commit hook kept last in the transaction's hook list. Entries made
+  in a savepoint ride on an on_commit marker of that savepoint, so a
+  rollback discards them along with it; a rolled-back transaction
+  discards everything.
+- Outside a transaction, entries made while handling a request are
+  buffered by AuditBufferMiddleware and written when the response is
+  ready (also when the view raised).
+- Anything else (management commands, job runners) is written at once.
+
+Each write appends to the hash chain (AuditChainService) under a lock
+on the chain head, so batching also keeps that lock short and rare.
+
+With AUDIT_WRITE_MODE="async" the final insert (and the field
+encryption it implies) moves to a per-process flusher thread fed by a
+bounded queue. When the queue is full the caller writes its own entries
+inline, so memory stays bounded and nothing is dropped for lack of
+space; the queue is drained at exit. A hard kill can lose up to
+AUDIT_FLUSH_INTERVAL_SECONDS of queued entries, which is why "sync" is
+the default.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from apps.audit.models.audit_log import AuditLog
+from apps.audit.services.audit_chain_service import AuditChainService
+from apps.common.metrics import registry
+from apps.common.tracing import timed
+
+logger = logging.getLogger(__name__)
+
+_written = registry.counter(
+    "audit_entries_written_total",
+    "Audit entries inserted, by path (inline / background).",
+)
+_batches = registry.counter(
+    "audit_batches_written_total",
+    "Audit bulk inserts, by path (inline / background).",
+)
+_overflow = registry.counter(
+    "audit_queue_overflow_total",
+    "Batches written inline because the background queue was full.",
+)
+
+_MAX_ATTEMPTS = 5
+
+_local = threading.local()
+
+
+class _CommitBatch:
+    """
+    The single on_commit hook of one transaction, writing everything
+    recorded in it. It is kept as the transaction's last hook so the
+    savepoint markers below have handed over their entries by then.
+    """
+
+    def __init__(self):
+        self.entries: list[AuditLog] = []
+
+    def __call__(self):
+        entries, self.entries = self.entries, []
+        if entries:
+            AuditWriter.dispatch(entries)
+
+
+class _SavepointEntries:
+    """
+    on_commit marker for entries recorded inside a savepoint. Django
+    discards it if the savepoint rolls back; otherwise it runs just
+    before the batch and adds its entries.
+    """
+
+    def __init__(self, batch: _CommitBatch, entries: list[AuditLog]):
+        self.batch = batch
+        self.entries = entries
+
+    def __call__(self):
+        self.batch.entries.extend(self.entries)
+
+
+def _commit_batch(connection) -> _CommitBatch:
+    """The batch of the connection's current transaction (new if none yet)."""
+    for _, func, _ in connection.run_on_commit:
+        if isinstance(func, _CommitBatch):
+            return func
+    return _CommitBatch()
+
+
+def _place_last(connection, batch: _CommitBatch) -> None:
+    hooks = connection.run_on_commit
+    hooks[:] = [hook for hook in hooks if hook[1] is not batch]
+    # No savepoint ids: only a rollback of the whole transaction drops it
+    hooks.append((set(), batch, False))
+
+
+class AuditWriter:
+    """Routes audit entries to the cheapest safe write."""
+
+    @staticmethod
+    def record(entries: list[AuditLog], using: str = "default") -> None:
+        if not entries:
+            return
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            AuditWriter.dispatch(entries)
+            return
+        batch = _commit_batch(connection)
+        if connection.savepoint_ids:
+            transaction.on_commit(_SavepointEntries(batch, entries), using=using)
+        else:
+            batch.entries.extend(entries)
+        _place_last(connection, batch)
+
+    @staticmethod
+    def dispatch(entries: list[AuditLog]) -> None:
+        """Send committed entries to the request buffer, the flusher or the database."""
+        buffer = getattr(_local, "request_buffer", None)
+        if buffer is not None:
+            buffer.extend(entries)
+        elif settings.AUDIT_WRITE_MODE == "async":
+            _flusher().submit(entries)
+        else:
+            AuditWriter.write(entries)
+
+    @staticmethod
+    @timed("audit.insert")
+    def write(entries: list[AuditLog], path: str = "inline") -> None:
+        """
+        Chain and insert ``entries`` all-or-nothing, in statements of
+        AUDIT_FLUSH_BATCH_SIZE rows.
+        """
+        with transaction.atomic():
+            AuditChainService.append(entries)
+        _written.inc(len(entries), path=path)
+        _batches.inc(path=path)
+
+    @staticmethod
+    @contextmanager
+    def buffered():
+        """Collect entries recorded outside transactions until the block exits."""
+        if getattr(_local, "request_buffer", None) is not None:
+            # Nested: the outer block flushes
+            yield
+            return
+        _local.request_buffer = []
+        try:
+            yield
+        finally:
+            entries, _local.request_buffer = _local.request_buffer, None
+            if entries:
+                AuditWriter.dispatch(entries)
+
+    @staticmethod
+    def flush(timeout: float = None) -> None:
+        """Wait until the background queue is written (no-op in sync mode)."""
+        if _background is not None:
+            _background.drain(timeout)
+
+
+class _BackgroundFlusher:
+    """Daemon thread writing queued entries in bulk."""
+
+    def __init__(self, max_batches: int):
+        # Each queued batch is one commit's or one request's entries
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_batches))
+        self._thread = threading.Thread(
+            target=self._run, name="audit-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, entries: list[AuditLog]) -> None:
+        try:
+            self._queue.put_nowait(entries)
+        except queue.Full:
+            _overflow.inc()
+            AuditWriter.write(entries)
+
+    def drain(self, timeout: float = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning("Audit flusher did not drain in %.1fs", timeout)
+                return
+            time.sleep(0.01)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Gather whatever else arrived within the flush interval
+            deadline = time.monotonic() + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+            size = len(batch[0])
+            while size < settings.AUDIT_FLUSH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                size += len(batch[-1])
+
+            entries = [entry for entries in batch for entry in entries]
+            self._write_with_retry(entries)
+            for _ in batch:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write_with_retry(entries: list[AuditLog]) -> None:
+        delay = 0.5
+        for attempt in range(1, _MAX_ATTEMPTS + 1):
+            close_old_connections()
+            try:
+                AuditWriter.write(entries, path="background")
+                return
+            except Exception:
+                if attempt == _MAX_ATTEMPTS:
+                    break
+                logger.exception(
+                    "Audit flush of %d entries failed; retrying in %.1fs",
+                    len(entries),
+                    delay,
+                )
+                time.sleep(delay)
+                delay *= 2
+
+        # Isolate the bad rows so the rest of the batch still lands
+        for entry in entries:
+            try:
+                AuditWriter.write([entry], path="background")
+            except Exception:
+                logger.exception(
+                    "Dropping audit entry %s (%s %s %s) after repeated failures",
+                    entry.id, entry.action, entry.resource_type, entry.resource_id,
+                )
+
+
+_background: _BackgroundFlusher | None = None
+_background_lock = threading.Lock()
+
+
+def _flusher() -> _BackgroundFlusher:
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = _BackgroundFlusher(settings.AUDIT_QUEUE_MAX_BATCHES)
+            atexit.register(AuditWriter.flush, settings.AUDIT_SHUTDOWN_TIMEOUT_SECONDS)
+        return _background
@@ -0,0 +1,25 @@
+import csv
+import io
+
+from django.test import SimpleTestCase
+
+from apps.audit.services.audit_export_service import AuditExportService
+
+
+class AuditExportCsvTests(SimpleTestCase):
+    def _parse(self, rows):
+        return list(csv.reader(io.StringIO(AuditExportService._csv(rows))))
+
+    def test_formula_cells_are_quoted(self):
+        rows = self._parse(
+            [["=HYPERLINK(\"http://x\")", "+1", "-2", "@SUM(A1)", "\tcmd"]]
+        )
+
+        self.assertEqual(
+            rows, [["'=HYPERLINK(\"http://x\")", "'+1", "'-2", "'@SUM(A1)", "'\tcmd"]]
+        )
+
+    def test_other_cells_are_unchanged(self):
+        rows = self._parse([["Mozilla/5.0", '{"a": 1}', 42, -3, None]])
+
+        self.assertEqual(rows, [["Mozilla/5.0", '{"a": 1}', "42", "-3", ""]])
@@ -0,0 +1,92 @@
+import uuid
+
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.audit.models import AuditLog
+
+
+def _entry(**overrides) -> AuditLog:
+    fields = {
+        "user_id": uuid.uuid4(),
+        "action": AuditLog.Action.CREATE,
+        "resource_type": "TriageSession",
+        "resource_id": str(uuid.uuid4()),
+        "ip_address": "10.0.0.1",
+        "user_agent": "pytest",
+    }
+    fields.update(overrides)
+    return AuditLog(**fields)
+
+
+class AuditLogSaveTests(TestCase):
+    def test_save_issues_a_single_insert(self):
+        entry = _entry()
+
+        with CaptureQueriesContext(connection) as queries:
+            entry.save()
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertTrue(
+            queries.captured_queries[0]["sql"].lstrip().upper().startswith("INSERT")
+        )
+        self.assertTrue(AuditLog.objects.filter(pk=entry.pk).exists())
+
+    def test_create_issues_a_single_insert(self):
+        with self.assertNumQueries(1):
+            AuditLog.objects.create(
+                user_id=uuid.uuid4(),
+                action=AuditLog.Action.LOGIN,
+                resource_type="User",
+                resource_id="1",
+            )
+
+    def test_saved_entry_cannot_be_saved_again(self):
+        entry = _entry()
+        entry.save()
+
+        entry.resource_type = "Tampered"
+        with self.assertNumQueries(0), self.assertRaises(ValueError):
+            entry.save()
+
+    def test_loaded_entry_cannot_be_saved(self):
+        saved = _entry()
+        saved.save()
+        entry = AuditLog.objects.get(pk=saved.pk)
+
+        with self.assertRaises(ValueError):
+            entry.save()
+
+    def test_delete_is_refused(self):
+        entry = _entry()
+        entry.save()
+
+        with self.assertRaises(ValueError):
+            entry.delete()
+
+
+class AuditLogDatabaseProtectionTests(TestCase):
+    """Triggers from migration 0004 (SQLite and PostgreSQL)."""
+
+    def setUp(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("No append-only triggers on this backend")
+        self.entry = _entry()
+        self.entry.save()
+
+    def test_queryset_update_is_rejected(self):
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            AuditLog.objects.filter(pk=self.entry.pk).update(resource_type="Tampered")
+
+        self.assertEqual(
+            AuditLog.objects.get(pk=self.entry.pk).resource_type, "TriageSession"
+        )
+
+    def test_queryset_delete_is_rejected(self):
+        if connection.vendor != "postgresql":
+            self.skipTest("SQLite keeps DELETE for test database flushes")
+        with self.assertRaises(DatabaseError), transaction.atomic():
+            AuditLog.objects.filter(pk=self.entry.pk).delete()
+
+        self.assertTrue(AuditLog.objects.filter(pk=self.entry.pk).exists())
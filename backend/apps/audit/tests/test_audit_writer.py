@@ -0,0 +1,71 @@
+import uuid
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.audit.models import AuditLog
+from apps.audit.services.audit_service import AuditService
+
+
+def _log(resource_id: str = "1") -> AuditLog:
+    return AuditService.log_action(
+        user_id=uuid.uuid4(),
+        action=AuditLog.Action.UPDATE,
+        resource_type="TriageSession",
+        resource_id=resource_id,
+    )
+
+
+def _audit_inserts(queries) -> int:
+    return sum(
+        1 for query in queries.captured_queries
+        if query["sql"].lstrip().upper().startswith('INSERT INTO "AUDIT_LOGS"')
+    )
+
+
+class AuditWriterCommitTests(TransactionTestCase):
+    def test_one_insert_per_commit(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                for i in range(3):
+                    _log(str(i))
+                self.assertEqual(AuditLog.objects.count(), 0)
+
+        self.assertEqual(_audit_inserts(queries), 1)
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_savepoints_share_the_commit_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                _log("outer")
+                with transaction.atomic():
+                    _log("inner")
+                _log("after")
+
+        self.assertEqual(_audit_inserts(queries), 1)
+        self.assertEqual(AuditLog.objects.count(), 3)
+
+    def test_rolled_back_savepoint_entries_are_dropped(self):
+        with transaction.atomic():
+            _log("kept")
+            try:
+                with transaction.atomic():
+                    _log("dropped")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(
+            list(AuditLog.objects.values_list("resource_id", flat=True)), ["kept"],
+        )
+
+    def test_rolled_back_transaction_writes_nothing(self):
+        try:
+            with transaction.atomic():
+                _log()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(AuditLog.objects.count(), 0)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.common.models.upload import UploadSession
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "purpose",
+            "filename",
+            "total_size",
+            "received_bytes",
+            "status",
+            "metadata",
+            "resource_id",
+            "expires_at",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class CreateUploadSerializer(serializers.Serializer):
+    purpose = serializers.ChoiceField(choices=[])
+    filename = serializers.CharField(max_length=255)
+    total_size = serializers.IntegerField(min_value=1)
+    metadata = serializers.DictField(required=False, default=dict)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["purpose"].choices = list(settings.UPLOAD_HANDLERS)
+
+    def validate_total_size(self, value):
+        if value > settings.UPLOAD_MAX_SIZE_BYTES:
+            raise serializers.ValidationError(
+                f"File must be at most {settings.UPLOAD_MAX_SIZE_BYTES} bytes."
+            )
+        return value
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from apps.common.api.views import (
+    UploadCreateView,
+    UploadDetailView,
+    UploadFinalizeView,
+)
+
+urlpatterns = [
+    path("", UploadCreateView.as_view(), name="upload-create"),
+    path("<uuid:upload_id>/", UploadDetailView.as_view(), name="upload-detail"),
+    path(
+        "<uuid:upload_id>/finalize/",
+        UploadFinalizeView.as_view(),
+        name="upload-finalize",
+    ),
+]
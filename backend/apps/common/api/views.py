@@ -0,0 +1,180 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.common.api.serializers import CreateUploadSerializer, UploadSessionSerializer
+from apps.common.metrics import MetricsRegistry, read_states, registry, write_state
+from apps.common.models.upload import UploadSession
+from apps.common.permissions import HasMetricsToken
+from apps.common.services.upload_service import (
+    UploadError,
+    UploadOffsetMismatch,
+    UploadService,
+)
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+def _upload_response(upload, http_status=status.HTTP_200_OK):
+    response = Response(UploadSessionSerializer(upload).data, status=http_status)
+    response["Upload-Offset"] = str(upload.received_bytes)
+    return response
+
+
+def _error_response(error: UploadError):
+    http_status = (
+        status.HTTP_409_CONFLICT if isinstance(error, UploadOffsetMismatch)
+        else status.HTTP_400_BAD_REQUEST
+    )
+    body = {"error": str(error)}
+    response = Response(body, status=http_status)
+    if error.offset is not None:
+        body["offset"] = error.offset
+        response["Upload-Offset"] = str(error.offset)
+    return response
+
+
+class UploadCreateView(APIView):
+    """
+    POST — start a resumable upload.
+
+    Body: ``purpose`` (``document`` or ``triage_image``), ``filename``,
+    ``total_size`` and purpose ``metadata`` (``record_id`` /
+    ``document_type`` for documents, ``session_id`` for images).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CreateUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            upload = UploadService.create(
+                user=request.user,
+                purpose=data["purpose"],
+                filename=data["filename"],
+                total_size=data["total_size"],
+                metadata=data["metadata"],
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
+        except UploadError as e:
+            return _error_response(e)
+
+        return _upload_response(upload, status.HTTP_201_CREATED)
+
+
+class UploadDetailView(APIView):
+    """
+    GET    — upload status; ``Upload-Offset`` is where to resume.
+    PUT    — raw chunk body with ``Content-Range: bytes start-end/total``
+             and ``X-Chunk-SHA256``. 409 carries the offset to resume from.
+    DELETE — abort the upload.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        upload = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+        return _upload_response(upload)
+
+    def put(self, request, upload_id):
+        upload = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+        match = CONTENT_RANGE.match(request.headers.get("Content-Range", ""))
+        sha256 = request.headers.get("X-Chunk-SHA256", "")
+        if not match or not sha256:
+            return Response(
+                {"error": "Content-Range and X-Chunk-SHA256 headers are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if request.stream is None:
+            return Response(
+                {"error": "Chunk body is empty."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        start, end, total = (int(g) for g in match.groups())
+        if total != upload.total_size:
+            return Response(
+                {"error": "Content-Range total does not match the upload size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Read the raw body as a stream; never touch request.data here
+        try:
+            upload = UploadService.write_chunk(
+                upload, start, end, request.stream, sha256,
+            )
+        except UploadError as e:
+            return _error_response(e)
+
+        return _upload_response(upload)
+
+    def delete(self, request, upload_id):
+        upload = get_object_or_404(
+            UploadSession,
+            id=upload_id,
+            user=request.user,
+            status=UploadSession.Status.ACTIVE,
+        )
+        UploadService.abort(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadFinalizeView(APIView):
+    """POST — assemble a fully received upload into a document or image."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        upload = get_object_or_404(UploadSession, id=upload_id, user=request.user)
+
+        try:
+            UploadService.finalize(upload)
+        except UploadError as e:
+            upload.refresh_from_db()
+            if upload.status == UploadSession.Status.COMPLETED:
+                # A retry of a finalize that already succeeded
+                return _upload_response(upload)
+            return _error_response(e)
+        except (ValueError, DjangoValidationError) as e:
+            message = e.messages[0] if isinstance(e, DjangoValidationError) else str(e)
+            return Response({"error": message}, status=status.HTTP_400_BAD_REQUEST)
+
+        return _upload_response(upload, status.HTTP_201_CREATED)
+
+
+class MetricsView(APIView):
+    """
+    GET — metrics of every worker (summed through METRICS_MULTIPROCESS_DIR)
+    in Prometheus text format, including the per-stage latency histograms.
+    Scrapers authenticate with ``Authorization: Bearer <METRICS_TOKEN>``;
+    unset disables the endpoint.
+    """
+
+    authentication_classes = []
+    permission_classes = [HasMetricsToken]
+
+    def get(self, request):
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        if directory:
+            # Include this worker's latest values, not its last periodic write
+            write_state(directory)
+            metrics = MetricsRegistry.merge(read_states(directory))
+        else:
+            metrics = registry
+        return HttpResponse(
+            metrics.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
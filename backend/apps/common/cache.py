@@ -0,0 +1,91 @@
+"""
+File cache with atomic read-modify-write operations.
+
+Django's FileBasedCache implements ``add`` as has_key-then-set and
+``incr`` as get-then-set (which also resets the entry to the default
+timeout), so concurrent workers lose increments and can both win an
+``add``. The shared coordination state (circuit breaker, provider quota,
+single-flight locks) relies on both being atomic. This backend takes an
+exclusive lock on one lock file per cache directory around every write,
+which makes them atomic across the processes of one host; ``incr`` keeps
+the entry's expiry. Across hosts use Redis, where they are atomic.
+"""
+
+import os
+import pickle
+import tempfile
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+
+
+class LockingFileBasedCache(FileBasedCache):
+    """FileBasedCache whose writes are serialized by a per-directory file lock."""
+
+    lock_name = ".lock"
+
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), "ab") as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            if self.has_key(key, version):
+                return False
+            # Unlocked set: the lock is already held (flock does not nest)
+            FileBasedCache.set(self, key, value, timeout, version)
+            return True
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            super().set(key, value, timeout, version)
+
+    def delete(self, key, version=None):
+        with self._locked():
+            return super().delete(key, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().touch(key, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        fname = self._key_to_file(key, version)
+        with self._locked():
+            try:
+                with open(fname, "rb") as f:
+                    expired = self._is_expired(f)
+                    if not expired:
+                        f.seek(0)
+                        expiry = pickle.load(f)
+                        value = pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                expired = True
+            if expired:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            self._replace(fname, expiry, value)
+            return value
+
+    def _replace(self, fname: str, expiry, value) -> None:
+        """Write ``value`` with an absolute ``expiry`` (None = never)."""
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        renamed = False
+        try:
+            with open(fd, "wb") as f:
+                f.write(pickle.dumps(expiry, self.pickle_protocol))
+                f.write(zlib.compress(pickle.dumps(value, self.pickle_protocol)))
+            file_move_safe(tmp_path, fname, allow_overwrite=True)
+            renamed = True
+        finally:
+            if not renamed:
+                os.remove(tmp_path)
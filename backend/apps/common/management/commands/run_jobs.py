@@ -0,0 +1,78 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.audit.services.audit_partition_service import AuditPartitionService
+from apps.common.services.job_queue import JobQueue
+from apps.common.services.upload_service import UploadService
+
+
+class Command(BaseCommand):
+    help = "Drain the background job queue (triage inference and other async work)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kinds",
+            default="",
+            help="Comma-separated job kinds to process (default: all).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process queued jobs until the queue is empty, then exit.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=0,
+            help="Exit after processing this many jobs (0 = unlimited).",
+        )
+
+    def handle(self, *args, **options):
+        kinds = [k.strip() for k in options["kinds"].split(",") if k.strip()] or None
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        poll_interval = settings.JOB_POLL_INTERVAL_SECONDS
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(f"Job worker {worker_id} started (kinds: {kinds or 'all'})")
+
+        processed = 0
+        last_maintenance = 0.0
+        while not self._stopping:
+            close_old_connections()
+
+            if (
+                time.monotonic() - last_maintenance
+                > settings.JOB_LOCK_TIMEOUT_SECONDS / 2
+            ):
+                requeued = JobQueue.requeue_stale()
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale job(s)")
+                JobQueue.purge_finished()
+                UploadService.purge_expired()
+                AuditPartitionService.ensure_partitions()
+                last_maintenance = time.monotonic()
+
+            job = JobQueue.run_next(worker_id, kinds)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            processed += 1
+            if options["max_jobs"] and processed >= options["max_jobs"]:
+                break
+
+        self.stdout.write(f"Job worker {worker_id} stopped after {processed} job(s)")
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
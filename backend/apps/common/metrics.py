@@ -0,0 +1,369 @@
+"""
+Lightweight in-process metrics.
+
+Counters live in the worker process that recorded them. Services declare
+their metrics at import time via the module-level ``registry``, which can
+be rendered as JSON (``snapshot``) or Prometheus text (``render_prometheus``).
+
+Like prometheus_client's multiprocess mode, each gunicorn worker can
+periodically write its registry to a shared directory (``start_writer``);
+``read_states`` and ``MetricsRegistry.merge`` sum them so one scrape
+covers every worker. Counters and histograms of exited workers are kept,
+gauges only count live processes.
+"""
+
+import bisect
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help_text = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> list[tuple[dict, float]]:
+        with self._lock:
+            return [(dict(key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down (queue depth, in-flight requests)."""
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0,
+)
+
+
+class Histogram:
+    """Bucketed distribution of observed seconds, optionally split by labels."""
+
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(
+        self, name: str, help_text: str = "", buckets: tuple = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # labels → [per-bucket counts, sum, count]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Estimate the ``q`` quantile by interpolating within its bucket."""
+        with self._lock:
+            entry = self._values.get(tuple(sorted(labels.items())))
+            counts = list(entry[0]) if entry else None
+        return self._quantile(q, counts)
+
+    def samples(self) -> list[tuple[dict, dict]]:
+        with self._lock:
+            entries = [
+                (dict(key), list(e[0]), e[1], e[2]) for key, e in self._values.items()
+            ]
+        return [
+            (
+                labels,
+                {
+                    "count": count,
+                    "sum": round(total, 6),
+                    **{
+                        f"p{int(q * 100)}": self._quantile(q, counts)
+                        for q in self.QUANTILES
+                    },
+                },
+            )
+            for labels, counts, total, count in entries
+        ]
+
+    def bucket_samples(self) -> list[tuple[dict, list[tuple[float, int]], float, int]]:
+        """``(labels, [(upper bound, cumulative count)], sum, count)`` per label set."""
+        with self._lock:
+            entries = [
+                (dict(key), list(e[0]), e[1], e[2]) for key, e in self._values.items()
+            ]
+        results = []
+        for labels, counts, total, count in entries:
+            cumulative, running = [], 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                cumulative.append((bound, running))
+            results.append((labels, cumulative, total, count))
+        return results
+
+    def _quantile(self, q: float, counts: list[int] | None) -> float | None:
+        total = sum(counts) if counts else 0
+        if not total:
+            return None
+        rank = q * total
+        running, lower = 0, 0.0
+        for bound, n in zip(self.buckets, counts):
+            if n and running + n >= rank:
+                if math.isinf(bound):
+                    # Beyond the last finite bucket; report its upper bound
+                    return self.buckets[-2]
+                return round(lower + (bound - lower) * (rank - running) / n, 6)
+            running += n
+            lower = bound
+        return self.buckets[-2]
+
+
+class MetricsRegistry:
+    """Process-wide collection of named metrics."""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(
+        self, name: str, help_text: str = "", buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def state(self) -> dict:
+        """JSON-serializable raw values of every metric, for ``merge``."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        state = {}
+        for metric in metrics:
+            entry = {"kind": _kind(metric), "help": metric.help_text}
+            with metric._lock:
+                if isinstance(metric, Histogram):
+                    entry["buckets"] = list(metric.buckets[:-1])
+                    entry["values"] = [
+                        [list(key), list(e[0]), e[1], e[2]]
+                        for key, e in metric._values.items()
+                    ]
+                else:
+                    entry["values"] = [
+                        [list(key), value] for key, value in metric._values.items()
+                    ]
+            state[metric.name] = entry
+        return state
+
+    @classmethod
+    def merge(cls, states: list[dict]) -> "MetricsRegistry":
+        """A registry holding the sum of ``states`` (one per process)."""
+        merged = cls()
+        for state in states:
+            for name, entry in state.items():
+                if entry["kind"] == "histogram":
+                    metric = merged.histogram(
+                        name, entry["help"], tuple(entry["buckets"])
+                    )
+                    if list(metric.buckets[:-1]) != entry["buckets"]:
+                        # Written by a process running other bucket bounds
+                        continue
+                    for key, counts, total, count in entry["values"]:
+                        key = tuple(tuple(pair) for pair in key)
+                        values = metric._values.setdefault(
+                            key, [[0] * len(counts), 0.0, 0]
+                        )
+                        values[0] = [a + b for a, b in zip(values[0], counts)]
+                        values[1] += total
+                        values[2] += count
+                    continue
+                create = merged.gauge if entry["kind"] == "gauge" else merged.counter
+                metric = create(name, entry["help"])
+                for key, value in entry["values"]:
+                    metric.inc(value, **dict(key))
+        return merged
+
+    def snapshot(self) -> dict:
+        """Plain-dict view of every metric, for JSON status endpoints."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: [
+                {"labels": labels, "value": value}
+                for labels, value in metric.samples()
+            ]
+            for metric in metrics
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+
+        lines = []
+        for metric in metrics:
+            kind = _kind(metric)
+            if metric.help_text:
+                lines.append(f"# HELP {metric.name} {_escape(metric.help_text)}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+
+            if isinstance(metric, Histogram):
+                for labels, buckets, total, count in metric.bucket_samples():
+                    for bound, cumulative in buckets:
+                        le = "+Inf" if math.isinf(bound) else repr(bound)
+                        bucket_labels = _labels({**labels, "le": le})
+                        lines.append(
+                            f"{metric.name}_bucket{bucket_labels} {cumulative}"
+                        )
+                    lines.append(f"{metric.name}_sum{_labels(labels)} {total!r}")
+                    lines.append(f"{metric.name}_count{_labels(labels)} {count}")
+            else:
+                for labels, value in metric.samples():
+                    lines.append(f"{metric.name}{_labels(labels)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+def _kind(metric) -> str:
+    return {Histogram: "histogram", Gauge: "gauge"}.get(type(metric), "counter")
+
+
+def _escape(text, quotes: bool = False) -> str:
+    text = str(text).replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quotes else text
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value, quotes=True)}"'
+        for name, value in sorted(labels.items())
+    )
+    return "{" + pairs + "}"
+
+
+registry = MetricsRegistry()
+
+
+# ---------------------------------------------------------------------- #
+# Multi-process aggregation                                               #
+# ---------------------------------------------------------------------- #
+
+
+def write_state(directory: str, include_gauges: bool = True) -> None:
+    """Atomically write this process's ``registry`` to ``directory``/<pid>.json."""
+    state = registry.state()
+    if not include_gauges:
+        state = {
+            name: entry for name, entry in state.items() if entry["kind"] != "gauge"
+        }
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with open(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(directory, f"{os.getpid()}.json"))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_states(directory: str) -> list[dict]:
+    """Every process's last written state; gauges of dead processes are dropped."""
+    states = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return states
+    for name in names:
+        pid, ext = os.path.splitext(name)
+        if ext != ".json" or not pid.isdigit():
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if not _alive(int(pid)):
+            state = {n: entry for n, entry in state.items() if entry["kind"] != "gauge"}
+        states.append(state)
+    return states
+
+
+def clear_states(directory: str) -> None:
+    """Forget all written states (on server start, before workers boot)."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith((".json", ".tmp")):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def start_writer(directory: str, interval: float) -> threading.Thread:
+    """Write this process's state every ``interval`` seconds from a daemon thread."""
+
+    def run():
+        while True:
+            try:
+                write_state(directory)
+            except OSError as e:
+                logger.warning("Could not write metrics to %s: %s", directory, e)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="metrics-writer", daemon=True)
+    thread.start()
+    return thread
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
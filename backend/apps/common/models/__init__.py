@@ -1,4 +1,6 @@
 from apps.common.models.base import BaseModel
+from apps.common.models.job import Job
 from apps.common.models.mixins import AuditMixin
+from apps.common.models.upload import UploadSession
 
-__all__ = ["BaseModel", "AuditMixin"]
+__all__ = ["BaseModel", "AuditMixin", "Job", "UploadSession"]
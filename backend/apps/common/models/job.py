@@ -0,0 +1,50 @@
+from django.db import models
+from django.utils import timezone
+
+from apps.common.models.base import BaseModel
+from apps.common.models.mixins import AuditMixin
+
+
+class Job(BaseModel, AuditMixin):
+    """
+    A unit of background work in the database-backed job queue.
+    Drained by the ``run_jobs`` management command; ``kind`` selects
+    the handler from settings.JOB_HANDLERS.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    kind = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    priority = models.IntegerField(
+        default=0,
+        help_text="Higher priority jobs are claimed first.",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the job may be claimed (used for retry backoff).",
+    )
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta:
+        db_table = "jobs"
+        ordering = ["-priority", "available_at"]
+        indexes = [
+            models.Index(fields=["status", "-priority", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} — {self.kind} ({self.status})"
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import models
+
+from apps.common.models.base import BaseModel
+from apps.common.models.mixins import AuditMixin
+
+
+class UploadSession(BaseModel, AuditMixin):
+    """
+    A resumable, chunked file upload.
+
+    Bytes are appended to a temporary file as the client PUTs ranges;
+    ``received_bytes`` is the offset to resume from. On finalize the
+    assembled file is handed to the handler registered for ``purpose``
+    in settings.UPLOAD_HANDLERS.
+    """
+
+    class Status(models.TextChoices):
+        ACTIVE = "ACTIVE", "Active"
+        COMPLETED = "COMPLETED", "Completed"
+        ABORTED = "ABORTED", "Aborted"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+    )
+    purpose = models.CharField(max_length=50)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+    )
+    metadata = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Purpose-specific fields passed to the finalize handler.",
+    )
+    resource_id = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="ID of the document or image created on finalize.",
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "upload_sessions"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return (
+            f"Upload {self.id} — {self.filename} "
+            f"({self.received_bytes}/{self.total_size})"
+        )
@@ -1,4 +1,14 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardPagination(PageNumberPagination):
@@ -7,3 +17,102 @@ class StandardPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a unique ``(timestamp, id)`` key.
+
+    Each page is ``WHERE (ts, id) < (last ts, last id) ORDER BY ts, id
+    LIMIT n+1`` — an index range scan whatever the depth, with no COUNT
+    and no rows skipped or repeated when new rows arrive. The cursor is
+    an opaque token; views may set ``keyset_ordering`` to override
+    ``ordering`` (both fields must sort the same direction).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = getattr(view, "keyset_ordering", self.ordering)
+        fields = [name.lstrip("-") for name in ordering]
+        descending = ordering[0].startswith("-")
+
+        queryset = queryset.order_by(*ordering)
+        cursor = self.decode_cursor(request, queryset.model, fields)
+        if cursor is not None:
+            (first, second), (first_value, second_value) = fields, cursor
+            op = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{first}__{op}": first_value})
+                | Q(**{first: first_value, f"{second}__{op}": second_value})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        self.next_position = (
+            [getattr(page[-1], name) for name in fields] if self.has_next else None
+        )
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position),
+        )
+
+    @staticmethod
+    def encode_cursor(position: list) -> str:
+        payload = json.dumps([
+            value.isoformat() if hasattr(value, "isoformat") else str(value)
+            for value in position
+        ])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, model, fields: list[str]):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework.permissions import BasePermission
 
 
@@ -43,3 +46,14 @@ class IsAdmin(BasePermission):
             and request.user.is_authenticated
             and request.user.role == "ADMIN"
         )
+
+
+class HasMetricsToken(BasePermission):
+    """Allow scrapers presenting ``Authorization: Bearer <METRICS_TOKEN>``."""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        supplied = (
+            request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        )
+        return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
@@ -0,0 +1,88 @@
+"""
+Small in-process BM25 ranking.
+
+Picks the passages most relevant to a symptom description (entries of
+a patient's history, clinical guideline sections) without any network
+call. Indexes are cheap enough to build per request for a few hundred
+passages.
+"""
+
+import math
+import re
+from collections import Counter
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be been but by for from has have i in is it its "
+    "my of on or that the this to was were with no not".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Very light suffix stripping so "headaches"/"headache" match."""
+    for suffix in ("ing", "es", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        _stem(token)
+        for token in _TOKEN.findall((text or "").lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model-token count (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+class BM25:
+    """Okapi BM25 over a fixed list of passages, backed by an inverted index."""
+
+    def __init__(self, passages: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(passages)
+
+        # term → [(passage index, term frequency)]
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths = []
+        for i, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((i, tf))
+
+        avg_length = (sum(self._lengths) / self.size) if self.size else 0.0
+        self._norms = [
+            k1 * (1 - b + b * length / (avg_length or 1)) for length in self._lengths
+        ]
+        self._idf = {
+            term: math.log(
+                1 + (self.size - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for term, postings in self._postings.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        """One score per passage, in input order; 0.0 means no shared terms."""
+        results = [0.0] * self.size
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                results[i] += idf * tf * (self.k1 + 1) / (tf + self._norms[i])
+        return results
+
+    def top(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Up to ``k`` ``(index, score)`` pairs with a positive score, best first."""
+        ranked = sorted(
+            ((i, score) for i, score in enumerate(self.scores(query)) if score > 0),
+            key=lambda r: (-r[1], r[0]),
+        )
+        return ranked[:k]
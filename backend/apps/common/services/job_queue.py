@@ -0,0 +1,212 @@
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.common.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Database-backed background job queue.
+
+    Jobs are claimed with a conditional UPDATE so several workers can
+    drain the same table safely on both PostgreSQL and SQLite.
+    Handlers are ``Class.method`` dotted paths registered per kind in
+    settings.JOB_HANDLERS and receive the claimed Job instance. While a
+    handler runs its worker keeps refreshing the job's lock, so only
+    jobs whose worker died are ever taken over by requeue_stale().
+    """
+
+    @staticmethod
+    def enqueue(
+        kind: str,
+        payload: dict = None,
+        priority: int = 0,
+        user=None,
+        ip_address: str = None,
+        user_agent: str = "",
+        delay_seconds: float = 0,
+    ) -> Job:
+        """Queue a job for the given handler kind."""
+        if kind not in settings.JOB_HANDLERS:
+            raise ValueError(f"No job handler registered for '{kind}'.")
+
+        return Job.objects.create(
+            kind=kind,
+            payload=payload or {},
+            priority=priority,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            available_at=timezone.now() + timedelta(seconds=delay_seconds),
+            ip_address=ip_address,
+            user_agent=user_agent,
+            created_by=user,
+        )
+
+    @staticmethod
+    def enqueue_many(
+        kind: str,
+        payloads: list[dict],
+        user=None,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> list[Job]:
+        """Queue one job per payload for the given handler kind, in one insert."""
+        if kind not in settings.JOB_HANDLERS:
+            raise ValueError(f"No job handler registered for '{kind}'.")
+
+        now = timezone.now()
+        return Job.objects.bulk_create([
+            Job(
+                kind=kind,
+                payload=payload,
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+                available_at=now,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                created_by=user,
+            )
+            for payload in payloads
+        ])
+
+    @staticmethod
+    def claim(worker_id: str, kinds: list[str] = None) -> Job | None:
+        """Atomically take the highest-priority runnable job, if any."""
+        now = timezone.now()
+        qs = Job.objects.filter(status=Job.Status.QUEUED, available_at__lte=now)
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+
+        candidates = qs.order_by("-priority", "available_at").values_list(
+            "id", flat=True
+        )[:10]
+
+        for job_id in candidates:
+            claimed = Job.objects.filter(
+                id=job_id, status=Job.Status.QUEUED,
+            ).update(
+                status=Job.Status.RUNNING,
+                locked_at=now,
+                locked_by=worker_id,
+                attempts=F("attempts") + 1,
+                updated_at=now,
+            )
+            if claimed:
+                return Job.objects.get(id=job_id)
+        return None
+
+    @staticmethod
+    def run(job: Job) -> None:
+        """Execute a claimed job and record its outcome."""
+        cls_path, method = settings.JOB_HANDLERS[job.kind].rsplit(".", 1)
+        handler = getattr(import_string(cls_path), method)
+
+        try:
+            with JobQueue._keep_locked(job):
+                handler(job)
+        except Exception as e:
+            logger.exception(
+                "Job %s (%s) failed on attempt %d", job.id, job.kind, job.attempts
+            )
+            job.last_error = "".join(traceback.format_exception_only(type(e), e))[:2000]
+            job.locked_at = None
+            job.locked_by = ""
+            if job.attempts >= job.max_attempts:
+                job.status = Job.Status.FAILED
+            else:
+                job.status = Job.Status.QUEUED
+                job.available_at = timezone.now() + timedelta(seconds=2 ** job.attempts)
+            job.save(update_fields=[
+                "status", "last_error", "locked_at", "locked_by",
+                "available_at", "updated_at",
+            ])
+            return
+
+        job.status = Job.Status.DONE
+        job.locked_at = None
+        job.locked_by = ""
+        job.save(update_fields=["status", "locked_at", "locked_by", "updated_at"])
+
+    @staticmethod
+    def run_next(worker_id: str, kinds: list[str] = None) -> Job | None:
+        """Claim and run one job. Returns the job, or None if the queue is idle."""
+        job = JobQueue.claim(worker_id, kinds)
+        if job is not None:
+            JobQueue.run(job)
+        return job
+
+    @staticmethod
+    @contextmanager
+    def _keep_locked(job: Job):
+        """Refresh ``job``'s lock from a background thread while the block runs."""
+        stop = threading.Event()
+
+        def heartbeat():
+            try:
+                while not stop.wait(settings.JOB_LOCK_TIMEOUT_SECONDS / 3):
+                    try:
+                        Job.objects.filter(
+                            id=job.id,
+                            status=Job.Status.RUNNING,
+                            locked_by=job.locked_by,
+                        ).update(locked_at=timezone.now())
+                    except Exception:
+                        logger.exception("Could not refresh the lock of job %s", job.id)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(
+            target=heartbeat, name=f"job-heartbeat-{job.id}", daemon=True,
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    @staticmethod
+    def requeue_stale() -> int:
+        """
+        Return jobs held by crashed workers to the queue; those that have
+        used up their attempts (e.g. because they keep crashing their
+        worker) are marked FAILED instead. Returns the number requeued.
+        """
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+        stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff)
+
+        failed = stale.filter(attempts__gte=F("max_attempts")).update(
+            status=Job.Status.FAILED,
+            locked_at=None,
+            locked_by="",
+            last_error="The worker stopped responding on the last attempt.",
+            updated_at=now,
+        )
+        if failed:
+            logger.warning("Failed %d stale job(s) with no attempts left", failed)
+
+        return stale.update(
+            status=Job.Status.QUEUED,
+            locked_at=None,
+            locked_by="",
+            updated_at=now,
+        )
+
+    @staticmethod
+    def purge_finished() -> int:
+        """Delete completed jobs older than the retention window."""
+        cutoff = timezone.now() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+        deleted, _ = Job.objects.filter(
+            status=Job.Status.DONE, updated_at__lt=cutoff,
+        ).delete()
+        return deleted
@@ -0,0 +1,214 @@
+"""
+Resumable chunked uploads.
+
+Clients create an UploadSession, PUT consecutive byte ranges (each with
+its SHA-256) and then finalize. Chunks are streamed from the request
+into a temporary file on disk, so a worker never holds more than one
+read block of the upload in memory. Only a chunk whose checksum matches
+is copied into the upload's file, under the upload's row lock.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.common.models.upload import UploadSession
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_BYTES = 64 * 1024
+
+
+class UploadError(Exception):
+    """A chunk or finalize request the upload cannot accept."""
+
+    def __init__(self, message: str, offset: int = None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadOffsetMismatch(UploadError):
+    """The chunk does not start where the server expects; resume from ``offset``."""
+
+
+class UploadService:
+    """Lifecycle of resumable uploads; see settings.UPLOAD_HANDLERS."""
+
+    @staticmethod
+    def create(
+        user,
+        purpose: str,
+        filename: str,
+        total_size: int,
+        metadata: dict = None,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> UploadSession:
+        if purpose not in settings.UPLOAD_HANDLERS:
+            raise UploadError(f"Unknown upload purpose '{purpose}'.")
+        if total_size > settings.UPLOAD_MAX_SIZE_BYTES:
+            raise UploadError(
+                f"File must be smaller than {settings.UPLOAD_MAX_SIZE_BYTES} bytes."
+            )
+
+        upload = UploadSession.objects.create(
+            user=user,
+            purpose=purpose,
+            filename=os.path.basename(filename),
+            total_size=total_size,
+            metadata=metadata or {},
+            expires_at=timezone.now() + timedelta(hours=settings.UPLOAD_EXPIRY_HOURS),
+            ip_address=ip_address,
+            user_agent=user_agent,
+            created_by=user,
+        )
+        UploadService._temp_path(upload).touch()
+        return upload
+
+    @staticmethod
+    def write_chunk(
+        upload: UploadSession,
+        start: int,
+        end: int,
+        stream,
+        sha256: str,
+    ) -> UploadSession:
+        """
+        Append bytes ``start..end`` (inclusive) read from ``stream``.
+        A retried chunk that was already stored is acknowledged as-is.
+
+        The chunk is spooled and verified first; the upload's file is
+        only written with its row locked and the offset re-checked, so
+        racing requests for the same offset cannot clobber each other.
+        """
+        UploadService._ensure_active(upload)
+        length = end - start + 1
+        if length <= 0 or end >= upload.total_size:
+            raise UploadError("Invalid byte range.", upload.received_bytes)
+        if length > settings.UPLOAD_MAX_CHUNK_BYTES:
+            raise UploadError(
+                f"Chunks must be at most {settings.UPLOAD_MAX_CHUNK_BYTES} bytes.",
+                upload.received_bytes,
+            )
+        if end < upload.received_bytes:
+            return upload
+        if start != upload.received_bytes:
+            raise UploadOffsetMismatch(
+                "Chunk does not start at the current offset.", upload.received_bytes,
+            )
+
+        path = UploadService._temp_path(upload)
+        with tempfile.TemporaryFile(dir=path.parent) as chunk:
+            digest = hashlib.sha256()
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_BLOCK_BYTES, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                chunk.write(block)
+                remaining -= len(block)
+
+            if remaining or digest.hexdigest() != sha256.lower():
+                raise UploadError(
+                    (
+                        "Chunk was incomplete."
+                        if remaining
+                        else "Chunk checksum mismatch."
+                    ),
+                    upload.received_bytes,
+                )
+
+            chunk.seek(0)
+            with transaction.atomic():
+                # Another request may have raced us to the same offset
+                locked = UploadSession.objects.select_for_update().get(pk=upload.pk)
+                UploadService._ensure_active(locked)
+                if end < locked.received_bytes:
+                    upload.refresh_from_db()
+                    return upload
+                if start != locked.received_bytes:
+                    raise UploadOffsetMismatch(
+                        "Upload changed concurrently.", locked.received_bytes
+                    )
+                with open(path, "r+b") as f:
+                    f.seek(start)
+                    shutil.copyfileobj(chunk, f, READ_BLOCK_BYTES)
+                locked.received_bytes = end + 1
+                locked.save(update_fields=["received_bytes", "updated_at"])
+
+        upload.refresh_from_db()
+        return upload
+
+    @staticmethod
+    def finalize(upload: UploadSession):
+        """Hand the assembled file to the purpose handler and return its result."""
+        UploadService._ensure_active(upload)
+        if upload.received_bytes != upload.total_size:
+            raise UploadError("Upload is incomplete.", upload.received_bytes)
+
+        cls_path, method = settings.UPLOAD_HANDLERS[upload.purpose].rsplit(".", 1)
+        handler = getattr(import_string(cls_path), method)
+
+        path = UploadService._temp_path(upload)
+        with transaction.atomic():
+            # Concurrent finalize retries: only the first to lock the row
+            # runs the handler, the others see it completed
+            locked = UploadSession.objects.select_for_update().get(pk=upload.pk)
+            UploadService._ensure_active(locked)
+            with open(path, "rb") as f:
+                resource = handler(locked, File(f, name=locked.filename))
+
+            locked.status = UploadSession.Status.COMPLETED
+            locked.resource_id = str(resource.pk)
+            locked.save(update_fields=["status", "resource_id", "updated_at"])
+
+        upload.status, upload.resource_id = locked.status, locked.resource_id
+
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
+        return resource
+
+    @staticmethod
+    def abort(upload: UploadSession) -> None:
+        upload.status = UploadSession.Status.ABORTED
+        upload.save(update_fields=["status", "updated_at"])
+        UploadService._temp_path(upload).unlink(missing_ok=True)
+
+    @staticmethod
+    def purge_expired() -> int:
+        """Drop unfinished uploads past their expiry and their temp files."""
+        expired = UploadSession.objects.filter(
+            status=UploadSession.Status.ACTIVE, expires_at__lt=timezone.now(),
+        )
+        count = 0
+        for upload in expired:
+            UploadService.abort(upload)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _ensure_active(upload: UploadSession) -> None:
+        if upload.status != UploadSession.Status.ACTIVE:
+            raise UploadError(f"Upload is {upload.status.lower()}.")
+        if upload.expires_at < timezone.now():
+            raise UploadError("Upload has expired.")
+
+    @staticmethod
+    def _temp_path(upload: UploadSession) -> Path:
+        directory = Path(settings.UPLOAD_TEMP_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{upload.id}.part"
@@ -0,0 +1,121 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+The first caller for a key (the leader) takes a lock in the "shared"
+cache and runs the call; callers arriving while it runs (followers)
+wait and receive the leader's result instead of repeating the work.
+The result stays available for SINGLE_FLIGHT_WINDOW_SECONDS so a
+double-submit that lands just after the leader finished is answered
+too. Results must be small and picklable (e.g. a row id).
+
+If the leader fails, its lock is dropped without a result and the next
+waiter becomes the leader, so errors are never shared between callers.
+
+Leadership is decided by ``cache.add``, so the "shared" alias must make
+add atomic: Redis across hosts, or LockingFileBasedCache (the "file"
+backend) on one host. Django's plain FileBasedCache and per-worker
+"locmem" let two workers lead at once.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.common.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_POLL_INITIAL_SECONDS = 0.05
+_POLL_MAX_SECONDS = 0.5
+
+_calls = registry.counter(
+    "single_flight_calls_total",
+    "Single-flight calls by namespace and role (leader / follower / timeout).",
+)
+
+
+class SingleFlight:
+    """Cross-worker single-flight group for one kind of call."""
+
+    def __init__(
+        self, namespace: str, window_seconds: float = None, lock_seconds: float = None
+    ):
+        self.namespace = namespace
+        self.window_seconds = (
+            settings.SINGLE_FLIGHT_WINDOW_SECONDS
+            if window_seconds is None
+            else window_seconds
+        )
+        self.lock_seconds = (
+            settings.SINGLE_FLIGHT_LOCK_SECONDS
+            if lock_seconds is None
+            else lock_seconds
+        )
+
+    @property
+    def _cache(self):
+        return caches["shared"]
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Stable hash of the JSON-serialisable ``parts``."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def run(self, key: str, fn):
+        """Return ``fn()``, or the result of an identical call already in flight."""
+        lock_key = f"sf:{self.namespace}:{key}:lock"
+        result_key = f"sf:{self.namespace}:{key}:result"
+        give_up_at = time.monotonic() + self.lock_seconds
+        delay = _POLL_INITIAL_SECONDS
+
+        while True:
+            # Results are wrapped so a legitimate None is distinguishable from a miss
+            cached = self._cache.get(result_key)
+            if cached is not None:
+                _calls.inc(namespace=self.namespace, role="follower")
+                return cached["value"]
+
+            token = uuid.uuid4().hex
+            if self._cache.add(lock_key, token, timeout=self.lock_seconds):
+                # A leader may have finished between the result check and add()
+                cached = self._cache.get(result_key)
+                if cached is not None:
+                    self._unlock(lock_key, token)
+                    _calls.inc(namespace=self.namespace, role="follower")
+                    return cached["value"]
+                _calls.inc(namespace=self.namespace, role="leader")
+                return self._lead(lock_key, result_key, token, fn)
+
+            if time.monotonic() >= give_up_at:
+                # The leader is stuck; do the work rather than wait forever
+                logger.warning(
+                    "Single-flight %s: leader did not finish, running directly",
+                    self.namespace,
+                )
+                _calls.inc(namespace=self.namespace, role="timeout")
+                return fn()
+
+            time.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_SECONDS)
+
+    def _lead(self, lock_key: str, result_key: str, token: str, fn):
+        try:
+            value = fn()
+        except BaseException:
+            self._unlock(lock_key, token)
+            raise
+        if self.window_seconds > 0:
+            self._cache.set(result_key, {"value": value}, timeout=self.window_seconds)
+        self._unlock(lock_key, token)
+        return value
+
+    def _unlock(self, lock_key: str, token: str) -> None:
+        # Only drop our own lock; an expired one may have been re-taken
+        if self._cache.get(lock_key) == token:
+            self._cache.delete(lock_key)
@@ -0,0 +1,63 @@
+import pickle
+import shutil
+import tempfile
+import threading
+
+from django.test import SimpleTestCase
+
+from apps.common.cache import LockingFileBasedCache
+
+
+def _concurrently(fn, threads: int = 8) -> list:
+    results = [None] * threads
+    start = threading.Barrier(threads)
+
+    def run(i):
+        start.wait()
+        results[i] = fn()
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+class LockingFileBasedCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.cache = LockingFileBasedCache(directory, {})
+
+    def test_only_one_concurrent_add_wins(self):
+        results = _concurrently(lambda: self.cache.add("leader", 1, timeout=60))
+
+        self.assertEqual(results.count(True), 1)
+
+    def test_concurrent_increments_are_not_lost(self):
+        self.cache.set("counter", 0, timeout=60)
+
+        def increment():
+            for _ in range(25):
+                self.cache.incr("counter")
+
+        _concurrently(increment)
+
+        self.assertEqual(self.cache.get("counter"), 200)
+
+    def test_incr_keeps_the_expiry(self):
+        self.cache.set("counter", 0, timeout=60)
+        path = self.cache._key_to_file("counter")
+        with open(path, "rb") as f:
+            expiry = pickle.load(f)
+
+        self.cache.incr("counter", 5)
+
+        with open(path, "rb") as f:
+            self.assertEqual(pickle.load(f), expiry)
+        self.assertEqual(self.cache.get("counter"), 5)
+
+    def test_incr_of_a_missing_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.common.models.job import Job
+from apps.common.services.job_queue import JobQueue
+
+HANDLERS = {"test.slow": "apps.common.tests.test_job_queue.SlowHandler.run"}
+
+
+class SlowHandler:
+    requeued = None
+
+    @staticmethod
+    def run(job):
+        # Outlive the lock timeout, then let maintenance look for stale jobs
+        time.sleep(0.5)
+        SlowHandler.requeued = JobQueue.requeue_stale()
+
+
+@override_settings(JOB_HANDLERS=HANDLERS)
+class RequeueStaleTests(TestCase):
+    def _stale_job(self, attempts_left: int) -> Job:
+        job = JobQueue.enqueue("test.slow")
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.RUNNING,
+            attempts=job.max_attempts - attempts_left,
+            locked_by="dead-worker",
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        return job
+
+    def test_stale_job_with_attempts_left_is_requeued(self):
+        job = self._stale_job(attempts_left=1)
+
+        self.assertEqual(JobQueue.requeue_stale(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.locked_by, "")
+
+    def test_stale_job_without_attempts_left_fails(self):
+        job = self._stale_job(attempts_left=0)
+
+        self.assertEqual(JobQueue.requeue_stale(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertTrue(job.last_error)
+
+
+@override_settings(JOB_HANDLERS=HANDLERS, JOB_LOCK_TIMEOUT_SECONDS=0.3)
+class JobLockHeartbeatTests(TransactionTestCase):
+    def test_running_job_is_not_requeued(self):
+        JobQueue.enqueue("test.slow")
+
+        job = JobQueue.run_next("worker-1")
+
+        self.assertEqual(SlowHandler.requeued, 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.attempts, 1)
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.common.singleflight import SingleFlight
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "singleflight-tests",
+    },
+}
+
+
+def _run_in_threads(targets) -> None:
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@override_settings(CACHES=LOCMEM)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.group = SingleFlight("test", window_seconds=5, lock_seconds=5)
+
+    def test_followers_receive_the_leaders_result(self):
+        calls = []
+        results = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        _run_in_threads([lambda: results.append(self.group.run("k", work))] * 5)
+
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        # A late double-submit inside the window is answered too
+        self.assertEqual(self.group.run("k", work), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_a_none_result_is_shared(self):
+        self.assertIsNone(self.group.run("k", lambda: None))
+        self.assertIsNone(self.group.run("k", lambda: "recomputed"))
+
+    def test_leader_exception_is_not_shared_with_followers(self):
+        leading = threading.Event()
+        release = threading.Event()
+        calls = []
+        errors = []
+        results = []
+
+        def work():
+            calls.append(1)
+            if len(calls) == 1:
+                leading.set()
+                release.wait()
+                raise ValueError("leader failed")
+            return "value"
+
+        def leader():
+            try:
+                self.group.run("k", work)
+            except ValueError as exc:
+                errors.append(exc)
+
+        def follower():
+            results.append(self.group.run("k", work))
+
+        leader_thread = threading.Thread(target=leader)
+        leader_thread.start()
+        leading.wait()
+        followers = [threading.Thread(target=follower) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        leader_thread.join()
+        for thread in followers:
+            thread.join()
+
+        self.assertEqual(len(errors), 1)
+        # One follower took over the lead; the others got its result
+        self.assertEqual(results, ["value"] * 3)
+        self.assertEqual(len(calls), 2)
+
+    def test_follower_runs_directly_when_the_leader_is_stuck(self):
+        group = SingleFlight("test", window_seconds=5, lock_seconds=0.2)
+        caches["shared"].add("sf:test:k:lock", "someone-else", timeout=60)
+
+        self.assertEqual(group.run("k", lambda: "direct"), "direct")
+
+    def test_zero_window_keeps_no_result(self):
+        group = SingleFlight("test", window_seconds=0, lock_seconds=5)
+
+        self.assertEqual(group.run("k", lambda: 1), 1)
+        self.assertEqual(group.run("k", lambda: 2), 2)
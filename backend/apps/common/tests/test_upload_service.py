@@ -0,0 +1,61 @@
+import hashlib
+import io
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from apps.common.models.upload import UploadSession
+from apps.common.services.upload_service import UploadError, UploadService
+from apps.users.models import User
+
+DATA = b"0123456789" * 10
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class UploadWriteChunkTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        settings = override_settings(UPLOAD_TEMP_DIR=self.temp_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        user = User.objects.create_user(
+            email="patient@example.com", password="pw12345!x",
+            first_name="A", last_name="B",
+        )
+        self.upload = UploadService.create(user, "document", "notes.txt", len(DATA))
+
+    def _stale_copy(self) -> UploadSession:
+        return UploadSession.objects.get(pk=self.upload.pk)
+
+    def _stored(self) -> bytes:
+        return UploadService._temp_path(self.upload).read_bytes()
+
+    def test_losing_bad_chunk_keeps_the_winners_bytes(self):
+        loser = self._stale_copy()
+        chunk = DATA[:50]
+        UploadService.write_chunk(self.upload, 0, 49, io.BytesIO(chunk), _sha(chunk))
+
+        with self.assertRaises(UploadError):
+            UploadService.write_chunk(loser, 0, 49, io.BytesIO(b"x" * 50), _sha(chunk))
+
+        self.assertEqual(self._stored(), chunk)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.received_bytes, 50)
+
+    def test_losing_duplicate_chunk_is_acknowledged(self):
+        loser = self._stale_copy()
+        chunk = DATA[:50]
+        UploadService.write_chunk(self.upload, 0, 49, io.BytesIO(chunk), _sha(chunk))
+
+        acknowledged = UploadService.write_chunk(
+            loser, 0, 49, io.BytesIO(chunk), _sha(chunk),
+        )
+
+        self.assertEqual(acknowledged.received_bytes, 50)
+        self.assertEqual(self._stored(), chunk)
@@ -0,0 +1,103 @@
+"""
+Per-stage latency spans.
+
+``span("gemini.call")`` times a block and records it in the
+``pipeline_stage_seconds`` histogram (p50/p95/p99 per stage on the
+status and Prometheus endpoints). Inside a ``trace(...)`` that was
+sampled (TRACE_SAMPLE_RATE), the spans are also collected so the
+request can store its own breakdown, e.g. in ``TriageResult.timings``.
+
+The active trace is a context variable: spans in worker threads (batch
+inference) feed the histograms but not the request's trace.
+"""
+
+import functools
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from apps.common.metrics import registry
+
+_stage_seconds = registry.histogram(
+    "pipeline_stage_seconds",
+    "Wall-clock time per pipeline stage.",
+)
+
+_current: ContextVar["Trace | None"] = ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """Spans recorded for one sampled request."""
+
+    def __init__(self, name: str, sampled: bool):
+        self.name = name
+        self.sampled = sampled
+        self.spans: list[tuple[str, float]] = []
+        self._started = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        """
+        ``{"trace", "elapsed_ms", "spans": [{"stage", "ms"}]}``, spans in
+        completion order.
+        """
+        return {
+            "trace": self.name,
+            "elapsed_ms": round((time.perf_counter() - self._started) * 1000, 1),
+            "spans": [{"stage": stage, "ms": round(ms, 1)} for stage, ms in self.spans],
+        }
+
+
+def current_trace() -> Trace | None:
+    """The active trace if it is sampled, else None."""
+    active = _current.get()
+    return active if active is not None and active.sampled else None
+
+
+@contextmanager
+def trace(name: str, sample_rate: float = None):
+    """
+    Time a whole request as stage ``name``. Nested traces join the
+    outer one, so a service can open a trace whether or not its caller did.
+    """
+    active = _current.get()
+    if active is not None:
+        with span(name):
+            yield active
+        return
+
+    rate = settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    new = Trace(name, sampled=random.random() < rate)
+    token = _current.set(new)
+    try:
+        with span(name):
+            yield new
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block as ``stage``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _stage_seconds.observe(elapsed, stage=stage)
+        active = _current.get()
+        if active is not None and active.sampled:
+            active.spans.append((stage, elapsed * 1000))
+
+
+def timed(stage: str):
+    """Decorator form of ``span``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -75,6 +75,10 @@ class MedicalDocumentSerializer(serializers.ModelSerializer):
             "original_filename",
             "file_size",
             "extracted_text",
+            "extraction_status",
+            "extraction_pages",
+            "extraction_duration_ms",
+            "extraction_completed_at",
             "created_at",
         ]
         read_only_fields = fields
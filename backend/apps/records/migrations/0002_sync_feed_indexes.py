@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="medicaldocument",
+            index=models.Index(
+                fields=["user", "updated_at", "id"],
+                name="records_med_user_id_77c5f1_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="medicalrecord",
+            index=models.Index(
+                fields=["user", "updated_at", "id"],
+                name="records_med_user_id_2e1847_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:40
+
+import django.db.models.deletion
+import encrypted_model_fields.fields
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0002_sync_feed_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MedicalContextSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_deleted", models.BooleanField(db_index=True, default=False)),
+                (
+                    "context",
+                    encrypted_model_fields.fields.EncryptedTextField(
+                        blank=True,
+                        default="",
+                        help_text="Assembled context string as injected into the prompt.",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="SHA-256 of the context, for cache keys and change checks.",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "fragments",
+                    encrypted_model_fields.fields.EncryptedTextField(
+                        blank=True,
+                        default="",
+                        help_text="JSON per-record and per-document rendered fragments.",
+                    ),
+                ),
+                ("format_version", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_created",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "updated_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(class)s_updated",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="medical_context_snapshot",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "medical_context_snapshots",
+            },
+        ),
+    ]
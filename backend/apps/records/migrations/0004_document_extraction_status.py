@@ -0,0 +1,78 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:41
+
+from django.db import migrations, models
+
+
+UPDATE_BATCH = 1000
+
+
+def mark_existing_pdfs_extracted(apps, schema_editor):
+    # PDFs uploaded before background extraction were extracted inline;
+    # only those that yielded text count as extracted (the text is
+    # encrypted, so it is checked here rather than in SQL)
+    MedicalDocument = apps.get_model("records", "MedicalDocument")
+    pdfs = MedicalDocument.objects.filter(original_filename__iendswith=".pdf")
+    extracted, failed = [], []
+    for doc in pdfs.only("id", "extracted_text").iterator(chunk_size=UPDATE_BATCH):
+        (extracted if (doc.extracted_text or "").strip() else failed).append(doc.id)
+
+    def update(ids, **fields):
+        for offset in range(0, len(ids), UPDATE_BATCH):
+            batch = ids[offset:offset + UPDATE_BATCH]
+            MedicalDocument.objects.filter(id__in=batch).update(**fields)
+
+    update(extracted, extraction_status="COMPLETED")
+    update(
+        failed,
+        extraction_status="FAILED",
+        extraction_error="No text was extracted when the document was uploaded.",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("records", "0003_medicalcontextsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="medicaldocument",
+            name="extraction_completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="medicaldocument",
+            name="extraction_duration_ms",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="medicaldocument",
+            name="extraction_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="medicaldocument",
+            name="extraction_pages",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Pages read before the text cap was reached."
+            ),
+        ),
+        migrations.AddField(
+            model_name="medicaldocument",
+            name="extraction_status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("PROCESSING", "Processing"),
+                    ("COMPLETED", "Completed"),
+                    ("FAILED", "Failed"),
+                    ("SKIPPED", "Skipped"),
+                ],
+                default="SKIPPED",
+                help_text="Background text extraction state (PDFs only).",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(mark_existing_pdfs_extracted, migrations.RunPython.noop),
+    ]
@@ -1 +1,2 @@
+from apps.records.models.context_snapshot import MedicalContextSnapshot
 from apps.records.models.medical_record import MedicalDocument, MedicalRecord
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db import models
+
+from apps.common.encryption import EncryptedTextField
+from apps.common.models.base import BaseModel
+
+
+class MedicalContextSnapshot(BaseModel):
+    """
+    Materialized AI prompt context for one patient.
+
+    Kept up to date by the records service layer: a record or document
+    change re-renders only that item's fragment, so inference reads the
+    assembled context with a single lookup instead of re-querying and
+    decrypting every record.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="medical_context_snapshot",
+    )
+    context = EncryptedTextField(
+        blank=True,
+        default="",
+        help_text="Assembled context string as injected into the prompt.",
+    )
+    digest = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 of the context, for cache keys and change checks.",
+    )
+    fragments = EncryptedTextField(
+        blank=True,
+        default="",
+        help_text="JSON per-record and per-document rendered fragments.",
+    )
+    format_version = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = "medical_context_snapshots"
+
+    def __str__(self):
+        return f"Medical context for {self.user_id} ({self.digest[:8]})"
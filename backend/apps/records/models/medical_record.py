@@ -79,6 +79,7 @@ class MedicalRecord(BaseModel):
         indexes = [
             models.Index(fields=["user", "record_type"]),
             models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["user", "updated_at", "id"]),
         ]
 
     def __str__(self):
@@ -100,6 +101,13 @@ class MedicalDocument(BaseModel):
         INSURANCE = "INSURANCE", "Insurance Document"
         OTHER = "OTHER", "Other"
 
+    class ExtractionStatus(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        PROCESSING = "PROCESSING", "Processing"
+        COMPLETED = "COMPLETED", "Completed"
+        FAILED = "FAILED", "Failed"
+        SKIPPED = "SKIPPED", "Skipped"
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -129,9 +137,25 @@ class MedicalDocument(BaseModel):
         default=0,
         help_text="File size in bytes.",
     )
+    extraction_status = models.CharField(
+        max_length=20,
+        choices=ExtractionStatus.choices,
+        default=ExtractionStatus.SKIPPED,
+        help_text="Background text extraction state (PDFs only).",
+    )
+    extraction_pages = models.PositiveIntegerField(
+        default=0,
+        help_text="Pages read before the text cap was reached.",
+    )
+    extraction_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    extraction_completed_at = models.DateTimeField(null=True, blank=True)
+    extraction_error = models.TextField(blank=True, default="")
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "updated_at", "id"]),
+        ]
 
     def __str__(self):
         return f"{self.document_type}: {self.original_filename}"
@@ -0,0 +1,387 @@
+"""
+Medical Context Snapshots
+
+Maintains one MedicalContextSnapshot per patient. Each record and
+document is rendered to a text fragment once, when it changes; the
+prompt context is re-assembled from the stored fragments, so reads are a
+single indexed lookup and writes only decrypt the row that changed.
+
+For triage prompts the fragments (records, plus documents split into
+chunks) are ranked against the reported symptoms with BM25 and packed
+into a token budget, so relevant history is never cut off behind
+unrelated text.
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.common.search import BM25, estimate_tokens
+
+from apps.records.models.context_snapshot import MedicalContextSnapshot
+from apps.records.models.medical_record import MedicalDocument, MedicalRecord
+
+logger = logging.getLogger(__name__)
+
+# Bump when fragment rendering or assembly changes; stale snapshots are
+# rebuilt on their next read or write.
+FORMAT_VERSION = 2
+
+MAX_CONTEXT_CHARS = 10000
+# Documents shown in the unranked summary, and characters of each
+MAX_DOCUMENTS = 5
+MAX_DOCUMENT_CHARS = 2000
+# Newest documents kept (chunked) in the snapshot for ranking
+MAX_INDEXED_DOCUMENTS = 20
+
+# Columns written on every rebuild
+SNAPSHOT_FIELDS = ("context", "digest", "fragments", "format_version")
+
+
+class ContextSnapshotService:
+    """Read and incrementally maintain per-patient medical context."""
+
+    @staticmethod
+    def get_context(user) -> str:
+        snapshot = MedicalContextSnapshot.objects.filter(user=user).first()
+        if snapshot is None or snapshot.format_version != FORMAT_VERSION:
+            snapshot = ContextSnapshotService.rebuild(user)
+        return snapshot.context
+
+    @staticmethod
+    def get_contexts(users) -> dict:
+        """``{user_id: context}`` for many users with one lookup."""
+        return {
+            uid: fields["context"]
+            for uid, fields in ContextSnapshotService._load(users).items()
+        }
+
+    @staticmethod
+    def get_relevant_context(user, query: str, token_budget: int = None) -> str:
+        """
+        Context for a triage prompt: allergies always, then the records
+        and document chunks most relevant to ``query``, within the budget.
+        """
+        return ContextSnapshotService.get_relevant_contexts(
+            [(user, query)], token_budget,
+        )[0]
+
+    @staticmethod
+    def get_relevant_contexts(
+        requests: list[tuple], token_budget: int = None
+    ) -> list[str]:
+        """Batch variant of get_relevant_context() for ``(user, query)`` pairs."""
+        loaded = ContextSnapshotService._load(
+            {user.id: user for user, _ in requests}.values()
+        )
+        return [
+            ContextSnapshotService.pack(
+                json.loads(loaded[user.id]["fragments"]), query, token_budget,
+            )
+            for user, query in requests
+        ]
+
+    @staticmethod
+    def pack(fragments: dict, query: str, token_budget: int = None) -> str:
+        """Select fragments by BM25 relevance to ``query`` until the budget is spent."""
+        if not (query or "").strip():
+            return ContextSnapshotService._assemble(fragments)
+        budget = token_budget or settings.MEDICAL_CONTEXT_TOKEN_BUDGET
+
+        # (pinned, record key | (document key, chunk index), text)
+        passages = [
+            (
+                f["type"] == MedicalRecord.RecordType.ALLERGY,
+                key,
+                f"{f['label']}: {f['text']}",
+            )
+            for key, f in fragments["records"].items()
+        ]
+        for key, doc in fragments["documents"].items():
+            passages.extend(
+                (False, (key, i), f"{doc['heading']}\n{chunk}")
+                for i, chunk in enumerate(doc["chunks"])
+            )
+        if not passages:
+            return ""
+
+        scores = BM25([text for _, _, text in passages]).scores(query)
+        # Allergies first, then by relevance; unmatched records fill any
+        # remaining room but unmatched document chunks never do
+        ranked = sorted(
+            (
+                (pinned, score, i)
+                for i, ((pinned, key, _), score) in enumerate(zip(passages, scores))
+                if pinned or score > 0 or isinstance(key, str)
+            ),
+            key=lambda r: (not r[0], -r[1], r[2]),
+        )
+
+        used = 0
+        records, chunks = {}, {}
+        for _, _, i in ranked:
+            _, key, text = passages[i]
+            cost = estimate_tokens(text)
+            if used + cost > budget:
+                continue
+            used += cost
+            if isinstance(key, str):
+                records[key] = fragments["records"][key]
+            else:
+                chunks.setdefault(key[0], []).append(key[1])
+
+        selected = {
+            "records": records,
+            "documents": {
+                key: {
+                    **fragments["documents"][key],
+                    "chunks": [
+                        fragments["documents"][key]["chunks"][i] for i in sorted(idx)
+                    ],
+                }
+                for key, idx in chunks.items()
+            },
+        }
+        logger.debug(
+            "Packed %d of %d context passages (~%d tokens)",
+            len(records) + sum(len(idx) for idx in chunks.values()),
+            len(passages),
+            used,
+        )
+        return ContextSnapshotService._assemble(
+            selected, max_documents=None, document_chars=None, max_chars=None,
+        )
+
+    @staticmethod
+    def rebuild(user) -> MedicalContextSnapshot:
+        """Render every fragment for a user from scratch."""
+        fragments = ContextSnapshotService._render_all([user.id])[user.id]
+        snapshot, _ = MedicalContextSnapshot.objects.update_or_create(
+            user=user,
+            defaults=ContextSnapshotService._snapshot_fields(fragments),
+        )
+        return snapshot
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_many(users) -> dict:
+        """Rebuild several users' snapshots from two queries; ``{user_id: fields}``."""
+        user_ids = [u.id for u in users]
+        fields = {
+            uid: ContextSnapshotService._snapshot_fields(fragments)
+            for uid, fragments in ContextSnapshotService._render_all(user_ids).items()
+        }
+        # Upsert: a concurrent first inference may insert the same users' rows
+        MedicalContextSnapshot.objects.bulk_create(
+            [
+                MedicalContextSnapshot(user_id=uid, **values)
+                for uid, values in fields.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=[*SNAPSHOT_FIELDS, "updated_at"],
+        )
+        return fields
+
+    @staticmethod
+    @transaction.atomic
+    def record_changed(record: MedicalRecord) -> None:
+        """Re-render one record's fragment after a create, update or delete."""
+        snapshot = ContextSnapshotService._locked_snapshot(record.user)
+        if snapshot is None:
+            ContextSnapshotService.rebuild(record.user)
+            return
+
+        fragments = json.loads(snapshot.fragments)
+        if record.is_deleted:
+            fragments["records"].pop(str(record.id), None)
+        else:
+            fragments["records"][str(record.id)] = (
+                ContextSnapshotService._render_record(record)
+            )
+        ContextSnapshotService._save(snapshot, fragments)
+
+    @staticmethod
+    @transaction.atomic
+    def document_changed(document: MedicalDocument) -> None:
+        """Add a new document's fragment, keeping the newest indexed ones."""
+        snapshot = ContextSnapshotService._locked_snapshot(document.user)
+        if snapshot is None or document.is_deleted:
+            # A removed document may let an older one back in; start over
+            ContextSnapshotService.rebuild(document.user)
+            return
+
+        if not document.extracted_text:
+            return
+
+        fragments = json.loads(snapshot.fragments)
+        documents = fragments["documents"]
+        documents[str(document.id)] = ContextSnapshotService._render_document(document)
+        newest = sorted(
+            documents.items(), key=lambda kv: kv[1]["created_at"], reverse=True
+        )
+        fragments["documents"] = dict(newest[:MAX_INDEXED_DOCUMENTS])
+        ContextSnapshotService._save(snapshot, fragments)
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _load(users) -> dict:
+        """``{user_id: {"context", "fragments"}}``, rebuilding missing or stale rows."""
+        users = list(users)
+        loaded = {
+            s.user_id: {"context": s.context, "fragments": s.fragments}
+            for s in MedicalContextSnapshot.objects.filter(
+                user_id__in=[u.id for u in users],
+                format_version=FORMAT_VERSION,
+            )
+        }
+        missing = [u for u in users if u.id not in loaded]
+        if missing:
+            loaded.update(ContextSnapshotService.rebuild_many(missing))
+        return loaded
+
+    @staticmethod
+    def _locked_snapshot(user) -> MedicalContextSnapshot | None:
+        snapshot = (
+            MedicalContextSnapshot.objects.select_for_update()
+            .filter(user=user)
+            .first()
+        )
+        if snapshot is None or snapshot.format_version != FORMAT_VERSION:
+            return None
+        return snapshot
+
+    @staticmethod
+    def _save(snapshot: MedicalContextSnapshot, fragments: dict) -> None:
+        for field, value in ContextSnapshotService._snapshot_fields(fragments).items():
+            setattr(snapshot, field, value)
+        snapshot.save()
+
+    @staticmethod
+    def _snapshot_fields(fragments: dict) -> dict:
+        """Values of SNAPSHOT_FIELDS for ``fragments``."""
+        context = ContextSnapshotService._assemble(fragments)
+        return {
+            "context": context,
+            "digest": hashlib.sha256(context.encode()).hexdigest(),
+            "fragments": json.dumps(fragments),
+            "format_version": FORMAT_VERSION,
+        }
+
+    @staticmethod
+    def _render_all(user_ids: list) -> dict:
+        """``{user_id: fragments}`` rendered from two queries."""
+        fragments = {uid: {"records": {}, "documents": {}} for uid in user_ids}
+
+        for r in MedicalRecord.objects.filter(user_id__in=user_ids, is_deleted=False):
+            fragments[r.user_id]["records"][str(r.id)] = (
+                ContextSnapshotService._render_record(r)
+            )
+
+        for doc in MedicalDocument.objects.filter(
+            user_id__in=user_ids, is_deleted=False,
+        ).order_by("-created_at"):
+            documents = fragments[doc.user_id]["documents"]
+            if len(documents) < MAX_INDEXED_DOCUMENTS and doc.extracted_text:
+                documents[str(doc.id)] = ContextSnapshotService._render_document(doc)
+
+        return fragments
+
+    @staticmethod
+    def _render_record(r: MedicalRecord) -> dict:
+        line = f"- {r.title}"
+        if r.status:
+            line += f" (Status: {r.status})"
+        if r.severity:
+            line += f" [Severity: {r.severity}]"
+        if r.date_recorded:
+            line += f" — {r.date_recorded}"
+        lines = [line]
+
+        if r.description:
+            lines.append(f"  Details: {r.description[:500]}")
+
+        if r.data:
+            for key, val in r.data.items():
+                lines.append(f"  {key}: {val}")
+
+        return {
+            "type": r.record_type,
+            "label": r.get_record_type_display(),
+            "date": r.date_recorded.isoformat() if r.date_recorded else "",
+            "text": "\n".join(lines),
+        }
+
+    @staticmethod
+    def _render_document(doc: MedicalDocument) -> dict:
+        return {
+            "created_at": doc.created_at.isoformat(),
+            "heading": (
+                f"### {doc.original_filename} ({doc.get_document_type_display()})"
+            ),
+            "chunks": ContextSnapshotService._chunk(doc.extracted_text),
+        }
+
+    @staticmethod
+    def _chunk(text: str) -> list[str]:
+        """Split text into ~MEDICAL_CONTEXT_CHUNK_CHARS pieces on paragraph breaks."""
+        size = settings.MEDICAL_CONTEXT_CHUNK_CHARS
+        chunks, current = [], ""
+        for paragraph in text.split("\n\n"):
+            paragraph = paragraph.strip()
+            while len(paragraph) > size:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(paragraph[:size])
+                paragraph = paragraph[size:]
+            if current and len(current) + len(paragraph) + 2 > size:
+                chunks.append(current)
+                current = ""
+            if paragraph:
+                current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _assemble(
+        fragments: dict,
+        max_documents: int | None = MAX_DOCUMENTS,
+        document_chars: int | None = MAX_DOCUMENT_CHARS,
+        max_chars: int | None = MAX_CONTEXT_CHARS,
+    ) -> str:
+        """Group records by type (newest first), then append documents."""
+        records = list(fragments["records"].values())
+        if not records and not fragments["documents"]:
+            return ""
+
+        records.sort(key=lambda f: f["date"], reverse=True)
+        records.sort(key=lambda f: f["type"])
+
+        sections = []
+        current_type = None
+        for f in records:
+            if f["type"] != current_type:
+                current_type = f["type"]
+                sections.append(f"\n## {f['label']}")
+            sections.append(f["text"])
+
+        documents = sorted(
+            fragments["documents"].values(),
+            key=lambda f: f["created_at"],
+            reverse=True,
+        )[:max_documents]
+        if documents:
+            sections.append("\n## Uploaded Medical Documents")
+            for f in documents:
+                text = "\n\n".join(f["chunks"])
+                sections.append(f"\n{f['heading']}\n{text[:document_chars]}")
+
+        return "\n".join(sections)[:max_chars]
@@ -0,0 +1,77 @@
+"""
+PDF text extraction off the request path.
+
+Parsing runs in a per-process ProcessPoolExecutor so a large upload
+neither blocks a web worker nor holds the GIL of the job worker. Pages
+are read lazily from the stored file and parsing stops as soon as the
+character cap is reached.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+def extract_pdf_text(source, max_chars: int) -> tuple[str, int]:
+    """
+    Return ``(text, pages_read)`` for a PDF path or binary file object.
+    Module-level so it can be pickled into pool processes.
+    """
+    from PyPDF2 import PdfReader
+
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return extract_pdf_text(f, max_chars)
+
+    reader = PdfReader(source)
+    parts = []
+    length = 0
+    pages = 0
+    for page in reader.pages:
+        pages += 1
+        page_text = (page.extract_text() or "").strip()
+        if page_text:
+            parts.append(page_text)
+            length += len(page_text) + 2
+        if length >= max_chars:
+            break
+    return "\n\n".join(parts)[:max_chars], pages
+
+
+class PdfExtractionPool:
+    """Lazily started process pool, one per worker process."""
+
+    _lock = threading.Lock()
+    _executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def extract(cls, file_name: str) -> tuple[str, int]:
+        """Extract a stored document's text, waiting at most the configured timeout."""
+        max_chars = settings.PDF_EXTRACTION_MAX_CHARS
+        try:
+            path = default_storage.path(file_name)
+        except NotImplementedError:
+            # Remote storage: stream it through this process instead
+            with default_storage.open(file_name, "rb") as f:
+                return extract_pdf_text(f, max_chars)
+
+        future = cls._pool().submit(extract_pdf_text, path, max_chars)
+        return future.result(timeout=settings.PDF_EXTRACTION_TIMEOUT_SECONDS)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def _pool(cls) -> ProcessPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=settings.PDF_EXTRACTION_PROCESSES,
+                )
+            return cls._executor
@@ -1,10 +1,15 @@
-import io
 import logging
+import time
 
 from django.db import transaction
+from django.utils import timezone
 
 from apps.audit.services.audit_service import AuditService
+from apps.common.services.job_queue import JobQueue
+from apps.common.tracing import timed
 from apps.records.models.medical_record import MedicalDocument, MedicalRecord
+from apps.records.services.context_snapshot_service import ContextSnapshotService
+from apps.records.services.pdf_extraction import PdfExtractionPool
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +47,7 @@ class RecordService:
             data=data or {},
             created_by=user,
         )
+        ContextSnapshotService.record_changed(record)
 
         AuditService.log_action(
             user_id=str(user.id),
@@ -75,6 +81,7 @@ class RecordService:
 
         record.updated_by = user
         record.save()
+        ContextSnapshotService.record_changed(record)
 
         AuditService.log_action(
             user_id=str(user.id),
@@ -97,6 +104,7 @@ class RecordService:
     ) -> None:
         record.is_deleted = True
         record.save(update_fields=["is_deleted", "updated_at"])
+        ContextSnapshotService.record_changed(record)
 
         AuditService.log_action(
             user_id=str(user.id),
@@ -138,9 +146,11 @@ class RecordService:
         ip_address: str = None,
         user_agent: str = "",
     ) -> MedicalDocument:
-        extracted_text = ""
-        if file.name.lower().endswith(".pdf"):
-            extracted_text = RecordService._extract_pdf_text(file)
+        """
+        Store an uploaded document. PDF text is extracted afterwards by
+        a background job; the document starts out PENDING.
+        """
+        is_pdf = file.name.lower().endswith(".pdf")
 
         doc = MedicalDocument.objects.create(
             user=user,
@@ -148,8 +158,11 @@ class RecordService:
             file=file,
             original_filename=file.name,
             document_type=document_type,
-            extracted_text=extracted_text,
             file_size=file.size,
+            extraction_status=(
+                MedicalDocument.ExtractionStatus.PENDING if is_pdf
+                else MedicalDocument.ExtractionStatus.SKIPPED
+            ),
             created_by=user,
         )
 
@@ -163,30 +176,112 @@ class RecordService:
             changes={
                 "filename": file.name,
                 "document_type": document_type,
-                "extracted_length": len(extracted_text),
+                "extraction_status": doc.extraction_status,
             },
         )
 
+        if is_pdf:
+            transaction.on_commit(
+                lambda: JobQueue.enqueue(
+                    kind="records.extract_text",
+                    payload={"document_id": str(doc.id)},
+                    user=user,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+            )
+
         return doc
 
     @staticmethod
-    def _extract_pdf_text(file) -> str:
-        """Extract text from a PDF file using PyPDF2."""
+    def finalize_upload(upload, file) -> MedicalDocument:
+        """Upload handler: store a completed chunked upload as a document."""
+        record = None
+        record_id = upload.metadata.get("record_id")
+        if record_id:
+            record = MedicalRecord.objects.filter(
+                id=record_id, user=upload.user, is_deleted=False,
+            ).first()
+            if record is None:
+                raise ValueError("Medical record not found.")
+
+        document_type = upload.metadata.get("document_type", "OTHER")
+        if document_type not in MedicalDocument.DocumentType.values:
+            raise ValueError(f"Invalid document_type '{document_type}'.")
+
+        return RecordService.upload_document(
+            user=upload.user,
+            file=file,
+            document_type=document_type,
+            record=record,
+            ip_address=upload.ip_address,
+            user_agent=upload.user_agent,
+        )
+
+    @staticmethod
+    def process_extraction_job(job) -> None:
+        """Job handler: extract a PDF's text and fold it into the context."""
+        doc = (
+            MedicalDocument.objects.filter(
+                id=job.payload["document_id"], is_deleted=False,
+            )
+            .select_related("user")
+            .first()
+        )
+        if (
+            doc is None
+            or doc.extraction_status == MedicalDocument.ExtractionStatus.COMPLETED
+        ):
+            return
+
+        doc.extraction_status = MedicalDocument.ExtractionStatus.PROCESSING
+        doc.save(update_fields=["extraction_status", "updated_at"])
+
+        start = time.monotonic()
         try:
-            from PyPDF2 import PdfReader
-
-            file.seek(0)
-            reader = PdfReader(io.BytesIO(file.read()))
-            text_parts = []
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text.strip())
-            file.seek(0)
-            return "\n\n".join(text_parts)[:50000]  # Cap at 50k chars
+            text, pages = PdfExtractionPool.extract(doc.file.name)
         except Exception as e:
-            logger.warning("PDF extraction failed: %s", e)
-            return ""
+            logger.warning("PDF extraction failed for %s: %s", doc.id, e)
+            doc.extraction_error = str(e)[:2000]
+            doc.extraction_duration_ms = int((time.monotonic() - start) * 1000)
+            if job.attempts >= job.max_attempts:
+                doc.extraction_status = MedicalDocument.ExtractionStatus.FAILED
+            else:
+                doc.extraction_status = MedicalDocument.ExtractionStatus.PENDING
+            doc.save(update_fields=[
+                "extraction_status", "extraction_error",
+                "extraction_duration_ms", "updated_at",
+            ])
+            raise
+
+        with transaction.atomic():
+            doc.extracted_text = text
+            doc.extraction_pages = pages
+            doc.extraction_status = MedicalDocument.ExtractionStatus.COMPLETED
+            doc.extraction_duration_ms = int((time.monotonic() - start) * 1000)
+            doc.extraction_completed_at = timezone.now()
+            doc.extraction_error = ""
+            doc.save(update_fields=[
+                "extracted_text", "extraction_pages", "extraction_status",
+                "extraction_duration_ms", "extraction_completed_at",
+                "extraction_error", "updated_at",
+            ])
+            ContextSnapshotService.document_changed(doc)
+
+            AuditService.log_action(
+                user_id=str(doc.user_id),
+                action="UPDATE",
+                resource_type="MedicalDocument",
+                resource_id=str(doc.id),
+                ip_address=job.ip_address,
+                user_agent=job.user_agent,
+                changes={
+                    "extraction_status": doc.extraction_status,
+                    "extracted_length": len(text),
+                    "pages": pages,
+                    "duration_ms": doc.extraction_duration_ms,
+                },
+            )
 
     @staticmethod
     def get_user_documents(user):
@@ -199,52 +294,20 @@ class RecordService:
     # ---------------------------------------------------------------
 
     @staticmethod
-    def get_patient_medical_context(user) -> str:
+    @timed("context.assemble")
+    def get_patient_medical_context(user, symptoms_text: str = "") -> str:
         """
-        Assemble a text summary of the patient's medical records
-        for injection into the AI triage prompt.
+        Text summary of the patient's medical records for injection into
+        the AI triage prompt, read from the maintained snapshot. With
+        ``symptoms_text`` only the most relevant history is included, up
+        to MEDICAL_CONTEXT_TOKEN_BUDGET.
         """
-        records = MedicalRecord.objects.filter(
-            user=user, is_deleted=False,
-        ).order_by("record_type", "-date_recorded")
-
-        if not records.exists():
-            return ""
-
-        sections = []
-        current_type = None
-
-        for r in records:
-            if r.record_type != current_type:
-                current_type = r.record_type
-                sections.append(f"\n## {r.get_record_type_display()}")
-
-            line = f"- {r.title}"
-            if r.status:
-                line += f" (Status: {r.status})"
-            if r.severity:
-                line += f" [Severity: {r.severity}]"
-            if r.date_recorded:
-                line += f" — {r.date_recorded}"
-            sections.append(line)
+        if symptoms_text:
+            return ContextSnapshotService.get_relevant_context(user, symptoms_text)
+        return ContextSnapshotService.get_context(user)
 
-            if r.description:
-                sections.append(f"  Details: {r.description[:500]}")
-
-            if r.data:
-                for key, val in r.data.items():
-                    sections.append(f"  {key}: {val}")
-
-        # Include extracted text from documents (truncated)
-        documents = MedicalDocument.objects.filter(
-            user=user, is_deleted=False,
-        ).exclude(extracted_text="")[:5]
-
-        if documents.exists():
-            sections.append("\n## Uploaded Medical Documents")
-            for doc in documents:
-                sections.append(f"\n### {doc.original_filename} ({doc.get_document_type_display()})")
-                sections.append(doc.extracted_text[:2000])
-
-        context = "\n".join(sections)
-        return context[:10000]  # Cap total context
+    @staticmethod
+    @timed("context.assemble_batch")
+    def get_patient_medical_contexts(requests: list[tuple]) -> list[str]:
+        """Batch get_patient_medical_context() for ``(user, symptoms_text)`` pairs."""
+        return ContextSnapshotService.get_relevant_contexts(requests)
@@ -0,0 +1,39 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.sync.services.change_feed_service import ChangeFeedService, InvalidCursor
+
+
+class ChangeFeedView(APIView):
+    """
+    GET — changes to the caller's triage sessions, medical records,
+    documents and prescriptions since ``cursor`` (omit for a full sync).
+
+    Query params: ``cursor``, ``limit``. Keep calling with the returned
+    ``cursor`` while ``has_more`` is true; store it for the next sync.
+    Deleted rows come back as ``{"type", "id", "deleted": true}``.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", 0)) or None
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            feed = ChangeFeedService.get_changes(
+                request.user,
+                cursor=request.query_params.get("cursor", ""),
+                limit=limit,
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(feed)
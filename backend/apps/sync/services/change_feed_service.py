@@ -0,0 +1,160 @@
+"""
+Change Feed Service
+
+Lets an offline device catch up on everything that changed for its user
+since its last sync instead of re-downloading full lists.
+
+Rows are ordered by ``(updated_at, id)`` across all synced models and
+paged with an opaque cursor holding the last position seen. Soft-deleted
+rows are returned as tombstones so devices can drop them locally.
+"""
+
+import base64
+import heapq
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.records.models.medical_record import MedicalDocument, MedicalRecord
+from apps.triage.models.triage_session import TriageSession
+from apps.xai.models.prescription import FirstAidPrescription
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not issue."""
+
+
+class ChangeFeedService:
+    """Merged, cursor-paged feed of per-user changes."""
+
+    # type name → (model, compact payload fields)
+    FEEDS = {
+        "triage_session": (
+            TriageSession,
+            [
+                "source", "status", "symptoms_text", "inference_mode",
+                "model_version", "client_key", "created_at",
+                "result__id", "result__diagnosis", "result__severity",
+                "result__confidence_score", "result__recommendations",
+            ],
+        ),
+        "medical_record": (
+            MedicalRecord,
+            [
+                "record_type", "title", "description", "date_recorded",
+                "provider", "status", "severity", "data", "created_at",
+            ],
+        ),
+        "medical_document": (
+            MedicalDocument,
+            [
+                "record_id", "document_type", "original_filename",
+                "file_size", "extraction_status", "created_at",
+            ],
+        ),
+        "prescription": (
+            FirstAidPrescription,
+            [
+                "triage_session_id", "symptoms_text", "urgency", "drugs",
+                "warnings", "medical_context_used", "created_at",
+            ],
+        ),
+    }
+
+    @staticmethod
+    def get_changes(user, cursor: str = "", limit: int = None) -> dict:
+        """
+        Return up to ``limit`` changes after ``cursor``, oldest first.
+
+        Rows younger than SYNC_SAFETY_LAG_SECONDS are held back so a
+        transaction that commits late with an earlier ``updated_at`` is
+        not skipped past.
+        """
+        limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_MAX_PAGE_SIZE)
+        after = ChangeFeedService.decode_cursor(cursor) if cursor else None
+        horizon = timezone.now() - timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+
+        streams = [
+            ChangeFeedService._fetch(name, user, after, horizon, limit + 1)
+            for name in ChangeFeedService.FEEDS
+        ]
+        merged = list(heapq.merge(*streams, key=lambda row: row[0]))
+
+        page = merged[:limit]
+        changes = [change for _, change in page]
+        next_cursor = ChangeFeedService.encode_cursor(*page[-1][0]) if page else cursor
+
+        return {
+            "changes": changes,
+            "cursor": next_cursor,
+            "has_more": len(merged) > limit,
+        }
+
+    @staticmethod
+    def encode_cursor(updated_at: datetime, id_hex: str) -> str:
+        raw = json.dumps([updated_at.isoformat(), id_hex]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            updated_at, id_hex = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(updated_at), str(id_hex)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursor("Invalid sync cursor.") from e
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _fetch(name: str, user, after, horizon, limit: int) -> list[tuple]:
+        model, fields = ChangeFeedService.FEEDS[name]
+        qs = model.objects.filter(user=user, updated_at__lte=horizon)
+        if after is not None:
+            updated_at, id_hex = after
+            qs = qs.filter(
+                Q(updated_at__gt=updated_at)
+                | Q(updated_at=updated_at, id__gt=id_hex)
+            )
+
+        rows = qs.order_by("updated_at", "id").values(
+            "id", "updated_at", "is_deleted", *fields,
+        )[:limit]
+
+        stream = []
+        for row in rows:
+            key = (row["updated_at"], row["id"].hex)
+            if row["is_deleted"]:
+                change = {
+                    "type": name,
+                    "id": str(row["id"]),
+                    "updated_at": row["updated_at"],
+                    "deleted": True,
+                }
+            else:
+                change = ChangeFeedService._compact(name, row)
+            stream.append((key, change))
+        return stream
+
+    @staticmethod
+    def _compact(name: str, row: dict) -> dict:
+        change = {
+            "type": name,
+            "id": str(row.pop("id")),
+            "updated_at": row.pop("updated_at"),
+            "deleted": row.pop("is_deleted"),
+        }
+        result = {
+            key.removeprefix("result__"): row.pop(key)
+            for key in list(row)
+            if key.startswith("result__")
+        }
+        if result:
+            change["result"] = result if result["id"] is not None else None
+        change.update(row)
+        return change
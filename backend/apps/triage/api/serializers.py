@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from apps.triage.models.triage_session import (
@@ -52,6 +53,7 @@ class TriageSessionSerializer(serializers.ModelSerializer):
             "inference_mode",
             "model_version",
             "device_info",
+            "client_key",
             "result",
             "images",
             "created_at",
@@ -60,6 +62,7 @@ class TriageSessionSerializer(serializers.ModelSerializer):
         read_only_fields = [
             "id",
             "status",
+            "client_key",
             "result",
             "images",
             "created_at",
@@ -107,3 +110,86 @@ class ServerInferenceSerializer(serializers.Serializer):
         choices=TriageSession.Source.choices,
         default=TriageSession.Source.TEXT,
     )
+    run_async = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Queue inference in the background and return 202 with a status URL.",
+    )
+
+
+class BatchInferenceEntrySerializer(serializers.Serializer):
+    patient_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="Patient to triage (clinicians only); defaults to the caller.",
+    )
+    symptoms_text = serializers.CharField()
+    source = serializers.ChoiceField(
+        choices=TriageSession.Source.choices,
+        default=TriageSession.Source.TEXT,
+    )
+    client_ref = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default="",
+        max_length=100,
+        help_text="Opaque client identifier echoed back in the item status.",
+    )
+
+
+class BatchInferenceSerializer(serializers.Serializer):
+    """Request serializer for bulk server-side inference."""
+    entries = BatchInferenceEntrySerializer(many=True, allow_empty=False)
+
+    def validate_entries(self, value):
+        if len(value) > settings.TRIAGE_BATCH_MAX_ENTRIES:
+            raise serializers.ValidationError(
+                f"At most {settings.TRIAGE_BATCH_MAX_ENTRIES} entries per batch."
+            )
+        return value
+
+
+class SyncResultSerializer(serializers.Serializer):
+    diagnosis = serializers.CharField()
+    severity = serializers.ChoiceField(choices=TriageResult.Severity.choices)
+    confidence_score = serializers.FloatField(min_value=0.0, max_value=1.0)
+    recommendations = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        default=list,
+    )
+    differential_diagnoses = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        default=list,
+    )
+    explainability = serializers.DictField(required=False, default=dict)
+    raw_model_output = serializers.DictField(required=False, default=dict)
+
+
+class SyncSessionSerializer(serializers.Serializer):
+    client_key = serializers.CharField(
+        max_length=64,
+        help_text="Client-generated idempotency key (e.g. a UUID).",
+    )
+    symptoms_text = serializers.CharField(required=False, allow_blank=True, default="")
+    source = serializers.ChoiceField(
+        choices=TriageSession.Source.choices,
+        default=TriageSession.Source.TEXT,
+    )
+    model_version = serializers.CharField(required=False, allow_blank=True, default="")
+    device_info = serializers.JSONField(required=False, default=dict)
+    result = SyncResultSerializer(required=False, allow_null=True, default=None)
+
+
+class SyncSerializer(serializers.Serializer):
+    """Request serializer for flushing an offline client's queue."""
+    sessions = SyncSessionSerializer(many=True, allow_empty=False)
+
+    def validate_sessions(self, value):
+        if len(value) > settings.TRIAGE_SYNC_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"At most {settings.TRIAGE_SYNC_MAX_ITEMS} sessions per sync."
+            )
+        return value
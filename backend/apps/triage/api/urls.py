@@ -2,16 +2,40 @@ from django.urls import path
 
 from apps.triage.api.views import (
     ImageUploadView,
+    InferenceStatusView,
+    TriageBatchInferenceView,
+    TriageInferenceStreamView,
     TriageInferenceView,
     TriageResultCreateView,
     TriageSessionDetailView,
     TriageSessionListCreateView,
+    TriageSyncView,
 )
 
 urlpatterns = [
     path("sessions/", TriageSessionListCreateView.as_view(), name="triage-sessions"),
-    path("sessions/<uuid:session_id>/", TriageSessionDetailView.as_view(), name="triage-session-detail"),
+    path("sessions/sync/", TriageSyncView.as_view(), name="triage-sessions-sync"),
+    path(
+        "sessions/<uuid:session_id>/",
+        TriageSessionDetailView.as_view(),
+        name="triage-session-detail",
+    ),
     path("results/", TriageResultCreateView.as_view(), name="triage-result-create"),
     path("inference/", TriageInferenceView.as_view(), name="triage-inference"),
+    path(
+        "inference/batch/",
+        TriageBatchInferenceView.as_view(),
+        name="triage-inference-batch",
+    ),
+    path(
+        "inference/stream/",
+        TriageInferenceStreamView.as_view(),
+        name="triage-inference-stream",
+    ),
+    path(
+        "inference/status/",
+        InferenceStatusView.as_view(),
+        name="triage-inference-status",
+    ),
     path("images/", ImageUploadView.as_view(), name="triage-image-upload"),
 ]
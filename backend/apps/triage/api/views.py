@@ -1,28 +1,79 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 
-from apps.common.permissions import IsPatient, IsClinician
+from apps.common.pagination import KeysetPagination
+from apps.common.permissions import IsAdmin, IsPatient, IsClinician
+from apps.common.renderers import EventStreamRenderer
+from apps.common.singleflight import SingleFlight
+from apps.common.tracing import span, trace
 from apps.triage.models.triage_session import TriageSession
+from apps.triage.services.admission import (
+    AdmissionRejected,
+    inference_admission,
+    requires_slot,
+    symptom_priority,
+)
 from apps.triage.services.triage_service import TriageService
 from apps.triage.api.serializers import (
+    BatchInferenceSerializer,
     CreateSessionSerializer,
     SaveResultSerializer,
     ServerInferenceSerializer,
+    SyncSerializer,
     TriageSessionSerializer,
 )
 
 
+def _shed_response(error: AdmissionRejected) -> Response:
+    return Response(
+        {"error": "Inference is at capacity. Please retry shortly."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+class _ClosingStream:
+    """Iterator wrapper that runs ``on_close`` once when the response is closed."""
+
+    def __init__(self, iterable, on_close):
+        self._iterator = iter(iterable)
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        try:
+            getattr(self._iterator, "close", lambda: None)()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
 class TriageSessionListCreateView(generics.ListCreateAPIView):
     """
-    GET  — list the authenticated user's triage sessions.
+    GET  — list the authenticated user's triage sessions, newest first.
+           Cursor-paginated: follow ``next`` (``?cursor=…&page_size=…``).
     POST — create a new triage session.
     """
 
     serializer_class = TriageSessionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return TriageService.get_user_sessions(self.request.user)
@@ -86,6 +137,7 @@ class TriageResultCreateView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
+        data = TriageService.check_client_result(session.symptoms_text, data)
         result = TriageService.save_result(
             session=session,
             diagnosis=data["diagnosis"],
@@ -106,10 +158,46 @@ class TriageResultCreateView(APIView):
         )
 
 
+class TriageSyncView(APIView):
+    """
+    POST — flush queued on-device sessions (and their results) in one
+    round trip. Items are keyed by a client-generated ``client_key`` so
+    replays after a partial failure are safe.
+
+    Returns ``{"outcomes": {client_key: {...}}}``.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = SyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        outcomes = TriageService.sync_client_sessions(
+            request.user,
+            serializer.validated_data["sessions"],
+            ip_address=request.META.get("REMOTE_ADDR"),
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+        )
+
+        return Response({"outcomes": outcomes}, status=status.HTTP_200_OK)
+
+
 class TriageInferenceView(APIView):
     """
     POST — Server-side AI inference using Google Gemini (MedGemma).
     Sends patient symptoms + medical history to AI and returns structured diagnosis.
+
+    With ``run_async`` (or ``Prefer: respond-async``) the session is queued
+    as PENDING for the background worker and 202 is returned with a
+    status URL to poll.
+
+    Synchronous calls wait for an inference slot, most urgent symptoms
+    first; under overload they are shed with 503 and ``Retry-After``.
+    Emergencies answered by the rule prescreen never wait for a slot.
+
+    Identical requests from the same user (double-submits) within
+    SINGLE_FLIGHT_WINDOW_SECONDS share one session and one model call.
     """
 
     permission_classes = [IsAuthenticated]
@@ -119,61 +207,256 @@ class TriageInferenceView(APIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        # Fetch patient medical context
-        from apps.records.services.record_service import RecordService
-        from apps.triage.services.gemini_service import GeminiService
+        prefer_async = "respond-async" in request.headers.get("Prefer", "")
+        run_async = data["run_async"] or prefer_async
+
+        # A double-submitted form attaches to the call already in flight
+        flight = SingleFlight("triage.inference")
+        key = flight.key(
+            str(request.user.id),
+            " ".join(data["symptoms_text"].lower().split()),
+            data["source"],
+            run_async,
+        )
 
-        medical_context = RecordService.get_patient_medical_context(request.user)
+        if run_async:
+            session_id = flight.run(key, lambda: self._enqueue(request, data))
+            return self._accepted(request, session_id)
 
-        # Run AI inference via Gemini
-        ai_result = GeminiService.run_inference(
-            symptoms_text=data["symptoms_text"],
-            medical_context=medical_context or "",
+        try:
+            with trace("http.triage_inference"):
+                session_id = flight.run(key, lambda: self._infer(request, data))
+        except AdmissionRejected as e:
+            return _shed_response(e)
+
+        return Response(
+            TriageSessionSerializer(
+                TriageService.get_session_detail(
+                    session_id=session_id,
+                    user=request.user,
+                )
+            ).data,
+            status=status.HTTP_201_CREATED,
         )
 
-        # Create session
-        session = TriageService.create_session(
-            user=request.user,
-            symptoms_text=data["symptoms_text"],
-            source=data["source"],
-            inference_mode="SERVER",
-            model_version="gemini-2.0-flash",
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+    def _infer(self, request, data) -> str:
+        """Run inference under an admission slot; returns the session id."""
+        # Wait for an inference slot before creating anything; shed under
+        # load. Prescreened emergencies make no model call and skip the queue
+        admission = None
+        if requires_slot(data["symptoms_text"]):
+            admission = inference_admission()
+            with span("admission.wait"):
+                admission.acquire(symptom_priority(data["symptoms_text"]))
+
+        try:
+            session = TriageService.create_session(
+                user=request.user,
+                symptoms_text=data["symptoms_text"],
+                source=data["source"],
+                inference_mode="SERVER",
+                model_version=settings.GEMINI_MODEL,
+                status=TriageSession.Status.PROCESSING,
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
+
+            # Run AI inference via Gemini and save the result
+            TriageService.run_server_inference(
+                session,
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
+        finally:
+            if admission is not None:
+                admission.release()
+
+        return str(session.id)
+
+    def _enqueue(self, request, data) -> str:
+        """Queue the session as PENDING for the worker; returns the session id."""
+        # A PENDING session without its job would never be processed
+        with transaction.atomic():
+            session = TriageService.create_session(
+                user=request.user,
+                symptoms_text=data["symptoms_text"],
+                source=data["source"],
+                inference_mode="SERVER",
+                model_version=settings.GEMINI_MODEL,
+                status=TriageSession.Status.PENDING,
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
+            TriageService.enqueue_server_inference(
+                session,
+                ip_address=request.META.get("REMOTE_ADDR"),
+                user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            )
+        return str(session.id)
+
+    def _accepted(self, request, session_id: str) -> Response:
+        """202 with a status URL to poll."""
+        session = TriageSession.objects.get(id=session_id, user=request.user)
+        status_url = request.build_absolute_uri(
+            reverse("triage-session-detail", args=[session.id])
+        )
+        response_data = TriageSessionSerializer(session).data
+        response_data["status_url"] = status_url
+        return Response(
+            response_data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url},
         )
 
-        # Add medical context info to explainability
-        explainability = ai_result.get("explainability", {})
-        if medical_context:
-            factors = explainability.get("contributing_factors", [])
-            if "Patient medical history considered" not in factors:
-                factors.append("Patient medical history considered")
-            explainability["contributing_factors"] = factors
-            explainability["medical_context_available"] = True
 
-        # Save AI result
-        result = TriageService.save_result(
-            session=session,
-            diagnosis=ai_result["diagnosis"],
-            severity=ai_result["severity"],
-            confidence_score=ai_result["confidence_score"],
-            recommendations=ai_result["recommendations"],
-            differential_diagnoses=ai_result["differential_diagnoses"],
-            explainability=explainability,
-            raw_model_output=ai_result.get("raw_model_output", ""),
-            user=request.user,
+class TriageBatchInferenceView(APIView):
+    """
+    POST — Server-side inference for a batch of symptom reports, e.g. a
+    community health worker's outreach visits. Clinicians may include
+    ``patient_id`` per entry; other users triage themselves.
+
+    Model calls hold the same admission slots as single inference
+    requests; entries shed under load come back ``failed``.
+
+    Returns 207 with one status per entry (completed/failed/rejected).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BatchInferenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items = TriageService.run_batch_inference(
+            request.user,
+            serializer.validated_data["entries"],
             ip_address=request.META.get("REMOTE_ADDR"),
             user_agent=request.META.get("HTTP_USER_AGENT", ""),
         )
 
         return Response(
+            {
+                "count": len(items),
+                "completed": sum(1 for item in items if item["status"] == "completed"),
+                "items": items,
+            },
+            status=status.HTTP_207_MULTI_STATUS,
+        )
+
+
+class TriageInferenceStreamView(APIView):
+    """
+    POST — Streaming server-side inference over Server-Sent Events.
+
+    Emits ``session`` immediately, then ``diagnosis`` text deltas,
+    ``recommendation`` items and completed ``field`` values as Gemini
+    generates them, and finally ``result`` with the persisted session.
+    """
+
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        serializer = ServerInferenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        ip_address = request.META.get("REMOTE_ADDR")
+        user_agent = request.META.get("HTTP_USER_AGENT", "")
+
+        admission = None
+        if requires_slot(data["symptoms_text"]):
+            admission = inference_admission()
+            try:
+                admission.acquire(symptom_priority(data["symptoms_text"]))
+            except AdmissionRejected as e:
+                return _shed_response(e)
+
+        try:
+            session = TriageService.create_session(
+                user=request.user,
+                symptoms_text=data["symptoms_text"],
+                source=data["source"],
+                inference_mode="SERVER",
+                model_version=settings.GEMINI_MODEL,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+        except Exception:
+            if admission is not None:
+                admission.release()
+            raise
+
+        # The slot is held until the server closes the stream
+        response = StreamingHttpResponse(
+            _ClosingStream(
+                self._event_stream(request, session, ip_address, user_agent),
+                on_close=admission.release if admission is not None else None,
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx-style proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def _event_stream(self, request, session, ip_address, user_agent):
+        yield self._sse("session", {"id": str(session.id), "status": session.status})
+
+        try:
+            for kind, key, value in TriageService.stream_server_inference(
+                session,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            ):
+                if kind == "delta" and key == "diagnosis":
+                    yield self._sse("diagnosis", {"delta": value})
+                elif kind == "item" and key == "recommendations":
+                    yield self._sse("recommendation", {"text": value})
+                elif kind == "field":
+                    yield self._sse("field", {"name": key, "value": value})
+        except Exception as e:
+            TriageService.mark_failed(session, error_info=str(e))
+            yield self._sse("error", {"error": "Inference failed."})
+            return
+
+        yield self._sse(
+            "result",
             TriageSessionSerializer(
                 TriageService.get_session_detail(
                     session_id=str(session.id),
                     user=request.user,
                 )
             ).data,
-            status=status.HTTP_201_CREATED,
+        )
+
+    @staticmethod
+    def _sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class InferenceStatusView(APIView):
+    """GET — operational state of the server-side inference path. Admin only."""
+
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        from apps.common.metrics import registry
+        from apps.triage.services.gemini_client import GeminiClientPool
+        from apps.triage.services.gemini_resilience import gemini_breaker
+        from apps.triage.services.inference_cache import InferenceCache
+        from apps.triage.services.provider_quota import quota_usage
+
+        return Response(
+            {
+                "model": settings.GEMINI_MODEL,
+                "client_pool": GeminiClientPool.stats(),
+                "cache": InferenceCache.stats(),
+                "circuit_breaker": gemini_breaker().stats(),
+                "admission": inference_admission().stats(),
+                "quota": quota_usage(),
+                "metrics": registry.snapshot(),
+            }
         )
 
 
@@ -0,0 +1,57 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.triage.services.gemini_client import GeminiClientPool
+from apps.triage.services.gemini_service import GeminiService
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent inference calls through the Gemini client pool and "
+        "report latency. Run with GEMINI_BACKEND=stub to test offline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--symptoms",
+            default="Headache and mild fever for two days",
+        )
+        parser.add_argument(
+            "--no-warm-up",
+            action="store_true",
+            help="Skip pool warm-up to measure cold-start cost.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["no_warm_up"]:
+            GeminiClientPool.warm_up()
+
+        def timed_call(_):
+            start = time.monotonic()
+            GeminiService.run_inference(symptoms_text=options["symptoms"])
+            return (time.monotonic() - start) * 1000
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            latencies = sorted(pool.map(timed_call, range(options["requests"])))
+        elapsed = time.monotonic() - started
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        self.stdout.write(f"Pool: {GeminiClientPool.stats()}")
+        self.stdout.write(
+            f"{len(latencies)} requests in {elapsed:.2f}s "
+            f"({len(latencies) / elapsed:.1f} req/s)"
+        )
+        self.stdout.write(
+            f"mean={statistics.mean(latencies):.1f}ms "
+            f"p50={percentile(0.50):.1f}ms "
+            f"p95={percentile(0.95):.1f}ms "
+            f"p99={percentile(0.99):.1f}ms"
+        )
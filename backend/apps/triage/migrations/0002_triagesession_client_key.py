@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("triage", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="triagesession",
+            name="client_key",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Client-generated idempotency key for offline sync.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="triagesession",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("client_key", ""), _negated=True),
+                fields=("user", "client_key"),
+                name="triage_session_unique_client_key",
+            ),
+        ),
+    ]
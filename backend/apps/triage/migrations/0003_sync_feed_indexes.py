@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("triage", "0002_triagesession_client_key"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="triagesession",
+            index=models.Index(
+                fields=["user", "updated_at", "id"],
+                name="triage_tria_user_id_3ae8aa_idx",
+            ),
+        ),
+    ]
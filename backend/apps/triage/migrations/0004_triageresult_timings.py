@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-17 08:49
+
+from django.db import migrations, models
+
+
+def move_timings_out_of_raw_output(apps, schema_editor):
+    # Sampled results used to keep timings as {"text": raw, "timings": ...}
+    TriageResult = apps.get_model("triage", "TriageResult")
+    for result in TriageResult.objects.filter(raw_model_output__has_key="timings"):
+        raw = dict(result.raw_model_output)
+        result.timings = raw.pop("timings")
+        if set(raw) == {"text"}:
+            raw = raw["text"]
+        result.raw_model_output = raw
+        result.save(update_fields=["timings", "raw_model_output"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("triage", "0003_sync_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="triageresult",
+            name="timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Per-stage latencies of sampled requests (TRACE_SAMPLE_RATE).",
+            ),
+        ),
+        migrations.RunPython(move_timings_out_of_raw_output, migrations.RunPython.noop),
+    ]
@@ -51,12 +51,26 @@ class TriageSession(BaseModel):
         blank=True,
         help_text="Client device capabilities (WebGPU, RAM, etc.)",
     )
+    client_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Client-generated idempotency key for offline sync.",
+    )
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["user", "updated_at", "id"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "client_key"],
+                condition=~models.Q(client_key=""),
+                name="triage_session_unique_client_key",
+            ),
         ]
 
     def __str__(self):
@@ -108,6 +122,11 @@ class TriageResult(BaseModel):
         blank=True,
         help_text="Raw model response for debugging.",
     )
+    timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Per-stage latencies of sampled requests (TRACE_SAMPLE_RATE).",
+    )
 
     class Meta:
         ordering = ["-created_at"]
@@ -0,0 +1,234 @@
+"""
+Admission control for server-side inference.
+
+A per-process gate in front of the Gemini call: at most
+TRIAGE_ADMISSION_SLOTS requests run at once and the rest wait in a
+bounded priority queue. Emergencies are admitted first; when the queue
+is full the least urgent waiter is shed, and low-urgency requests give
+up sooner. Shed requests are answered 503 with Retry-After.
+
+Waiting happens on request threads, so gunicorn runs gthread workers
+(see gunicorn.conf.py) and the queue never holds more than
+GUNICORN_THREADS - TRIAGE_ADMISSION_SLOTS waiters. Emergencies the rule
+prescreen answers need no model call and bypass admission entirely.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from apps.common.metrics import registry
+from apps.triage.services.rule_engine import RuleEngine
+from apps.xai.services.prescription_service import PrescriptionService
+
+logger = logging.getLogger(__name__)
+
+EMERGENCY, MODERATE, LOW = 0, 1, 2
+PRIORITY_NAMES = {EMERGENCY: "emergency", MODERATE: "moderate", LOW: "low"}
+
+_queue_depth = registry.gauge(
+    "triage_admission_queue_depth",
+    "Inference requests waiting for a slot.",
+)
+_in_flight = registry.gauge(
+    "triage_admission_in_flight",
+    "Inference requests holding a slot.",
+)
+_admitted = registry.counter(
+    "triage_admission_admitted_total",
+    "Inference requests admitted, by priority.",
+)
+_wait_seconds = registry.counter(
+    "triage_admission_wait_seconds_total",
+    "Total time admitted requests spent queued, by priority.",
+)
+_shed = registry.counter(
+    "triage_admission_shed_total",
+    "Inference requests shed, by priority and reason.",
+)
+
+
+def symptom_priority(symptoms_text: str) -> int:
+    """
+    EMERGENCY for guideline HIGH/CRITICAL signs or the prescription
+    service's high-urgency keywords; MODERATE for moderate signals.
+    """
+    lower = (symptoms_text or "").lower()
+    rule_severity = RuleEngine.evaluate(symptoms_text)["severity"]
+    if rule_severity in ("HIGH", "CRITICAL") or any(
+        kw in lower for kw in PrescriptionService.HIGH_URGENCY_KEYWORDS
+    ):
+        return EMERGENCY
+    if rule_severity == "MEDIUM" or any(
+        kw in lower for kw in PrescriptionService.MODERATE_URGENCY_KEYWORDS
+    ):
+        return MODERATE
+    return LOW
+
+
+def requires_slot(symptoms_text: str) -> bool:
+    """
+    Whether inference for ``symptoms_text`` calls the model. False for
+    the emergencies GeminiService answers from the rule prescreen, which
+    must never wait behind model calls or be shed.
+    """
+    if not settings.TRIAGE_RULE_PRESCREEN:
+        return True
+    return not RuleEngine.evaluate(symptoms_text)["emergency"]
+
+
+class AdmissionRejected(Exception):
+    """The request was shed; retry after ``retry_after`` seconds."""
+
+    def __init__(self, priority: int, reason: str, retry_after: int):
+        super().__init__(f"Inference capacity exhausted ({reason}).")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("priority", "evicted")
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.evicted = False
+
+
+class AdmissionController:
+    """Bounded priority queue in front of a fixed number of slots."""
+
+    def __init__(self, slots: int, queue_size: int):
+        self.slots = slots
+        self.queue_size = queue_size
+        self._cond = threading.Condition()
+        self._running = 0
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+
+    @contextmanager
+    def admit(self, priority: int):
+        """Hold a slot for the duration of the block."""
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, priority: int) -> None:
+        """Wait for a slot; raises AdmissionRejected when shed."""
+        started = time.monotonic()
+        deadline = started + self._max_wait(priority)
+
+        with self._cond:
+            if self._running < self.slots and not self._heap:
+                self._admit(priority, 0.0)
+                return
+
+            if len(self._heap) >= self.queue_size:
+                if not self._heap:
+                    # No queue at all (queue_size 0): nobody to evict
+                    self._reject(priority, "queue_full")
+                worst = max(self._heap)
+                if worst[0] <= priority:
+                    self._reject(priority, "queue_full")
+                # Make room by evicting the least urgent, newest waiter
+                self._remove(worst)
+                worst[2].evicted = True
+                self._cond.notify_all()
+
+            entry = (priority, next(self._seq), _Waiter(priority))
+            heapq.heappush(self._heap, entry)
+            _queue_depth.set(len(self._heap))
+
+            while True:
+                if entry[2].evicted:
+                    self._reject(priority, "evicted")
+                if self._heap[0] is entry and self._running < self.slots:
+                    heapq.heappop(self._heap)
+                    _queue_depth.set(len(self._heap))
+                    self._admit(priority, time.monotonic() - started)
+                    # The next waiter may fit too
+                    self._cond.notify_all()
+                    return
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(entry)
+                    self._cond.notify_all()
+                    self._reject(priority, "timeout")
+                self._cond.wait(remaining)
+
+    def release(self) -> None:
+        with self._cond:
+            self._running -= 1
+            _in_flight.set(self._running)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "in_flight": self._running,
+                "queue_size": self.queue_size,
+                "queued": {
+                    PRIORITY_NAMES[p]: sum(1 for e in self._heap if e[0] == p)
+                    for p in PRIORITY_NAMES
+                },
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internals (called with the condition held)                          #
+    # ------------------------------------------------------------------ #
+
+    def _admit(self, priority: int, waited: float) -> None:
+        self._running += 1
+        _in_flight.set(self._running)
+        _admitted.inc(priority=PRIORITY_NAMES[priority])
+        _wait_seconds.inc(waited, priority=PRIORITY_NAMES[priority])
+
+    def _remove(self, entry) -> None:
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        _queue_depth.set(len(self._heap))
+
+    def _reject(self, priority: int, reason: str):
+        _shed.inc(priority=PRIORITY_NAMES[priority], reason=reason)
+        raise AdmissionRejected(
+            priority, reason, settings.TRIAGE_ADMISSION_RETRY_AFTER_SECONDS,
+        )
+
+    @staticmethod
+    def _max_wait(priority: int) -> float:
+        if priority == LOW:
+            return settings.TRIAGE_ADMISSION_LOW_MAX_WAIT_SECONDS
+        return settings.TRIAGE_ADMISSION_MAX_WAIT_SECONDS
+
+
+_controller: AdmissionController | None = None
+_controller_lock = threading.Lock()
+
+
+def inference_admission() -> AdmissionController:
+    """The process-wide controller for server-side inference."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            slots = settings.TRIAGE_ADMISSION_SLOTS
+            queue_size = settings.TRIAGE_ADMISSION_QUEUE_SIZE
+            # Only idle request threads can wait; a larger queue never fills
+            reachable = max(settings.GUNICORN_THREADS - slots, 0)
+            if queue_size > reachable:
+                logger.warning(
+                    "TRIAGE_ADMISSION_QUEUE_SIZE=%d exceeds GUNICORN_THREADS - "
+                    "TRIAGE_ADMISSION_SLOTS; using %d",
+                    queue_size, reachable,
+                )
+                queue_size = reachable
+            _controller = AdmissionController(slots=slots, queue_size=queue_size)
+        return _controller
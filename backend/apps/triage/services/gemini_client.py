@@ -0,0 +1,269 @@
+"""
+Gemini Client Pool
+
+Keeps a small set of long-lived Gemini clients per worker process so
+triage calls reuse warm keep-alive connections instead of building a new
+client (and TLS session) on every request.
+
+Set GEMINI_BACKEND=stub to swap in an offline client that returns canned
+JSON, which lets the pool be load-tested without network access.
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from decouple import config
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = config("GEMINI_API_KEY", default="")
+
+
+class GeminiPoolExhausted(Exception):
+    """Raised when no pooled client becomes free within the pool timeout."""
+
+
+# ---------------------------------------------------------------------- #
+# Offline stub backend                                                    #
+# ---------------------------------------------------------------------- #
+
+STUB_RESULT = {
+    "diagnosis": "Stub assessment — offline Gemini backend",
+    "severity": "LOW",
+    "confidence_score": 0.5,
+    "recommendations": ["Consult a healthcare professional for evaluation"],
+    "differential_diagnoses": [],
+    "explainability": {
+        "contributing_factors": ["Stub backend"],
+        "reasoning": "Canned response from the offline stub backend.",
+    },
+}
+
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubModels:
+    def __init__(self, latency_ms: int, failure_rate: float):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+
+    def generate_content(self, model: str, contents=None, config=None):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        self._maybe_fail()
+        return _StubResponse(json.dumps(STUB_RESULT))
+
+    def generate_content_stream(self, model: str, contents=None, config=None):
+        self._maybe_fail()
+        text = json.dumps(STUB_RESULT)
+        step = max(1, len(text) // 8)
+        for i in range(0, len(text), step):
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 8000)
+            yield _StubResponse(text[i:i + step])
+
+    def get(self, model: str):
+        return {"name": model}
+
+    def _maybe_fail(self):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise TimeoutError("Injected stub backend failure")
+
+
+class StubGeminiClient:
+    """Drop-in stand-in for ``genai.Client`` that never touches the network."""
+
+    def __init__(self, latency_ms: int = 0, failure_rate: float = 0.0):
+        self.models = _StubModels(latency_ms, failure_rate)
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------- #
+# Pool                                                                    #
+# ---------------------------------------------------------------------- #
+
+
+_STREAM_END = object()
+
+
+class GeminiClientPool:
+    """
+    Process-wide pool of Gemini clients.
+
+    Clients are created lazily up to GEMINI_CLIENT_POOL_SIZE and handed
+    out LIFO so the most recently used (warmest) connection is reused
+    first. Each gunicorn worker owns its own pool; call ``reset()`` after
+    a fork so sockets are never shared between processes.
+    """
+
+    _lock = threading.Lock()
+    _idle: queue.LifoQueue | None = None
+    _clients: list = []
+
+    @classmethod
+    def is_configured(cls) -> bool:
+        """Whether the configured backend can serve requests."""
+        return settings.GEMINI_BACKEND == "stub" or bool(GEMINI_API_KEY)
+
+    @classmethod
+    @contextmanager
+    def client(cls):
+        """Check out a client for the duration of the ``with`` block."""
+        client = cls._checkout()
+        try:
+            yield client
+        finally:
+            idle = cls._idle
+            if idle is not None and client in cls._clients:
+                idle.put(client)
+
+    @classmethod
+    def stream(cls, model: str, contents, config=None):
+        """
+        Yield ``generate_content_stream`` chunks from a pooled client.
+
+        The provider stream is drained on a background thread into a
+        queue and the client goes back to the pool as soon as the stream
+        is exhausted, so a slow reader (e.g. a client on a poor network
+        behind SSE) never holds a pooled client. Errors, including
+        GeminiPoolExhausted, are re-raised in the caller.
+        """
+        chunks = queue.SimpleQueue()
+
+        def pump():
+            try:
+                with cls.client() as client:
+                    for chunk in client.models.generate_content_stream(
+                        model=model, contents=contents, config=config,
+                    ):
+                        chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            else:
+                chunks.put(_STREAM_END)
+
+        threading.Thread(target=pump, name="gemini-stream", daemon=True).start()
+        while True:
+            item = chunks.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    @classmethod
+    def warm_up(cls) -> int:
+        """
+        Fill the pool and open a connection on every client.
+        Called once per worker at boot; failures are logged, never raised.
+        """
+        if not cls.is_configured():
+            return 0
+
+        with cls._lock:
+            cls._ensure_queue()
+            missing = settings.GEMINI_CLIENT_POOL_SIZE - len(cls._clients)
+            for _ in range(max(missing, 0)):
+                client = cls._build_client()
+                cls._clients.append(client)
+                cls._idle.put(client)
+            clients = list(cls._clients)
+
+        for client in clients:
+            try:
+                client.models.get(model=settings.GEMINI_MODEL)
+            except Exception as e:
+                logger.warning("Gemini warm-up request failed: %s", e)
+                break
+
+        logger.info("Gemini client pool warmed with %d clients", len(clients))
+        return len(clients)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Close every pooled client and start with an empty pool."""
+        with cls._lock:
+            for client in cls._clients:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            cls._clients = []
+            cls._idle = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        idle = cls._idle.qsize() if cls._idle is not None else 0
+        return {
+            "backend": settings.GEMINI_BACKEND,
+            "size": settings.GEMINI_CLIENT_POOL_SIZE,
+            "created": len(cls._clients),
+            "idle": idle,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def _ensure_queue(cls) -> None:
+        if cls._idle is None:
+            cls._idle = queue.LifoQueue()
+
+    @classmethod
+    def _checkout(cls):
+        with cls._lock:
+            cls._ensure_queue()
+            idle = cls._idle
+            try:
+                return idle.get_nowait()
+            except queue.Empty:
+                pass
+            if len(cls._clients) < settings.GEMINI_CLIENT_POOL_SIZE:
+                client = cls._build_client()
+                cls._clients.append(client)
+                return client
+
+        try:
+            return idle.get(timeout=settings.GEMINI_CLIENT_POOL_TIMEOUT_SECONDS)
+        except queue.Empty:
+            raise GeminiPoolExhausted(
+                "No Gemini client became available within "
+                f"{settings.GEMINI_CLIENT_POOL_TIMEOUT_SECONDS}s."
+            )
+
+    @staticmethod
+    def _build_client():
+        if settings.GEMINI_BACKEND == "stub":
+            return StubGeminiClient(
+                latency_ms=settings.GEMINI_STUB_LATENCY_MS,
+                failure_rate=settings.GEMINI_STUB_FAILURE_RATE,
+            )
+
+        import httpx
+        from google import genai
+        from google.genai import types
+
+        return genai.Client(
+            api_key=GEMINI_API_KEY,
+            http_options=types.HttpOptions(
+                timeout=settings.GEMINI_HTTP_TIMEOUT_MS,
+                client_args={
+                    "limits": httpx.Limits(
+                        max_keepalive_connections=settings.GEMINI_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=settings.GEMINI_KEEPALIVE_EXPIRY_SECONDS,
+                    ),
+                },
+            ),
+        )
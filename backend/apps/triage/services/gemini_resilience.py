@@ -0,0 +1,173 @@
+"""
+Failure handling for the Gemini call path.
+
+- CircuitBreaker: trips after consecutive upstream failures and fails
+  fast until a cool-down passes, then lets a single probe through.
+  State lives in the "shared" cache alias so every worker agrees; the
+  probe slot and the counters rely on its atomic add/incr (Redis, or
+  LockingFileBasedCache on one host).
+- Deadline: a per-request time budget split across retry attempts.
+- backoff_delay(): exponential backoff with full jitter.
+"""
+
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.common.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_trips = registry.counter(
+    "triage_gemini_breaker_trips_total",
+    "Times this worker tripped the Gemini circuit breaker open.",
+)
+_rejections = registry.counter(
+    "triage_gemini_breaker_rejections_total",
+    "Calls short-circuited to the fallback while the breaker was open.",
+)
+
+# HTTP statuses worth retrying; other 4xx mean the request itself is bad
+RETRYABLE_STATUS_CODES = {408, 429}
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether an exception signals a transient upstream problem."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES or code >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # httpx transport and timeout errors raised through the SDK
+    return type(exc).__module__.startswith("httpx")
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt."""
+    ceiling = min(
+        settings.GEMINI_RETRY_MAX_DELAY_SECONDS,
+        settings.GEMINI_RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)),
+    )
+    return random.uniform(0, ceiling)
+
+
+class Deadline:
+    """Wall-clock budget for one logical request."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """
+    Cross-worker circuit breaker backed by the "shared" cache.
+
+    CLOSED    — calls flow; consecutive failures are counted.
+    OPEN      — calls fail fast until ``reset_seconds`` have passed.
+    HALF_OPEN — one probe call is let through; success closes the
+                breaker, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures_key = f"breaker:{name}:failures"
+        self._opened_key = f"breaker:{name}:opened_at"
+        self._probe_key = f"breaker:{name}:probe"
+        self._trips_key = f"breaker:{name}:trips"
+
+    @property
+    def _cache(self):
+        return caches["shared"]
+
+    def state(self) -> str:
+        opened_at = self._cache.get(self._opened_key)
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < self.reset_seconds:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state()
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._cache.add(
+            self._probe_key, 1, timeout=self.reset_seconds
+        ):
+            logger.info("Circuit breaker %s half-open: sending probe", self.name)
+            return True
+        _rejections.inc(breaker=self.name)
+        return False
+
+    def record_success(self) -> None:
+        if self._cache.get(self._opened_key) is not None:
+            logger.info("Circuit breaker %s closed", self.name)
+        self._cache.delete_many([self._failures_key, self._opened_key, self._probe_key])
+
+    def record_failure(self) -> None:
+        state = self.state()
+        if state == self.OPEN:
+            # Straggler from a call that started before the trip
+            return
+        if state == self.HALF_OPEN:
+            # Failed probe: re-open for another cool-down
+            self._trip()
+            return
+
+        self._cache.add(self._failures_key, 0, timeout=None)
+        try:
+            failures = self._cache.incr(self._failures_key)
+        except ValueError:
+            failures = 1
+            self._cache.set(self._failures_key, failures, timeout=None)
+
+        if failures >= self.failure_threshold:
+            self._trip()
+
+    def stats(self) -> dict:
+        opened_at = self._cache.get(self._opened_key)
+        return {
+            "name": self.name,
+            "state": self.state(),
+            "consecutive_failures": self._cache.get(self._failures_key, 0),
+            "failure_threshold": self.failure_threshold,
+            "reset_seconds": self.reset_seconds,
+            "opened_at": opened_at,
+            "trips": self._cache.get(self._trips_key, 0),
+        }
+
+    def _trip(self) -> None:
+        logger.warning("Circuit breaker %s opened", self.name)
+        self._cache.set(self._opened_key, time.time(), timeout=None)
+        self._cache.delete(self._probe_key)
+        self._cache.add(self._trips_key, 0, timeout=None)
+        try:
+            self._cache.incr(self._trips_key)
+        except ValueError:
+            pass
+        _trips.inc(breaker=self.name)
+
+
+def gemini_breaker() -> CircuitBreaker:
+    """The breaker guarding Gemini calls (state is shared, so this is cheap)."""
+    return CircuitBreaker(
+        "gemini",
+        failure_threshold=settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.GEMINI_BREAKER_RESET_SECONDS,
+    )
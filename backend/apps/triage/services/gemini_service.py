@@ -5,15 +5,48 @@ Calls Google's Gemini API (MedGemma) for clinical triage.
 Returns structured diagnosis, severity, recommendations, and explainability.
 """
 
-import json
 import logging
+import time
 
-from decouple import config
-from google import genai
+from django.conf import settings
+
+from apps.common.metrics import registry
+from apps.common.search import estimate_tokens
+from apps.common.tracing import span, timed
+from apps.triage.services.gemini_client import GeminiClientPool
+from apps.triage.services.gemini_resilience import (
+    CircuitBreaker,
+    Deadline,
+    backoff_delay,
+    gemini_breaker,
+    is_retryable,
+)
+from apps.triage.services.guideline_index import GuidelineIndex
+from apps.triage.services.inference_cache import InferenceCache
+from apps.triage.services.provider_quota import QuotaExhausted, provider_quota, reserve
+from apps.triage.services.rule_engine import RuleEngine
+from apps.triage.services.stream_parser import IncrementalJSONParser
 
 logger = logging.getLogger(__name__)
 
-GEMINI_API_KEY = config("GEMINI_API_KEY", default="")
+_prescreens = registry.counter(
+    "triage_rule_prescreen_total",
+    "Emergencies answered by the rule engine without a model call.",
+)
+
+# Bump whenever MEDICAL_SYSTEM_PROMPT or the prompt layout changes so
+# cached inference results from the old prompt are no longer served.
+PROMPT_VERSION = "3"
+
+# Shapes the rest of the pipeline relies on (absent or null means default)
+RESPONSE_FIELD_TYPES = {
+    "diagnosis": str,
+    "recommendations": list,
+    "differential_diagnoses": list,
+    "explainability": dict,
+}
+
+MAX_OUTPUT_TOKENS = 1024
 
 MEDICAL_SYSTEM_PROMPT = """You are MedGemma, a clinical-grade AI triage assistant. Analyze the patient's symptoms and provide a structured medical assessment.
 
@@ -21,6 +54,9 @@ IMPORTANT: You are NOT a replacement for professional medical advice. Always rec
 
 If patient medical history is provided, consider it carefully — look for relevant interactions, contraindications, and how existing conditions may influence the current symptoms.
 
+If clinical guideline excerpts (WHO IMAI) are provided, ground your triage decision
+and severity in them and name the guideline rule you applied in your reasoning.
+
 Respond ONLY with valid JSON in this exact format (no markdown, no code fences, just raw JSON):
 {
   "diagnosis": "Brief primary assessment summary",
@@ -49,74 +85,263 @@ class GeminiService:
         Call Gemini API with patient symptoms and optional medical history.
         Returns parsed structured response.
         """
-        api_key = GEMINI_API_KEY
-        if not api_key:
+        emergency = GeminiService._prescreen(symptoms_text)
+        if emergency is not None:
+            return emergency
+
+        if not GeminiClientPool.is_configured():
             logger.warning("GEMINI_API_KEY not set — returning fallback response")
             return GeminiService._fallback_response(symptoms_text)
 
-        try:
-            client = genai.Client(api_key=api_key)
-
-            # Build user prompt
-            user_prompt = f"Patient symptoms: {symptoms_text}"
-            if medical_context:
-                user_prompt += f"\n\n--- Patient Medical History ---\n{medical_context}"
-            user_prompt += "\n\nProvide your clinical assessment as JSON."
-
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=[
-                    {"role": "user", "parts": [{"text": MEDICAL_SYSTEM_PROMPT + "\n\n" + user_prompt}]}
-                ],
-                config={
-                    "temperature": 0.3,
-                    "max_output_tokens": 1024,
-                    "response_mime_type": "application/json",
-                    "thinking_config": {"thinking_budget": 0},
-                },
-            )
+        with span("gemini.cache_lookup"):
+            cache_key = GeminiService._cache_key(symptoms_text, medical_context)
+            cached = InferenceCache.get(cache_key)
+        if cached is not None:
+            return cached
 
-            raw_text = response.text or ""
-            return GeminiService._parse_response(raw_text, symptoms_text)
+        breaker = gemini_breaker()
+        if not breaker.allow_request():
+            logger.warning("Gemini circuit breaker open — returning fallback response")
+            return GeminiService._fallback_response(symptoms_text)
 
+        contents = GeminiService._build_contents(symptoms_text, medical_context)
+        try:
+            raw_text, model = GeminiService._generate(contents, breaker)
         except Exception as e:
             logger.error("Gemini API call failed: %s", str(e))
             return GeminiService._fallback_response(symptoms_text)
 
+        result = GeminiService._parse_response(raw_text, symptoms_text)
+        GeminiService._finish(cache_key, result, model)
+        return result
+
     @staticmethod
-    def _parse_response(raw: str, symptoms_text: str) -> dict:
-        """Parse JSON from Gemini response with fallback."""
+    def _generate(contents: list, breaker) -> tuple[str, str]:
+        """
+        generate_content with retries inside one deadline budget.
+        Each attempt gets an equal share of the remaining budget as its
+        HTTP timeout; transient failures are retried with jittered backoff.
+        Every attempt reserves provider quota first (see provider_quota),
+        which may pick a cheaper model. Returns ``(text, model)``.
+        """
+        deadline = Deadline(settings.GEMINI_DEADLINE_SECONDS)
+        max_attempts = settings.GEMINI_MAX_ATTEMPTS
+        min_attempt = settings.GEMINI_MIN_ATTEMPT_SECONDS
+        tokens = GeminiService._estimate_tokens(contents)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            model = GeminiService._reserve_quota(tokens, deadline)
+            share = deadline.remaining() / (max_attempts - attempt + 1)
+            timeout = min(deadline.remaining(), max(share, min_attempt))
+
+            try:
+                with span("gemini.call"), GeminiClientPool.client() as client:
+                    response = client.models.generate_content(
+                        model=model,
+                        contents=contents,
+                        config=GeminiService._generation_config(timeout),
+                    )
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                breaker.record_failure()
+
+                delay = backoff_delay(attempt)
+                if (
+                    attempt >= max_attempts
+                    or deadline.remaining() - delay < min_attempt
+                    or breaker.state() != CircuitBreaker.CLOSED
+                ):
+                    raise
+                logger.warning(
+                    "Gemini attempt %d failed (%s); retrying in %.2fs",
+                    attempt, e, delay,
+                )
+                time.sleep(delay)
+                continue
+
+            breaker.record_success()
+            GeminiService._reconcile_quota(model, tokens, response)
+            return response.text or "", model
+
+    @staticmethod
+    def stream_inference(
+        symptoms_text: str,
+        medical_context: str = "",
+    ):
+        """
+        Stream a Gemini assessment as it is generated.
+
+        Yields parser events (``delta``/``item``/``field`` tuples, see
+        IncrementalJSONParser) while chunks arrive, then a final
+        ``("result", None, dict)`` with the same shape as run_inference().
+        """
+        emergency = GeminiService._prescreen(symptoms_text)
+        if emergency is not None:
+            yield ("result", None, emergency)
+            return
+
+        if not GeminiClientPool.is_configured():
+            logger.warning("GEMINI_API_KEY not set — returning fallback response")
+            yield ("result", None, GeminiService._fallback_response(symptoms_text))
+            return
+
+        cache_key = GeminiService._cache_key(symptoms_text, medical_context)
+        cached = InferenceCache.get(cache_key)
+        if cached is not None:
+            yield ("delta", "diagnosis", cached["diagnosis"])
+            for item in cached["recommendations"]:
+                yield ("item", "recommendations", item)
+            for key in ("diagnosis", "severity", "confidence_score", "recommendations"):
+                yield ("field", key, cached[key])
+            yield ("result", None, cached)
+            return
+
+        breaker = gemini_breaker()
+        if not breaker.allow_request():
+            logger.warning("Gemini circuit breaker open — returning fallback response")
+            yield ("result", None, GeminiService._fallback_response(symptoms_text))
+            return
+
+        contents = GeminiService._build_contents(symptoms_text, medical_context)
+        tokens = GeminiService._estimate_tokens(contents)
+        try:
+            model = GeminiService._reserve_quota(
+                tokens, Deadline(settings.GEMINI_DEADLINE_SECONDS),
+            )
+        except QuotaExhausted as e:
+            logger.warning("%s — returning fallback response", e)
+            yield ("result", None, GeminiService._fallback_response(symptoms_text))
+            return
+
+        parser = IncrementalJSONParser()
+        raw_parts = []
+        chunk = None
         try:
-            # Strip markdown code fences if present
-            cleaned = raw.strip()
-            if cleaned.startswith("```"):
-                # Remove opening fence (```json or ```)
-                first_newline = cleaned.index("\n")
-                cleaned = cleaned[first_newline + 1:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
-
-            parsed = json.loads(cleaned)
-
-            # Validate and normalize
-            severity = (parsed.get("severity", "MEDIUM") or "MEDIUM").upper()
-            if severity not in ("LOW", "MEDIUM", "HIGH", "CRITICAL"):
-                severity = "MEDIUM"
-
-            confidence = parsed.get("confidence_score", 0.5)
-            confidence = max(0.0, min(1.0, float(confidence)))
+            with span("gemini.stream"):
+                stream = GeminiClientPool.stream(
+                    model=model,
+                    contents=contents,
+                    config=GeminiService._generation_config(
+                        settings.GEMINI_DEADLINE_SECONDS
+                    ),
+                )
+                for chunk in stream:
+                    text = chunk.text or ""
+                    raw_parts.append(text)
+                    yield from parser.feed(text)
+            breaker.record_success()
+            # Usage is reported on the final chunk
+            GeminiService._reconcile_quota(model, tokens, chunk)
+        except ValueError as e:
+            # Malformed JSON mid-stream: fall through to the tolerant parse below
+            logger.warning("Streamed Gemini output is not valid JSON: %s", str(e))
+            parser = None
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            logger.error("Gemini streaming call failed: %s", str(e))
+            yield ("result", None, GeminiService._fallback_response(symptoms_text))
+            return
 
-            return {
-                "diagnosis": parsed.get("diagnosis", "Assessment pending"),
-                "severity": severity,
-                "confidence_score": confidence,
-                "recommendations": parsed.get("recommendations", []),
-                "differential_diagnoses": parsed.get("differential_diagnoses", []),
-                "explainability": parsed.get("explainability", {}),
-                "raw_model_output": raw[:2000],
+        raw = "".join(raw_parts)
+        result = None
+        if parser is not None and parser.done:
+            try:
+                result = GeminiService._normalize(parser.close(), raw)
+            except ValueError:
+                pass
+        if result is None:
+            result = GeminiService._parse_response(raw, symptoms_text)
+        GeminiService._finish(cache_key, result, model)
+        yield ("result", None, result)
+
+    @staticmethod
+    def _cache_key(symptoms_text: str, medical_context: str) -> str:
+        return InferenceCache.make_key(
+            symptoms_text,
+            medical_context,
+            model=settings.GEMINI_MODEL,
+            # Guideline edits change the prompt too
+            prompt_version=f"{PROMPT_VERSION}.{GuidelineIndex.digest()}",
+        )
+
+    @staticmethod
+    def _finish(cache_key: str, result: dict, model: str) -> None:
+        """Cache a primary-model answer; tag one served by the downgrade model."""
+        if model == settings.GEMINI_MODEL:
+            GeminiService._store(cache_key, result)
+        else:
+            result["explainability"]["served_by_model"] = model
+
+    @staticmethod
+    def _estimate_tokens(contents: list) -> int:
+        prompt = "".join(part["text"] for c in contents for part in c["parts"])
+        return estimate_tokens(prompt) + MAX_OUTPUT_TOKENS
+
+    @staticmethod
+    @timed("gemini.quota")
+    def _reserve_quota(tokens: int, deadline: Deadline) -> str:
+        """Reserve RPM/TPM budget, leaving time for the call itself."""
+        max_wait = min(
+            settings.GEMINI_QUOTA_MAX_WAIT_SECONDS,
+            max(0.0, deadline.remaining() - settings.GEMINI_MIN_ATTEMPT_SECONDS),
+        )
+        return reserve(tokens, max_wait)
+
+    @staticmethod
+    def _reconcile_quota(model: str, estimated: int, response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        actual = getattr(usage, "total_token_count", None)
+        if actual:
+            provider_quota(model).reconcile(estimated, actual)
+
+    @staticmethod
+    def _store(cache_key: str, result: dict) -> None:
+        """Cache well-formed model answers; never cache parse failures."""
+        if "parse_error" not in result.get("explainability", {}):
+            InferenceCache.set(cache_key, result)
+
+    @staticmethod
+    @timed("gemini.build_prompt")
+    def _build_contents(symptoms_text: str, medical_context: str) -> list:
+        user_prompt = f"Patient symptoms: {symptoms_text}"
+        if medical_context:
+            user_prompt += f"\n\n--- Patient Medical History ---\n{medical_context}"
+        guidelines = GuidelineIndex.render(symptoms_text)
+        if guidelines:
+            user_prompt += f"\n\n--- Relevant Clinical Guidelines ---\n{guidelines}"
+        user_prompt += "\n\nProvide your clinical assessment as JSON."
+
+        return [
+            {
+                "role": "user",
+                "parts": [{"text": MEDICAL_SYSTEM_PROMPT + "\n\n" + user_prompt}],
             }
-        except (json.JSONDecodeError, ValueError) as e:
+        ]
+
+    @staticmethod
+    def _generation_config(timeout_seconds: float) -> dict:
+        return {
+            "temperature": 0.3,
+            "max_output_tokens": MAX_OUTPUT_TOKENS,
+            "response_mime_type": "application/json",
+            "thinking_config": {"thinking_budget": 0},
+            "http_options": {"timeout": int(timeout_seconds * 1000)},
+        }
+
+    @staticmethod
+    @timed("gemini.parse")
+    def _parse_response(raw: str, symptoms_text: str) -> dict:
+        """Parse JSON from Gemini response with fallback."""
+        try:
+            # The incremental parser skips markdown code fences itself
+            parser = IncrementalJSONParser()
+            parser.feed(raw)
+            return GeminiService._normalize(parser.close(), raw)
+        except ValueError as e:
             logger.warning("Failed to parse Gemini response: %s", str(e))
             return {
                 "diagnosis": raw[:500] if raw else "AI analysis completed.",
@@ -133,9 +358,66 @@ class GeminiService:
                 "raw_model_output": raw[:2000],
             }
 
+    @staticmethod
+    def _normalize(parsed: dict, raw: str) -> dict:
+        """
+        Validate and normalize a parsed model response. Raises ValueError
+        when a field has the wrong type, so callers fall back as they do
+        for malformed JSON.
+        """
+        if not isinstance(parsed, dict):
+            raise ValueError("Response is not a JSON object")
+        for name, kind in RESPONSE_FIELD_TYPES.items():
+            value = parsed.get(name)
+            if value is not None and not isinstance(value, kind):
+                raise ValueError(f"{name} is not a {kind.__name__}")
+
+        severity = parsed.get("severity", "MEDIUM") or "MEDIUM"
+        if not isinstance(severity, str):
+            raise ValueError("severity is not a string")
+        severity = severity.upper()
+        if severity not in ("LOW", "MEDIUM", "HIGH", "CRITICAL"):
+            severity = "MEDIUM"
+
+        try:
+            confidence = float(parsed.get("confidence_score", 0.5))
+        except TypeError:
+            raise ValueError("confidence_score is not a number") from None
+        confidence = max(0.0, min(1.0, confidence))
+
+        return {
+            "diagnosis": parsed.get("diagnosis") or "Assessment pending",
+            "severity": severity,
+            "confidence_score": confidence,
+            "recommendations": parsed.get("recommendations") or [],
+            "differential_diagnoses": parsed.get("differential_diagnoses") or [],
+            "explainability": parsed.get("explainability") or {},
+            "raw_model_output": raw[:2000],
+        }
+
+    @staticmethod
+    @timed("rules.prescreen")
+    def _prescreen(symptoms_text: str) -> dict | None:
+        """Rule-engine answer for unmistakable emergencies, else None."""
+        if not settings.TRIAGE_RULE_PRESCREEN:
+            return None
+        assessment = RuleEngine.evaluate(symptoms_text)
+        if not assessment["emergency"]:
+            return None
+        _prescreens.inc(rule=assessment["matches"][0]["rule"])
+        logger.info(
+            "Emergency pre-screen matched %s",
+            [m["rule"] for m in assessment["matches"]],
+        )
+        return GeminiService._rule_response(assessment, mode="prescreen")
+
     @staticmethod
     def _fallback_response(symptoms_text: str) -> dict:
         """Return a sensible fallback when API is unavailable."""
+        assessment = RuleEngine.evaluate(symptoms_text)
+        if assessment["matches"]:
+            return GeminiService._rule_response(assessment, mode="fallback")
+
         return {
             "diagnosis": (
                 f"Based on your reported symptoms ({symptoms_text[:200]}...), "
@@ -162,3 +444,46 @@ class GeminiService:
             },
             "raw_model_output": "",
         }
+
+    @staticmethod
+    def _rule_response(assessment: dict, mode: str) -> dict:
+        """Shape a RuleEngine assessment like a model result."""
+        matches = assessment["matches"]
+        conditions = [m["condition"] for m in matches]
+        reasoning = "; ".join(
+            f"{m['condition']} (guideline section {m['guideline_section']}: "
+            f"{', '.join(RuleEngine.describe(s) for s in m['signs'])})"
+            for m in matches
+        )
+        if mode == "fallback":
+            reasoning = (
+                "The AI inference service is unavailable. Rule-based triage: "
+                + reasoning
+            )
+
+        return {
+            "diagnosis": f"Rule-based triage: {', '.join(conditions)}.",
+            "severity": assessment["severity"],
+            "confidence_score": 0.7,
+            "recommendations": [
+                *assessment["recommendations"],
+                "Consult a healthcare professional for a full assessment",
+            ],
+            "differential_diagnoses": [
+                {"condition": condition, "confidence": 0.5}
+                for condition in conditions[1:]
+            ],
+            "explainability": {
+                "contributing_factors": [
+                    RuleEngine.describe(s)
+                    for s in dict.fromkeys(s for m in matches for s in m["signs"])
+                ],
+                "reasoning": reasoning,
+                "rule_engine": {
+                    "mode": mode,
+                    "rules": [m["rule"] for m in matches],
+                    "vitals": assessment["vitals"],
+                },
+            },
+            "raw_model_output": "",
+        }
@@ -0,0 +1,135 @@
+"""
+Clinical guideline retrieval.
+
+docs/Clinical_Guidelines.md is split into its numbered condition
+sections and indexed once per process. Each triage prompt then carries
+only the few sections relevant to the reported symptoms, within
+GUIDELINE_TOKEN_BUDGET, instead of the whole document.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from django.conf import settings
+
+from apps.common.metrics import registry
+from apps.common.search import BM25, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_SECTION_HEADER = re.compile(
+    r"^-{10,}\s*\nSECTION (\d+)\s*[—-]\s*(.+?)\s*\n-{10,}\s*$", re.M
+)
+
+# Sections about the document itself rather than patient care
+_META_SECTIONS = ("USAGE NOTES", "PROMPTING")
+
+_lookups = registry.counter(
+    "guideline_lookups_total",
+    "Guideline retrievals by outcome (hit / miss).",
+)
+_section_hits = registry.counter(
+    "guideline_section_hits_total",
+    "Times each guideline section was injected into a prompt.",
+)
+
+
+class GuidelineSection(NamedTuple):
+    number: int
+    title: str
+    text: str
+    tokens: int
+
+
+def parse_sections(markdown: str) -> list[GuidelineSection]:
+    """Split the guideline document into clinical sections."""
+    headers = list(_SECTION_HEADER.finditer(markdown))
+    sections = []
+    for i, header in enumerate(headers):
+        title = header.group(2)
+        if title.upper().startswith(_META_SECTIONS):
+            continue
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(markdown)
+        body = markdown[header.end():end]
+        # Drop the trailing "END" banner of the last section
+        body = re.split(r"^-{10,}\s*\nEND\b", body, flags=re.M)[0].strip()
+        text = f"{title}\n{body}"
+        sections.append(
+            GuidelineSection(int(header.group(1)), title, text, estimate_tokens(text))
+        )
+    return sections
+
+
+class GuidelineIndex:
+    """Process-wide BM25 index over the guideline sections."""
+
+    _lock = threading.Lock()
+    _sections: list[GuidelineSection] | None = None
+    _bm25: BM25 | None = None
+    _digest = ""
+
+    @classmethod
+    def load(cls) -> None:
+        """(Re)build the index from CLINICAL_GUIDELINES_PATH."""
+        path = Path(settings.CLINICAL_GUIDELINES_PATH)
+        try:
+            markdown = path.read_text(encoding="utf-8")
+        except OSError:
+            logger.warning(
+                "Clinical guidelines not found at %s — prompts are ungrounded", path
+            )
+            markdown = ""
+
+        sections = parse_sections(markdown)
+        with cls._lock:
+            cls._sections = sections
+            # Titles weigh in twice so "malaria" finds the malaria section
+            cls._bm25 = BM25([f"{s.title}\n{s.text}" for s in sections])
+            cls._digest = hashlib.sha256(markdown.encode()).hexdigest()[:12]
+        logger.info("Indexed %d clinical guideline sections", len(sections))
+
+    @classmethod
+    def digest(cls) -> str:
+        """Short hash of the indexed document, for cache keys."""
+        cls._ensure_loaded()
+        return cls._digest
+
+    @classmethod
+    def search(
+        cls, query: str, k: int = None, token_budget: int = None
+    ) -> list[GuidelineSection]:
+        """Top ``k`` sections relevant to ``query`` that fit in the token budget."""
+        cls._ensure_loaded()
+        k = k or settings.GUIDELINE_TOP_K
+        budget = token_budget or settings.GUIDELINE_TOKEN_BUDGET
+
+        selected, used = [], 0
+        for i, _ in cls._bm25.top(query, k):
+            section = cls._sections[i]
+            if used + section.tokens > budget:
+                continue
+            selected.append(section)
+            used += section.tokens
+
+        _lookups.inc(outcome="hit" if selected else "miss")
+        for section in selected:
+            _section_hits.inc(section=str(section.number))
+        logger.info(
+            "Guideline grounding: sections=%s tokens=%d",
+            [s.number for s in selected], used,
+        )
+        return selected
+
+    @classmethod
+    def render(cls, query: str) -> str:
+        """Prompt block for the sections relevant to ``query`` ("" if none)."""
+        return "\n\n".join(s.text for s in cls.search(query))
+
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        if cls._bm25 is None:
+            cls.load()
@@ -0,0 +1,94 @@
+"""
+Content-addressed cache for Gemini triage results.
+
+Keys hash the normalized symptoms text together with a digest of the
+patient's medical context, the model name and the prompt version, so a
+change to any of them naturally misses. Storage goes through the
+"inference" Django cache alias (locmem, file or Redis, see settings).
+"""
+
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.common.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+_lookups = registry.counter(
+    "triage_inference_cache_lookups_total",
+    "Inference cache lookups by outcome (hit/miss).",
+)
+
+
+class InferenceCache:
+    """Read-through cache in front of GeminiService model calls."""
+
+    @staticmethod
+    def normalize_symptoms(symptoms_text: str) -> str:
+        """Fold case, Unicode forms, punctuation and whitespace differences."""
+        text = unicodedata.normalize("NFKC", symptoms_text or "").lower()
+        text = re.sub(r"[^\w%./-]+", " ", text)
+        return " ".join(text.split()).strip(" .")
+
+    @staticmethod
+    def context_digest(medical_context: str) -> str:
+        return hashlib.sha256((medical_context or "").encode()).hexdigest()
+
+    @staticmethod
+    def make_key(
+        symptoms_text: str,
+        medical_context: str,
+        model: str,
+        prompt_version: str,
+    ) -> str:
+        material = json.dumps(
+            [
+                InferenceCache.normalize_symptoms(symptoms_text),
+                InferenceCache.context_digest(medical_context),
+                model,
+                prompt_version,
+            ]
+        )
+        return "triage:" + hashlib.sha256(material.encode()).hexdigest()
+
+    @staticmethod
+    def get(key: str) -> dict | None:
+        if not settings.INFERENCE_CACHE_ENABLED:
+            return None
+        try:
+            value = caches["inference"].get(key)
+        except Exception as e:
+            logger.warning("Inference cache read failed: %s", e)
+            value = None
+
+        _lookups.inc(outcome="hit" if value is not None else "miss")
+        return value
+
+    @staticmethod
+    def set(key: str, result: dict) -> None:
+        if not settings.INFERENCE_CACHE_ENABLED:
+            return
+        try:
+            caches["inference"].set(key, result, settings.INFERENCE_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Inference cache write failed: %s", e)
+
+    @staticmethod
+    def stats() -> dict:
+        hits = _lookups.value(outcome="hit")
+        misses = _lookups.value(outcome="miss")
+        total = hits + misses
+        return {
+            "enabled": settings.INFERENCE_CACHE_ENABLED,
+            "backend": settings.INFERENCE_CACHE_BACKEND,
+            "ttl_seconds": settings.INFERENCE_CACHE_TTL_SECONDS,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
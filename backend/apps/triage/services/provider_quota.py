@@ -0,0 +1,206 @@
+"""
+Provider quota (requests and tokens per minute) shared by all workers.
+
+Gemini enforces RPM and TPM per project, so the budget is tracked in the
+"shared" cache alias where every gunicorn worker and job runner sees the
+same counters. Usage is a sliding window: the current minute's count
+plus the previous minute's, weighted by how much of it still overlaps
+the window. Reservations are increments that are rolled back when they
+would exceed the budget; they are only atomic, and the budget only
+holds across workers, with an alias whose add/incr are atomic: Redis
+(across hosts) or LockingFileBasedCache (the "file" backend, one host).
+A "locmem" alias gives each worker its own budget.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.common.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+_decisions = registry.counter(
+    "triage_gemini_quota_decisions_total",
+    "Quota reservations by model and outcome "
+    "(granted / waited / downgraded / rejected).",
+)
+
+
+class QuotaExhausted(Exception):
+    """No budget left within the allowed wait; retry after ``retry_after`` seconds."""
+
+    def __init__(self, model: str, retry_after: float):
+        super().__init__(f"Gemini quota exhausted for {model}.")
+        self.model = model
+        self.retry_after = retry_after
+
+
+class ProviderQuota:
+    """Sliding-window RPM/TPM budget for one model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int):
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+
+    @property
+    def _cache(self):
+        return caches["shared"]
+
+    def try_acquire(self, tokens: int) -> float:
+        """Reserve one request and ``tokens``; 0.0 on success, else seconds to wait."""
+        window, elapsed = self._window()
+        req_key, tok_key = self._keys(window)
+        prev_req_key, prev_tok_key = self._keys(window - 1)
+        overlap = 1 - elapsed / WINDOW_SECONDS
+
+        requests = self._incr(req_key, 1)
+        used_tokens = self._incr(tok_key, tokens)
+        prev = self._cache.get_many([prev_req_key, prev_tok_key])
+
+        wait = max(
+            self._wait(requests, prev.get(prev_req_key, 0), overlap, self.rpm),
+            self._wait(used_tokens, prev.get(prev_tok_key, 0), overlap, self.tpm),
+        )
+        if wait > 0:
+            self._incr(req_key, -1)
+            self._incr(tok_key, -tokens)
+        return wait
+
+    def acquire(self, tokens: int, max_wait: float) -> bool:
+        """Reserve, sleeping up to ``max_wait`` seconds; True if the caller waited."""
+        give_up_at = time.monotonic() + max_wait
+        waited = False
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return waited
+            remaining = give_up_at - time.monotonic()
+            if wait > remaining:
+                raise QuotaExhausted(self.model, wait)
+            waited = True
+            time.sleep(wait)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Correct the token count once the provider reports real usage."""
+        if actual and actual != estimated:
+            window, _ = self._window()
+            self._incr(self._keys(window)[1], actual - estimated)
+
+    def usage(self) -> dict:
+        window, elapsed = self._window()
+        req_key, tok_key = self._keys(window)
+        prev_req_key, prev_tok_key = self._keys(window - 1)
+        overlap = 1 - elapsed / WINDOW_SECONDS
+        counts = self._cache.get_many([req_key, tok_key, prev_req_key, prev_tok_key])
+        return {
+            "model": self.model,
+            "rpm_limit": self.rpm,
+            "rpm_used": round(
+                counts.get(req_key, 0) + counts.get(prev_req_key, 0) * overlap, 1
+            ),
+            "tpm_limit": self.tpm,
+            "tpm_used": round(
+                counts.get(tok_key, 0) + counts.get(prev_tok_key, 0) * overlap
+            ),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                           #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _window() -> tuple[int, float]:
+        now = time.time()
+        return int(now // WINDOW_SECONDS), now % WINDOW_SECONDS
+
+    def _keys(self, window: int) -> tuple[str, str]:
+        return f"quota:{self.model}:req:{window}", f"quota:{self.model}:tok:{window}"
+
+    def _incr(self, key: str, delta: int) -> int:
+        # add() and incr() are each atomic on the shared backends (see above)
+        self._cache.add(key, 0, timeout=WINDOW_SECONDS * 2)
+        try:
+            return self._cache.incr(key, delta)
+        except ValueError:
+            # Expired between add() and incr()
+            self._cache.set(key, max(delta, 0), timeout=WINDOW_SECONDS * 2)
+            return max(delta, 0)
+
+    @staticmethod
+    def _wait(used: float, prev: float, overlap: float, limit: int) -> float:
+        """Seconds until the previous window decays enough for ``used`` to fit."""
+        if not limit:
+            return 0.0
+        excess = used + prev * overlap - limit
+        if excess <= 0:
+            return 0.0
+        if prev and excess < prev * overlap:
+            # The previous minute's share drains at prev/WINDOW per second
+            return max(0.05, excess * WINDOW_SECONDS / prev)
+        # Only a new window frees enough room
+        return max(0.05, overlap * WINDOW_SECONDS)
+
+
+def provider_quota(model: str) -> ProviderQuota:
+    """Quota for ``model``: the primary or the downgrade model from settings."""
+    if model == settings.GEMINI_MODEL:
+        return ProviderQuota(
+            model, settings.GEMINI_QUOTA_RPM, settings.GEMINI_QUOTA_TPM
+        )
+    return ProviderQuota(
+        model, settings.GEMINI_FALLBACK_QUOTA_RPM, settings.GEMINI_FALLBACK_QUOTA_TPM,
+    )
+
+
+def reserve(tokens: int, max_wait: float) -> str:
+    """
+    Reserve budget for one call according to GEMINI_QUOTA_POLICY and
+    return the model to call; raises QuotaExhausted when the policy
+    gives up.
+
+    - ``wait``: block up to ``max_wait`` for the primary model's budget.
+    - ``downgrade``: switch to GEMINI_FALLBACK_MODEL while the primary
+      budget is spent.
+    - ``fail_fast``: give up immediately.
+    """
+    model = settings.GEMINI_MODEL
+    primary = provider_quota(model)
+    wait = primary.try_acquire(tokens)
+    if wait == 0:
+        _decisions.inc(model=model, outcome="granted")
+        return model
+
+    policy = settings.GEMINI_QUOTA_POLICY
+    fallback_model = settings.GEMINI_FALLBACK_MODEL
+    if policy == "downgrade" and fallback_model and fallback_model != model:
+        if provider_quota(fallback_model).try_acquire(tokens) == 0:
+            _decisions.inc(model=fallback_model, outcome="downgraded")
+            logger.info(
+                "Gemini quota spent for %s; downgrading to %s", model, fallback_model
+            )
+            return fallback_model
+
+    if policy == "wait" and wait <= max_wait:
+        try:
+            primary.acquire(tokens, max_wait)
+        except QuotaExhausted:
+            pass
+        else:
+            _decisions.inc(model=model, outcome="waited")
+            return model
+
+    _decisions.inc(model=model, outcome="rejected")
+    raise QuotaExhausted(model, wait)
+
+
+def quota_usage() -> list[dict]:
+    models = [settings.GEMINI_MODEL]
+    if settings.GEMINI_FALLBACK_MODEL and settings.GEMINI_FALLBACK_MODEL not in models:
+        models.append(settings.GEMINI_FALLBACK_MODEL)
+    return [provider_quota(m).usage() for m in models]
@@ -0,0 +1,362 @@
+"""
+Deterministic rule-based triage.
+
+The Quick Check emergency signs and condition flowcharts from
+docs/Clinical_Guidelines.md (WHO IMAI), encoded as a decision table.
+Symptom text is reduced to a set of signs (keyword patterns plus vitals
+such as SpO2, systolic BP and respiratory rate parsed from the text);
+each rule then matches on set membership, so evaluation is a handful of
+precompiled regex scans and takes microseconds.
+
+Used as the fallback when Gemini is unavailable, as a pre-screen that
+answers obvious emergencies without a model call, and to check
+client-side results for under-triage.
+"""
+
+import re
+from typing import NamedTuple
+
+SEVERITY_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+# sign → phrases (matched as word prefixes, so "suicid" covers "suicidal")
+SIGN_PHRASES = {
+    "fever": ["fever", "febrile", "high temperature", "chills", "rigors"],
+    "cough": ["cough"],
+    "resp_distress": [
+        "can't breathe", "cannot breathe", "unable to breathe", "not breathing",
+        "struggling to breathe", "gasping", "choking", "blue lips", "cyanosis",
+        "severe respiratory distress", "severe shortness of breath",
+    ],
+    "breathless": [
+        "shortness of breath", "short of breath", "breathless",
+        "difficulty breathing", "wheez",
+    ],
+    "shock_signs": [
+        "cold extremities", "cold hands and feet", "cold and clammy", "clammy",
+        "weak pulse", "weak and rapid pulse", "delayed capillary refill",
+        "poor perfusion", "not passing urine", "in shock",
+    ],
+    "unresponsive": [
+        "unresponsive", "unconscious", "passed out", "fainted", "collapsed",
+        "won't wake", "not waking", "decreased consciousness",
+    ],
+    "confusion": [
+        "confused", "confusion", "disoriented", "impaired consciousness", "drowsy",
+    ],
+    "severe_bleeding": [
+        "severe bleeding", "heavy bleeding", "bleeding heavily", "won't stop bleeding",
+        "uncontrolled bleeding", "haemorrhag", "hemorrhag", "vomiting blood",
+        "coughing up blood",
+    ],
+    "chest_pain": [
+        "chest pain", "chest tightness", "pressure in my chest", "crushing chest",
+    ],
+    "seizure": ["seizure", "convulsion", "fitting"],
+    "malaria_exposure": ["malaria", "travel", "endemic", "mosquito"],
+    "severe_anaemia": ["severe anemia", "severe anaemia", "very pale", "pallor"],
+    "unable_to_feed": [
+        "unable to eat", "can't eat", "cannot eat", "unable to drink",
+        "can't keep anything down", "unable to feed", "not feeding",
+    ],
+    "lesion": ["mole", "lesion", "skin growth", "freckle", "birthmark"],
+    "bleeding": ["bleed", "ulcerat", "oozing"],
+    "abcde_asymmetry": ["asymmetr", "uneven shape", "lopsided"],
+    "abcde_border": [
+        "irregular border", "irregular edge", "ragged", "jagged", "blurred edge",
+    ],
+    "abcde_color": [
+        "changed colo", "multiple colo", "different colo", "darkening", "turned black",
+    ],
+    "abcde_evolving": [
+        "growing", "getting bigger", "changing", "evolving", "changed shape",
+        "changed size",
+    ],
+    "skin_infection": [
+        "pus", "spreading redness", "spreading erythema", "abscess", "warm and swollen",
+    ],
+    "suicidal": [
+        "suicid", "kill myself", "end my life", "take my own life",
+        "want to die", "self-harm", "self harm",
+        # Not bare "hurt myself": that is also how people describe accidents
+        "want to hurt myself", "going to hurt myself", "hurt myself on purpose",
+        "thoughts of hurting myself", "thinking of hurting myself",
+    ],
+    "low_mood": [
+        "depressed", "depression", "hopeless", "low mood", "worthless",
+        "lost interest", "anhedonia", "can't enjoy",
+    ],
+}
+
+SIGN_LABELS = {
+    "hypoxia": "SpO₂ below 90%",
+    "hypotension": "Systolic BP below 90 mmHg",
+    "tachypnoea": "Respiratory rate above 30/min",
+    "abcde_2plus": "Two or more ABCDE lesion features",
+    "lesion_bleeding": "Bleeding or ulcerating skin lesion",
+}
+
+
+class Rule(NamedTuple):
+    id: str
+    condition: str
+    severity: str
+    guideline_section: int
+    requires: tuple = ()
+    any_of: tuple = ()
+    recommendations: tuple = ()
+
+
+# Ordered most to least severe; every matching rule is reported
+RULES = (
+    Rule(
+        "quick_check_breathing", "Respiratory emergency", "CRITICAL", 1,
+        any_of=("resp_distress", "hypoxia"),
+        recommendations=(
+            "Call emergency services now — this may be a breathing emergency",
+            "Keep the airway clear and give oxygen if available",
+        ),
+    ),
+    Rule(
+        "quick_check_circulation", "Possible shock", "CRITICAL", 3,
+        any_of=("hypotension", "shock_signs"),
+        recommendations=(
+            "Call emergency services now — signs of shock need urgent IV fluids",
+            "Lie the person flat and keep them warm while help arrives",
+        ),
+    ),
+    Rule(
+        "quick_check_consciousness", "Decreased level of consciousness", "CRITICAL", 1,
+        any_of=("unresponsive",),
+        recommendations=(
+            "Call emergency services now",
+            "Place the person in the recovery position and check breathing",
+        ),
+    ),
+    Rule(
+        "quick_check_bleeding", "Severe bleeding", "CRITICAL", 1,
+        any_of=("severe_bleeding",),
+        recommendations=(
+            "Call emergency services now",
+            "Apply firm direct pressure to any external bleeding",
+        ),
+    ),
+    Rule(
+        "mental_health_red_flag", "Suicide risk", "CRITICAL", 6,
+        any_of=("suicidal",),
+        recommendations=(
+            "Do not stay alone — contact emergency services or a crisis line now",
+            "Remove access to means of self-harm and stay with a trusted person",
+        ),
+    ),
+    Rule(
+        "severe_pneumonia", "Suspected severe pneumonia", "HIGH", 2,
+        requires=("fever", "cough"), any_of=("tachypnoea", "resp_distress", "hypoxia"),
+        recommendations=(
+            "Seek urgent care today — oxygen and IV antibiotics may be needed",
+        ),
+    ),
+    Rule(
+        "severe_malaria", "Suspected severe malaria", "HIGH", 4,
+        requires=("fever", "malaria_exposure"),
+        any_of=(
+            "confusion", "unresponsive", "severe_anaemia", "resp_distress",
+            "breathless", "unable_to_feed", "seizure",
+        ),
+        recommendations=(
+            "Seek urgent care today — severe malaria needs parenteral artesunate",
+        ),
+    ),
+    Rule(
+        "quick_check_seizure", "Seizure", "HIGH", 1,
+        any_of=("seizure",),
+        recommendations=(
+            "Seek urgent care — protect the person from injury during any further "
+            "seizure",
+        ),
+    ),
+    Rule(
+        "chest_pain", "Chest pain", "HIGH", 1,
+        any_of=("chest_pain",),
+        recommendations=(
+            "Seek urgent care now — chest pain needs prompt assessment",
+        ),
+    ),
+    Rule(
+        "suspicious_lesion", "Suspicious skin lesion", "HIGH", 5,
+        any_of=("abcde_2plus", "lesion_bleeding"),
+        recommendations=(
+            "Arrange an urgent dermatology review or biopsy referral",
+            "Photograph the lesion with a scale to track changes",
+        ),
+    ),
+    Rule(
+        "malaria_suspected", "Possible malaria", "MEDIUM", 4,
+        requires=("fever", "malaria_exposure"),
+        recommendations=(
+            "Get a malaria test within 24 hours",
+        ),
+    ),
+    Rule(
+        "cough_fever", "Acute respiratory illness", "MEDIUM", 2,
+        requires=("fever", "cough"),
+        recommendations=(
+            "See a clinician to check your breathing rate",
+            "Seek urgent care if breathing becomes fast or difficult",
+        ),
+    ),
+    Rule(
+        "breathlessness", "Breathlessness", "MEDIUM", 2,
+        any_of=("breathless",),
+        recommendations=(
+            "See a clinician promptly; seek urgent care if it worsens at rest",
+        ),
+    ),
+    Rule(
+        "skin_infection", "Possible skin infection", "MEDIUM", 5,
+        any_of=("skin_infection",),
+        recommendations=(
+            "See a clinician about the infection; seek urgent care if fever develops",
+        ),
+    ),
+    Rule(
+        "mental_health_priority", "Low mood", "MEDIUM", 6,
+        any_of=("low_mood",),
+        recommendations=(
+            "Arrange a mental-health follow-up",
+        ),
+    ),
+)
+
+
+def _compile(phrases: list[str]) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(re.escape(p) for p in phrases) + ")")
+
+
+_SIGN_PATTERNS = {sign: _compile(phrases) for sign, phrases in SIGN_PHRASES.items()}
+
+# "no fever", "denies chest pain", "without cough" — drop the negated phrase
+_NEGATION = re.compile(
+    r"\b(?:no|denies|denied|without)\s+"
+    r"(?:any\s+|signs? of\s+|history of\s+)?\w+(?:\s+pain)?"
+)
+
+_SPO2 = re.compile(
+    r"\b(?:spo2|sp02|o2 sat\w*|oxygen(?: saturation| sat\w*| level)?|sats?)"
+    r"\D{0,12}?(\d{2,3})\s*%?"
+)
+_SBP = re.compile(
+    r"\b(?:bp|blood pressure|systolic)\D{0,12}?(\d{2,3})(?:\s*/\s*\d{2,3})?"
+)
+_RR = re.compile(
+    r"\b(?:rr|resp\w* rate|breathing rate)\D{0,12}?(\d{1,3})|(\d{1,3})\s*breaths"
+)
+_TEMP = re.compile(r"\b(\d{2,3}(?:\.\d)?)\s*°?\s*(c|f)\b")
+_SIZE_MM = re.compile(r"\b(\d{1,2}(?:\.\d)?)\s*mm\b")
+
+
+def _first_number(pattern: re.Pattern, text: str) -> float | None:
+    match = pattern.search(text)
+    if not match:
+        return None
+    return float(next(g for g in match.groups() if g is not None))
+
+
+class RuleEngine:
+    """Evaluate symptom text against the guideline decision table."""
+
+    @staticmethod
+    def evaluate(symptoms_text: str) -> dict:
+        """
+        Return ``severity`` (None when no rule matched), ``emergency``,
+        the matched rules, the detected signs and parsed vitals, and the
+        combined recommendations of the matched rules.
+        """
+        text = (symptoms_text or "").lower().replace("’", "'")
+        text = _NEGATION.sub(" ", text)
+
+        signs = {
+            sign for sign, pattern in _SIGN_PATTERNS.items() if pattern.search(text)
+        }
+        vitals = RuleEngine._vitals(text)
+        signs |= RuleEngine._derived_signs(signs, vitals, text)
+
+        matches = [
+            rule for rule in RULES
+            if all(s in signs for s in rule.requires)
+            and (not rule.any_of or any(s in signs for s in rule.any_of))
+        ]
+        severity = matches[0].severity if matches else None
+
+        recommendations = []
+        for rule in matches:
+            for rec in rule.recommendations:
+                if rec not in recommendations:
+                    recommendations.append(rec)
+
+        return {
+            "severity": severity,
+            "emergency": severity == "CRITICAL",
+            "matches": [
+                {
+                    "rule": rule.id,
+                    "condition": rule.condition,
+                    "severity": rule.severity,
+                    "guideline_section": rule.guideline_section,
+                    "signs": sorted(
+                        s for s in (*rule.requires, *rule.any_of) if s in signs
+                    ),
+                }
+                for rule in matches
+            ],
+            "signs": sorted(signs),
+            "vitals": vitals,
+            "recommendations": recommendations,
+        }
+
+    @staticmethod
+    def describe(sign: str) -> str:
+        """Human-readable label for a sign."""
+        return SIGN_LABELS.get(sign, sign.replace("_", " ").capitalize())
+
+    @staticmethod
+    def _vitals(text: str) -> dict:
+        vitals = {}
+        spo2 = _first_number(_SPO2, text)
+        if spo2 is not None and 50 <= spo2 <= 100:
+            vitals["spo2"] = spo2
+        sbp = _first_number(_SBP, text)
+        if sbp is not None and 40 <= sbp <= 260:
+            vitals["systolic_bp"] = sbp
+        rr = _first_number(_RR, text)
+        if rr is not None and 4 <= rr <= 80:
+            vitals["respiratory_rate"] = rr
+        temp = _TEMP.search(text)
+        if temp:
+            value = float(temp.group(1))
+            celsius = value if temp.group(2) == "c" else (value - 32) * 5 / 9
+            if 30 <= celsius <= 45:
+                vitals["temperature_c"] = round(celsius, 1)
+        return vitals
+
+    @staticmethod
+    def _derived_signs(signs: set, vitals: dict, text: str) -> set:
+        derived = set()
+        if vitals.get("spo2", 100) < 90:
+            derived.add("hypoxia")
+        if vitals.get("systolic_bp", 120) < 90:
+            derived.add("hypotension")
+        if vitals.get("respiratory_rate", 0) > 30:
+            derived.add("tachypnoea")
+        if vitals.get("temperature_c", 0) >= 38:
+            derived.add("fever")
+
+        if "lesion" in signs:
+            features = sum(1 for s in signs if s.startswith("abcde_"))
+            size = _first_number(_SIZE_MM, text)
+            if size is not None and size > 6:
+                features += 1
+            if features >= 2:
+                derived.add("abcde_2plus")
+            if "bleeding" in signs:
+                derived.add("lesion_bleeding")
+        return derived
@@ -0,0 +1,202 @@
+"""
+Incremental JSON parser for streamed model output.
+
+Scans a top-level JSON object as chunks arrive and reports progress
+without waiting for the full payload:
+
+- ("delta", key, text)  — new characters of a top-level string value
+- ("item", key, value)  — a completed element of a top-level array
+- ("field", key, value) — a completed top-level value
+
+Leading markdown code fences (```json) are skipped.
+"""
+
+import json
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """Single-pass scanner; feed() chunks, then close() for the object."""
+
+    def __init__(self):
+        self.fields = {}
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+
+        self._key = None
+        self._key_start = None
+        self._expect_key = True
+        self._value_start = None
+        self._value_is_array = False
+        self._item_start = None
+        self._string_value = False
+        self._emitted_text = ""
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                          #
+    # ------------------------------------------------------------------ #
+
+    def feed(self, chunk: str) -> list[tuple]:
+        """Consume a chunk of model output and return new events."""
+        events = []
+        if not chunk or self._done:
+            return events
+
+        self._text += chunk
+        text = self._text
+
+        while self._pos < len(text) and not self._done:
+            ch = text[self._pos]
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                self._scan_string_char(ch, events)
+            else:
+                self._scan_structural_char(ch, events)
+            self._pos += 1
+
+        if self._in_string and self._string_value and self._depth == 1:
+            delta = self._partial_string_delta()
+            if delta:
+                events.append(("delta", self._key, delta))
+
+        return events
+
+    def close(self) -> dict:
+        """Return the parsed object; raises ValueError if it never completed."""
+        if not self._started:
+            raise ValueError("No JSON object found in model output.")
+        if not self._done:
+            raise ValueError("Model output ended before the JSON object was complete.")
+        return self.fields
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    # ------------------------------------------------------------------ #
+    # Scanner                                                             #
+    # ------------------------------------------------------------------ #
+
+    def _scan_string_char(self, ch: str, events: list) -> None:
+        if self._escape:
+            self._escape = False
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._in_string = False
+            if self._depth == 1 and self._key_start is not None:
+                self._key = json.loads(self._text[self._key_start:self._pos + 1])
+                self._key_start = None
+
+    def _scan_structural_char(self, ch: str, events: list) -> None:
+        depth = self._depth
+
+        if ch == '"':
+            self._in_string = True
+            if depth == 1 and self._expect_key:
+                self._key_start = self._pos
+            elif depth == 1 and self._value_start is None:
+                self._begin_value(string=True)
+            elif depth == 2 and self._value_is_array and self._item_start is None:
+                self._item_start = self._pos
+            return
+
+        if ch in _WHITESPACE:
+            return
+
+        if depth == 1:
+            if ch == ":":
+                self._expect_key = False
+            elif ch == ",":
+                self._finish_value(events)
+            elif ch == "}":
+                self._finish_value(events)
+                self._depth = 0
+                self._done = True
+            elif self._value_start is None and not self._expect_key:
+                self._begin_value(string=False, array=(ch == "["))
+                if ch in "[{":
+                    self._depth += 1
+            elif ch in "[{":
+                self._depth += 1
+            return
+
+        if depth == 2 and self._value_is_array:
+            if ch in ",]":
+                self._finish_item(events)
+                if ch == "]":
+                    self._depth -= 1
+                return
+            if self._item_start is None:
+                self._item_start = self._pos
+
+        if ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+
+    # ------------------------------------------------------------------ #
+    # Value bookkeeping                                                   #
+    # ------------------------------------------------------------------ #
+
+    def _begin_value(self, string: bool, array: bool = False) -> None:
+        self._value_start = self._pos
+        self._string_value = string
+        self._value_is_array = array
+        self._item_start = None
+        self._emitted_text = ""
+
+    def _finish_value(self, events: list) -> None:
+        if self._key is not None and self._value_start is not None:
+            raw = self._text[self._value_start:self._pos].strip()
+            value = json.loads(raw)
+            if self._string_value:
+                delta = value[len(self._emitted_text):]
+                if delta:
+                    events.append(("delta", self._key, delta))
+            self.fields[self._key] = value
+            events.append(("field", self._key, value))
+
+        self._key = None
+        self._expect_key = True
+        self._value_start = None
+        self._value_is_array = False
+        self._string_value = False
+        self._item_start = None
+
+    def _finish_item(self, events: list) -> None:
+        if self._item_start is None:
+            return
+        raw = self._text[self._item_start:self._pos].strip()
+        self._item_start = None
+        if raw:
+            events.append(("item", self._key, json.loads(raw)))
+
+    def _partial_string_delta(self) -> str:
+        """Decode the in-progress string value, ignoring a half-sent character."""
+        body = self._text[self._value_start + 1:self._pos]
+        for trim in range(0, 7):
+            candidate = body[:len(body) - trim] if trim else body
+            try:
+                decoded = json.loads(f'"{candidate}"')
+            except ValueError:
+                continue
+            if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+                # High surrogate whose pair has not arrived yet
+                decoded = decoded[:-1]
+            delta = decoded[len(self._emitted_text):]
+            self._emitted_text = decoded
+            return delta
+        return ""
@@ -1,13 +1,32 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.utils import timezone
 
 from apps.audit.services.audit_service import AuditService
+from apps.common.services.job_queue import JobQueue
+from apps.common.tracing import current_trace, span, timed, trace
+from apps.records.services.record_service import RecordService
+from apps.triage.services.admission import (
+    AdmissionRejected,
+    inference_admission,
+    requires_slot,
+    symptom_priority,
+)
 from apps.triage.models.triage_session import (
     ImageAnalysis,
     TriageResult,
     TriageSession,
 )
+from apps.triage.services.gemini_service import GeminiService
+from apps.triage.services.rule_engine import SEVERITY_ORDER, RuleEngine
 from apps.xai.services.xai_service import XAIService
 
+logger = logging.getLogger(__name__)
+
 
 class TriageService:
     """
@@ -16,6 +35,7 @@ class TriageService:
     """
 
     @staticmethod
+    @timed("db.create_session")
     def create_session(
         user,
         symptoms_text: str = "",
@@ -23,6 +43,7 @@ class TriageService:
         inference_mode: str = "CLIENT",
         model_version: str = "",
         device_info: dict = None,
+        status: str = TriageSession.Status.PROCESSING,
         ip_address: str = None,
         user_agent: str = "",
     ) -> TriageSession:
@@ -31,7 +52,7 @@ class TriageService:
             user=user,
             symptoms_text=symptoms_text,
             source=source,
-            status=TriageSession.Status.PROCESSING,
+            status=status,
             inference_mode=inference_mode,
             model_version=model_version,
             device_info=device_info or {},
@@ -51,6 +72,7 @@ class TriageService:
         return session
 
     @staticmethod
+    @timed("db.save_result")
     @transaction.atomic
     def save_result(
         session: TriageSession,
@@ -68,7 +90,8 @@ class TriageService:
         """
         Persist an AI inference result (from client-side or server-side).
         Updates the session status to COMPLETED.
-        Auto-generates an XAI explanation after saving.
+        The XAI explanation is generated by a background job queued once
+        this transaction commits.
         """
         result = TriageResult.objects.create(
             session=session,
@@ -95,16 +118,582 @@ class TriageService:
             changes={"severity": severity, "confidence": confidence_score},
         )
 
-        # Auto-generate XAI explanation
-        XAIService.generate_explanation(
-            triage_result=result,
-            method="SHAP",
-            user=user or session.user,
+        # Explain outside the transaction so row locks are released sooner
+        transaction.on_commit(
+            lambda: XAIService.enqueue_explanation(
+                result,
+                user=user or session.user,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+        )
+
+        return result
+
+    # ---------------------------------------------------------------
+    # Server-side inference
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def run_server_inference(
+        session: TriageSession,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> TriageResult:
+        """
+        Run Gemini inference for a session and persist the result.
+        Shared by the synchronous endpoint and the background worker.
+        Sampled requests (TRACE_SAMPLE_RATE) keep their per-stage
+        timings in ``TriageResult.timings``.
+        """
+        with trace("triage.inference"):
+            medical_context = RecordService.get_patient_medical_context(
+                session.user, session.symptoms_text,
+            )
+
+            ai_result = GeminiService.run_inference(
+                symptoms_text=session.symptoms_text,
+                medical_context=medical_context or "",
+            )
+
+            result = TriageService.save_ai_result(
+                session,
+                ai_result,
+                medical_context_used=bool(medical_context),
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+            TriageService._attach_timings(result)
+            return result
+
+    @staticmethod
+    def stream_server_inference(
+        session: TriageSession,
+        ip_address: str = None,
+        user_agent: str = "",
+    ):
+        """
+        Streaming variant of run_server_inference().
+        Re-yields GeminiService.stream_inference() events as they arrive,
+        then persists the final result and yields ``("saved", None, result)``.
+        """
+        medical_context = RecordService.get_patient_medical_context(
+            session.user, session.symptoms_text,
+        )
+
+        ai_result = None
+        for event in GeminiService.stream_inference(
+            symptoms_text=session.symptoms_text,
+            medical_context=medical_context or "",
+        ):
+            if event[0] == "result":
+                ai_result = event[2]
+            else:
+                yield event
+
+        result = TriageService.save_ai_result(
+            session,
+            ai_result,
+            medical_context_used=bool(medical_context),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        yield ("saved", None, result)
+
+    @staticmethod
+    def save_ai_result(
+        session: TriageSession,
+        ai_result: dict,
+        medical_context_used: bool = False,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> TriageResult:
+        """Persist a GeminiService result dict for a server-side session."""
+        return TriageService.save_result(
+            session=session,
+            diagnosis=ai_result["diagnosis"],
+            severity=ai_result["severity"],
+            confidence_score=ai_result["confidence_score"],
+            recommendations=ai_result["recommendations"],
+            differential_diagnoses=ai_result["differential_diagnoses"],
+            explainability=TriageService._annotate_explainability(
+                ai_result, medical_context_used,
+            ),
+            raw_model_output=ai_result.get("raw_model_output", ""),
+            user=session.user,
             ip_address=ip_address,
+            user_agent=user_agent,
         )
 
+    @staticmethod
+    @timed("triage.batch")
+    def run_batch_inference(
+        submitter,
+        entries: list[dict],
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> list[dict]:
+        """
+        Server-side inference for a batch of symptom reports.
+
+        Each entry has ``symptoms_text`` and optionally ``patient_id``,
+        ``source`` and ``client_ref``. Clinicians may submit on behalf of
+        patients; everyone else only for themselves. Patients and their
+        medical contexts are loaded with a fixed number of queries, model
+        calls run concurrently (capped by TRIAGE_BATCH_CONCURRENCY), each
+        holding an inference admission slot like a single request, and
+        everything is persisted with bulk inserts in one transaction.
+        Explanations are generated by jobs queued once it commits.
+
+        Returns one status dict per entry, in input order.
+        """
+        outcomes = [
+            {"index": i, "client_ref": entry.get("client_ref", "")}
+            for i, entry in enumerate(entries)
+        ]
+        patients = TriageService._resolve_batch_patients(submitter, entries, outcomes)
+
+        pending = [i for i, o in enumerate(outcomes) if "status" not in o]
+        contexts = dict(zip(pending, RecordService.get_patient_medical_contexts(
+            [(patients[i], entries[i]["symptoms_text"]) for i in pending]
+        )))
+
+        def infer(i):
+            symptoms_text = entries[i]["symptoms_text"]
+            if not requires_slot(symptoms_text):
+                return GeminiService.run_inference(
+                    symptoms_text=symptoms_text, medical_context=contexts[i],
+                )
+            with inference_admission().admit(symptom_priority(symptoms_text)):
+                return GeminiService.run_inference(
+                    symptoms_text=symptoms_text, medical_context=contexts[i],
+                )
+
+        ai_results = {}
+        if pending:
+            workers = min(settings.TRIAGE_BATCH_CONCURRENCY, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {i: pool.submit(infer, i) for i in pending}
+            for i, future in futures.items():
+                try:
+                    ai_results[i] = future.result()
+                except AdmissionRejected as e:
+                    logger.warning("Batch entry %d shed: %s", i, e)
+                    outcomes[i]["error"] = str(e)
+                except Exception as e:
+                    logger.error("Batch inference failed for entry %d: %s", i, e)
+                    outcomes[i]["error"] = "Inference failed."
+
+        with span("db.batch_write"), transaction.atomic():
+            sessions = TriageSession.objects.bulk_create([
+                TriageSession(
+                    user=patients[i],
+                    symptoms_text=entries[i]["symptoms_text"],
+                    source=entries[i].get("source", TriageSession.Source.TEXT),
+                    status=(
+                        TriageSession.Status.COMPLETED if i in ai_results
+                        else TriageSession.Status.FAILED
+                    ),
+                    inference_mode="SERVER",
+                    model_version=settings.GEMINI_MODEL,
+                    created_by=submitter,
+                )
+                for i in pending
+            ])
+            session_by_index = dict(zip(pending, sessions))
+
+            results = TriageResult.objects.bulk_create([
+                TriageResult(
+                    session=session_by_index[i],
+                    diagnosis=ai_result["diagnosis"],
+                    severity=ai_result["severity"],
+                    confidence_score=ai_result["confidence_score"],
+                    recommendations=ai_result["recommendations"] or [],
+                    differential_diagnoses=ai_result["differential_diagnoses"] or [],
+                    explainability=TriageService._annotate_explainability(
+                        ai_result, bool(contexts[i]),
+                    ),
+                    raw_model_output=ai_result.get("raw_model_output") or {},
+                    created_by=submitter,
+                )
+                for i, ai_result in ai_results.items()
+            ])
+
+            # Explain outside the transaction, as save_result() does
+            transaction.on_commit(
+                lambda: XAIService.enqueue_explanations_bulk(
+                    results,
+                    user=submitter,
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+            )
+
+            audit_entries = []
+            for i, session in session_by_index.items():
+                audit_entries.append({
+                    "user_id": str(session.user_id),
+                    "action": "TRIAGE_SESSION_CREATED",
+                    "resource_type": "TriageSession",
+                    "resource_id": str(session.id),
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "changes": {
+                        "source": session.source,
+                        "inference_mode": "SERVER",
+                        "submitted_by": str(submitter.id),
+                    },
+                })
+            for result in results:
+                audit_entries.append({
+                    "user_id": str(result.session.user_id),
+                    "action": "TRIAGE_RESULT_SAVED",
+                    "resource_type": "TriageResult",
+                    "resource_id": str(result.id),
+                    "ip_address": ip_address,
+                    "user_agent": user_agent,
+                    "changes": {
+                        "severity": result.severity,
+                        "confidence": result.confidence_score,
+                    },
+                })
+            AuditService.log_actions(audit_entries)
+
+        results_by_session = {r.session_id: r for r in results}
+        for i, session in session_by_index.items():
+            outcome = outcomes[i]
+            outcome["session_id"] = str(session.id)
+            result = results_by_session.get(session.id)
+            if result is None:
+                outcome["status"] = "failed"
+                continue
+            outcome.update(
+                status="completed",
+                diagnosis=result.diagnosis,
+                severity=result.severity,
+                confidence_score=result.confidence_score,
+            )
+
+        return outcomes
+
+    @staticmethod
+    def _resolve_batch_patients(
+        submitter, entries: list[dict], outcomes: list[dict]
+    ) -> dict:
+        """
+        Map entry index → patient user with one query. Entries the
+        submitter may not triage get a ``rejected`` outcome instead.
+        """
+        User = get_user_model()
+        is_clinician = submitter.role == User.Role.CLINICIAN
+
+        requested = {
+            e["patient_id"] for e in entries
+            if e.get("patient_id") and e["patient_id"] != submitter.id
+        }
+        others = {}
+        if requested and is_clinician:
+            others = User.objects.filter(
+                role=User.Role.PATIENT, is_active=True,
+            ).in_bulk(list(requested))
+
+        patients = {}
+        for i, entry in enumerate(entries):
+            patient_id = entry.get("patient_id")
+            if not patient_id or patient_id == submitter.id:
+                patients[i] = submitter
+            elif patient_id in others:
+                patients[i] = others[patient_id]
+            else:
+                outcomes[i].update(status="rejected", error="Patient not found.")
+        return patients
+
+    @staticmethod
+    def check_client_result(symptoms_text: str, result: dict) -> dict:
+        """
+        Cross-check an on-device result against the rule engine.
+
+        Records the rule verdict under ``explainability["rule_check"]``
+        and, with TRIAGE_RULE_ESCALATE_CLIENT_RESULTS, raises a severity
+        the guideline rules consider too low. Returns a new dict.
+        """
+        assessment = RuleEngine.evaluate(symptoms_text)
+        if not assessment["matches"]:
+            return result
+
+        result = {**result, "explainability": dict(result.get("explainability") or {})}
+        client_severity = result["severity"]
+        under_triaged = (
+            SEVERITY_ORDER[assessment["severity"]] > SEVERITY_ORDER[client_severity]
+        )
+        escalated = under_triaged and settings.TRIAGE_RULE_ESCALATE_CLIENT_RESULTS
+
+        result["explainability"]["rule_check"] = {
+            "rule_severity": assessment["severity"],
+            "client_severity": client_severity,
+            "rules": [m["rule"] for m in assessment["matches"]],
+            "under_triaged": under_triaged,
+            "escalated": escalated,
+        }
+        if under_triaged:
+            logger.warning(
+                "Client result %s below rule severity %s (%s)",
+                client_severity, assessment["severity"],
+                [m["rule"] for m in assessment["matches"]],
+            )
+        if escalated:
+            result["severity"] = assessment["severity"]
         return result
 
+    @staticmethod
+    def _attach_timings(result: TriageResult) -> None:
+        """Store the sampled trace's stage timings with the result."""
+        active = current_trace()
+        if active is None:
+            return
+        result.timings = active.as_dict()
+        TriageResult.objects.filter(id=result.id).update(timings=result.timings)
+
+    @staticmethod
+    def _annotate_explainability(ai_result: dict, medical_context_used: bool) -> dict:
+        """Note in the explainability data whether medical history was used."""
+        explainability = ai_result.get("explainability", {})
+        if medical_context_used:
+            factors = explainability.get("contributing_factors", [])
+            if "Patient medical history considered" not in factors:
+                factors.append("Patient medical history considered")
+            explainability["contributing_factors"] = factors
+            explainability["medical_context_available"] = True
+        return explainability
+
+    @staticmethod
+    def enqueue_server_inference(
+        session: TriageSession,
+        ip_address: str = None,
+        user_agent: str = "",
+    ):
+        """
+        Queue a PENDING session for the background inference worker.
+        Call it in the transaction that creates the session, so neither
+        is committed without the other.
+        """
+        return JobQueue.enqueue(
+            kind="triage.inference",
+            payload={"session_id": str(session.id)},
+            user=session.user,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+
+    @staticmethod
+    def process_inference_job(job) -> None:
+        """Job handler: PENDING → PROCESSING → COMPLETED (or FAILED)."""
+        session = (
+            TriageSession.objects.filter(
+                id=job.payload["session_id"], is_deleted=False,
+            )
+            .select_related("user")
+            .first()
+        )
+        if session is None or TriageResult.objects.filter(session=session).exists():
+            return
+
+        session.status = TriageSession.Status.PROCESSING
+        session.save(update_fields=["status", "updated_at"])
+
+        try:
+            TriageService.run_server_inference(
+                session,
+                ip_address=job.ip_address,
+                user_agent=job.user_agent,
+            )
+        except Exception as e:
+            if job.attempts >= job.max_attempts:
+                TriageService.mark_failed(session, error_info=str(e))
+            else:
+                session.status = TriageSession.Status.PENDING
+                session.save(update_fields=["status", "updated_at"])
+            raise
+
+    # ---------------------------------------------------------------
+    # Offline sync (client-side inference)
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    @transaction.atomic
+    def sync_client_sessions(
+        user,
+        items: list[dict],
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> dict:
+        """
+        Idempotently upsert queued on-device sessions and their results.
+
+        Each item carries a client-generated ``client_key`` plus session
+        fields and an optional ``result``. Replays of a key the server
+        already has never create duplicates: the existing session is
+        reused and a result is only added if the session lacks one. New
+        sessions that arrive without a result are stored PENDING and
+        queued for server-side inference. Explanations are generated by
+        jobs queued once the transaction commits.
+
+        Returns ``{client_key: outcome}`` where outcome holds the
+        ``session_id`` and what happened to the session and the result
+        (``created``, ``existing``, ``queued`` or ``absent``).
+        """
+        items_by_key = {}
+        for item in items:
+            items_by_key.setdefault(item["client_key"], item)
+        keys = list(items_by_key)
+
+        existing_keys = set(
+            TriageSession.objects.filter(user=user, client_key__in=keys)
+            .values_list("client_key", flat=True)
+        )
+        new_sessions = []
+        for key, item in items_by_key.items():
+            if key in existing_keys:
+                continue
+            # Without an on-device result the server runs the inference
+            on_device = bool(item.get("result"))
+            new_sessions.append(TriageSession(
+                user=user,
+                client_key=key,
+                symptoms_text=item["symptoms_text"],
+                source=item["source"],
+                status=(
+                    TriageSession.Status.PROCESSING if on_device
+                    else TriageSession.Status.PENDING
+                ),
+                inference_mode="CLIENT" if on_device else "SERVER",
+                model_version=(
+                    item["model_version"] if on_device else settings.GEMINI_MODEL
+                ),
+                device_info=item["device_info"],
+                created_by=user,
+            ))
+        # A concurrent replay of the same key loses the race quietly
+        TriageSession.objects.bulk_create(new_sessions, ignore_conflicts=True)
+
+        sessions = {
+            s.client_key: s
+            for s in TriageSession.objects.filter(user=user, client_key__in=keys)
+        }
+        created_session_ids = {s.id for s in new_sessions}
+        created_session_ids &= {s.id for s in sessions.values()}
+        has_result = set(
+            TriageResult.objects.filter(session__in=sessions.values())
+            .values_list("session_id", flat=True)
+        )
+
+        new_results = []
+        for key, item in items_by_key.items():
+            if not item.get("result") or sessions[key].id in has_result:
+                continue
+            result = TriageService.check_client_result(
+                sessions[key].symptoms_text, item["result"],
+            )
+            new_results.append(TriageResult(
+                session=sessions[key],
+                diagnosis=result["diagnosis"],
+                severity=result["severity"],
+                confidence_score=result["confidence_score"],
+                recommendations=result["recommendations"],
+                differential_diagnoses=result["differential_diagnoses"],
+                explainability=result["explainability"],
+                raw_model_output=result["raw_model_output"],
+                created_by=user,
+            ))
+        TriageResult.objects.bulk_create(new_results, ignore_conflicts=True)
+
+        stored_ids = set(
+            TriageResult.objects.filter(id__in=[r.id for r in new_results])
+            .values_list("id", flat=True)
+        )
+        created_results = [r for r in new_results if r.id in stored_ids]
+        result_session_ids = {r.session_id for r in created_results}
+
+        TriageSession.objects.filter(id__in=result_session_ids).update(
+            status=TriageSession.Status.COMPLETED,
+            updated_at=timezone.now(),
+        )
+        queued_session_ids = {
+            session.id
+            for session in sessions.values()
+            if session.id in created_session_ids
+            and session.status == TriageSession.Status.PENDING
+        }
+        JobQueue.enqueue_many(
+            "triage.inference",
+            [{"session_id": str(session_id)} for session_id in queued_session_ids],
+            user=user,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        # Explain outside the transaction, as save_result() does
+        transaction.on_commit(
+            lambda: XAIService.enqueue_explanations_bulk(
+                created_results,
+                user=user,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+        )
+
+        audit_entries = [
+            {
+                "user_id": str(user.id),
+                "action": "TRIAGE_SESSION_CREATED",
+                "resource_type": "TriageSession",
+                "resource_id": str(session.id),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "changes": {
+                    "source": session.source,
+                    "inference_mode": session.inference_mode,
+                    "client_key": session.client_key,
+                },
+            }
+            for session in sessions.values()
+            if session.id in created_session_ids
+        ] + [
+            {
+                "user_id": str(user.id),
+                "action": "TRIAGE_RESULT_SAVED",
+                "resource_type": "TriageResult",
+                "resource_id": str(result.id),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "changes": {
+                    "severity": result.severity,
+                    "confidence": result.confidence_score,
+                },
+            }
+            for result in created_results
+        ]
+        AuditService.log_actions(audit_entries)
+
+        outcomes = {}
+        for key, session in sessions.items():
+            if session.id in result_session_ids:
+                result_outcome = "created"
+            elif session.id in has_result or items_by_key[key].get("result"):
+                # Stored earlier, or by a concurrent replay of the same key
+                result_outcome = "existing"
+            elif session.id in queued_session_ids:
+                result_outcome = "queued"
+            else:
+                result_outcome = "absent"
+            outcomes[key] = {
+                "session_id": str(session.id),
+                "session": (
+                    "created" if session.id in created_session_ids else "existing"
+                ),
+                "result": result_outcome,
+            }
+        return outcomes
+
     @staticmethod
     def save_image_analysis(
         session: TriageSession,
@@ -128,13 +717,31 @@ class TriageService:
         )
 
     @staticmethod
-    def get_user_sessions(user, limit: int = 20):
-        """Retrieve a user's triage sessions with results."""
+    def finalize_image_upload(upload, file) -> ImageAnalysis:
+        """Upload handler: attach a completed chunked upload to a session."""
+        session = TriageSession.objects.filter(
+            id=upload.metadata.get("session_id"), user=upload.user,
+        ).first()
+        if session is None:
+            raise ValueError("Session not found.")
+
+        return TriageService.save_image_analysis(
+            session=session,
+            image=file,
+            original_filename=upload.filename,
+        )
+
+    @staticmethod
+    def get_user_sessions(user):
+        """
+        A user's triage sessions with results, newest first. Ordered by
+        ``(created_at, id)`` so keyset pagination pages are stable.
+        """
         return (
             TriageSession.objects.filter(user=user, is_deleted=False)
             .select_related("result")
             .prefetch_related("images")
-            .order_by("-created_at")[:limit]
+            .order_by("-created_at", "-id")
         )
 
     @staticmethod
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.triage.services.admission import (
+    EMERGENCY,
+    LOW,
+    MODERATE,
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+class AdmissionQueueFullTests(SimpleTestCase):
+    def test_zero_length_queue_rejects_when_slots_are_busy(self):
+        controller = AdmissionController(slots=1, queue_size=0)
+        controller.acquire(LOW)
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            controller.acquire(EMERGENCY)
+
+        self.assertEqual(ctx.exception.reason, "queue_full")
+        self.assertEqual(controller.stats()["in_flight"], 1)
+
+    def test_zero_length_queue_admits_while_a_slot_is_free(self):
+        controller = AdmissionController(slots=1, queue_size=0)
+        with controller.admit(LOW):
+            self.assertEqual(controller.stats()["in_flight"], 1)
+        self.assertEqual(controller.stats()["in_flight"], 0)
+
+
+def _wait_until(predicate, timeout: float = 2.0) -> None:
+    give_up_at = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > give_up_at:
+            raise AssertionError("condition not reached")
+        time.sleep(0.01)
+
+
+@override_settings(
+    TRIAGE_ADMISSION_MAX_WAIT_SECONDS=5,
+    TRIAGE_ADMISSION_LOW_MAX_WAIT_SECONDS=5,
+)
+class AdmissionQueueTests(SimpleTestCase):
+    def setUp(self):
+        self.controller = AdmissionController(slots=1, queue_size=2)
+        self.admitted = []
+        self.rejected = {}
+        self.threads = []
+        # The test holds the only slot until it calls release()
+        self.controller.acquire(LOW)
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _queue(self, name: str, priority: int) -> None:
+        def run():
+            try:
+                with self.controller.admit(priority):
+                    self.admitted.append(name)
+            except AdmissionRejected as exc:
+                self.rejected[name] = exc.reason
+
+        queued, rejected = self._queued(), len(self.rejected)
+        thread = threading.Thread(target=run)
+        self.threads.append(thread)
+        thread.start()
+        # Queued, or its arrival shed someone (possibly itself)
+        _wait_until(
+            lambda: self._queued() > queued or len(self.rejected) > rejected
+        )
+
+    def _queued(self) -> int:
+        return sum(self.controller.stats()["queued"].values())
+
+    def test_emergencies_are_admitted_first(self):
+        self._queue("low", LOW)
+        self._queue("emergency", EMERGENCY)
+
+        self.controller.release()
+        _wait_until(lambda: len(self.admitted) == 2)
+
+        self.assertEqual(self.admitted, ["emergency", "low"])
+
+    def test_equal_priorities_are_admitted_in_arrival_order(self):
+        self._queue("first", MODERATE)
+        self._queue("second", MODERATE)
+
+        self.controller.release()
+        _wait_until(lambda: len(self.admitted) == 2)
+
+        self.assertEqual(self.admitted, ["first", "second"])
+
+    def test_full_queue_evicts_the_least_urgent_waiter(self):
+        self._queue("moderate", MODERATE)
+        self._queue("low", LOW)
+        self._queue("emergency", EMERGENCY)
+
+        self.assertEqual(self.rejected, {"low": "evicted"})
+
+        self.controller.release()
+        _wait_until(lambda: len(self.admitted) == 2)
+        self.assertEqual(self.admitted, ["emergency", "moderate"])
+
+    def test_full_queue_rejects_when_no_waiter_is_less_urgent(self):
+        self._queue("first", MODERATE)
+        self._queue("second", MODERATE)
+
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.controller.acquire(MODERATE)
+        self.assertEqual(ctx.exception.reason, "queue_full")
+        self.assertEqual(self._queued(), 2)
+
+        self.controller.release()
+
+    @override_settings(TRIAGE_ADMISSION_LOW_MAX_WAIT_SECONDS=0.1)
+    def test_low_priority_gives_up_after_its_max_wait(self):
+        with self.assertRaises(AdmissionRejected) as ctx:
+            self.controller.acquire(LOW)
+
+        self.assertEqual(ctx.exception.reason, "timeout")
+        self.assertEqual(self._queued(), 0)
+        self.controller.release()
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from apps.common.models.job import Job
+from apps.triage.models import TriageSession
+from apps.triage.services import triage_service
+from apps.triage.services.admission import AdmissionController
+from apps.triage.services.triage_service import TriageService
+from apps.users.models import User
+from apps.xai.models.explanation import Explanation
+from apps.xai.services.xai_service import XAIService
+
+
+@override_settings(GEMINI_BACKEND="stub")
+class BatchInferenceTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="chw@example.com", password="pw12345!x",
+            first_name="A", last_name="B",
+        )
+
+    def _run(self, *symptoms):
+        return TriageService.run_batch_inference(
+            self.user, [{"symptoms_text": text} for text in symptoms],
+        )
+
+    def test_explanations_are_queued_after_commit(self):
+        in_transaction = []
+        enqueue = XAIService.enqueue_explanations_bulk
+
+        def record(*args, **kwargs):
+            in_transaction.append(connection.in_atomic_block)
+            return enqueue(*args, **kwargs)
+
+        with mock.patch.object(XAIService, "enqueue_explanations_bulk", record):
+            outcomes = self._run("mild cough", "itchy rash")
+
+        self.assertEqual([o["status"] for o in outcomes], ["completed", "completed"])
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(Job.objects.filter(kind="xai.explanation").count(), 2)
+        self.assertEqual(Explanation.objects.count(), 0)
+
+    def test_entries_are_shed_when_inference_capacity_is_exhausted(self):
+        full = AdmissionController(slots=0, queue_size=0)
+        with mock.patch.object(triage_service, "inference_admission", lambda: full):
+            outcomes = self._run("mild cough")
+
+        self.assertEqual(outcomes[0]["status"], "failed")
+        self.assertIn("capacity", outcomes[0]["error"])
+        self.assertEqual(
+            TriageSession.objects.get(id=outcomes[0]["session_id"]).status,
+            TriageSession.Status.FAILED,
+        )
@@ -0,0 +1,60 @@
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.triage.services.gemini_client import GeminiClientPool
+from apps.triage.services.gemini_service import GeminiService
+
+
+class GeminiParseResponseTests(SimpleTestCase):
+    def test_well_formed_response_is_normalized(self):
+        result = GeminiService._parse_response(
+            '{"diagnosis": "Cold", "severity": "low", "confidence_score": "1.7"}', "",
+        )
+
+        self.assertEqual(result["severity"], "LOW")
+        self.assertEqual(result["confidence_score"], 1.0)
+        self.assertNotIn("parse_error", result["explainability"])
+
+    def test_wrongly_typed_fields_fall_back(self):
+        for raw in (
+            '{"diagnosis": "Cold", "confidence_score": null}',
+            '{"diagnosis": "Cold", "severity": 5}',
+            '["not", "an", "object"]',
+        ):
+            with self.subTest(raw=raw):
+                result = GeminiService._parse_response(raw, "")
+                self.assertEqual(result["severity"], "MEDIUM")
+                self.assertIn("parse_error", result["explainability"])
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+@override_settings(GEMINI_BACKEND="stub")
+class GeminiStreamShapeTests(SimpleTestCase):
+    def _stream(self, raw: str) -> dict:
+        chunks = [_Chunk(raw[i:i + 7]) for i in range(0, len(raw), 7)]
+        with mock.patch.object(GeminiClientPool, "stream", return_value=iter(chunks)):
+            events = list(GeminiService.stream_inference(f"itchy rash {uuid.uuid4()}"))
+        self.assertEqual(events[-1][0], "result")
+        return events[-1][2]
+
+    def test_wrongly_typed_explainability_falls_back(self):
+        result = self._stream(
+            '{"diagnosis": "Rash", "severity": "LOW", "explainability": "none"}'
+        )
+
+        self.assertIsInstance(result["explainability"], dict)
+        self.assertIn("parse_error", result["explainability"])
+
+    def test_null_fields_get_their_defaults(self):
+        result = self._stream(
+            '{"diagnosis": "Rash", "severity": "LOW", "recommendations": null}'
+        )
+
+        self.assertEqual(result["recommendations"], [])
+        self.assertEqual(result["explainability"], {})
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.triage.services.gemini_resilience import CircuitBreaker
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "breaker-tests",
+    },
+}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@override_settings(CACHES=LOCMEM)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.clock = _Clock()
+        patcher = mock.patch(
+            "apps.triage.services.gemini_resilience.time", self.clock,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+
+    def _trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.stats()["consecutive_failures"], 1)
+
+    def test_half_open_lets_a_single_probe_through(self):
+        self._trip()
+        self.clock.now += 31
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_probe_closes(self):
+        self._trip()
+        self.clock.now += 31
+        self.breaker.allow_request()
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probe_reopens_for_another_cool_down(self):
+        self._trip()
+        self.clock.now += 31
+        self.breaker.allow_request()
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.stats()["trips"], 2)
+        self.clock.now += 31
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_stragglers_while_open_do_not_extend_the_cool_down(self):
+        self._trip()
+        self.clock.now += 20
+        self.breaker.record_failure()
+        self.clock.now += 11
+
+        self.assertEqual(self.breaker.state(), CircuitBreaker.HALF_OPEN)
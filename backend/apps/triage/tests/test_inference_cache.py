@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.triage.services.inference_cache import InferenceCache
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "inference": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "inference-cache-tests",
+    },
+}
+
+
+class InferenceCacheKeyTests(SimpleTestCase):
+    def _key(self, symptoms="fever and cough", context="", model="m", version="1"):
+        return InferenceCache.make_key(symptoms, context, model, version)
+
+    def test_equivalent_symptoms_share_a_key(self):
+        self.assertEqual(self._key("Fever,  and COUGH!"), self._key("fever and cough"))
+        self.assertEqual(
+            self._key("ｆｅｖｅｒ and cough."), self._key("fever and cough")
+        )
+
+    def test_clinically_relevant_tokens_are_kept(self):
+        self.assertEqual(
+            InferenceCache.normalize_symptoms("Temp 38.5°C, SpO2 92%"),
+            "temp 38.5 c spo2 92%",
+        )
+        self.assertNotEqual(self._key("spo2 92%"), self._key("spo2 97%"))
+
+    def test_context_model_and_prompt_version_change_the_key(self):
+        key = self._key()
+
+        self.assertNotEqual(key, self._key(context="asthma"))
+        self.assertNotEqual(key, self._key(model="other"))
+        self.assertNotEqual(key, self._key(version="2"))
+
+
+@override_settings(CACHES=LOCMEM, INFERENCE_CACHE_ENABLED=True)
+class InferenceCacheStorageTests(SimpleTestCase):
+    def setUp(self):
+        caches["inference"].clear()
+
+    def test_round_trip(self):
+        result = {"severity": "LOW", "diagnosis": "Common cold"}
+
+        self.assertIsNone(InferenceCache.get("triage:k"))
+        InferenceCache.set("triage:k", result)
+
+        self.assertEqual(InferenceCache.get("triage:k"), result)
+
+    @override_settings(INFERENCE_CACHE_ENABLED=False)
+    def test_disabled_cache_neither_reads_nor_writes(self):
+        InferenceCache.set("triage:k", {"severity": "LOW"})
+
+        self.assertIsNone(InferenceCache.get("triage:k"))
+        self.assertIsNone(caches["inference"].get("triage:k"))
+
+    def test_backend_errors_degrade_to_a_miss(self):
+        backend = caches["inference"]
+        with (
+            mock.patch.object(backend, "get", side_effect=ConnectionError),
+            mock.patch.object(backend, "set", side_effect=ConnectionError),
+        ):
+            InferenceCache.set("triage:k", {"severity": "LOW"})
+            self.assertIsNone(InferenceCache.get("triage:k"))
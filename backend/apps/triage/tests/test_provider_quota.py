@@ -0,0 +1,139 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.triage.services import provider_quota as quota_module
+from apps.triage.services.provider_quota import (
+    WINDOW_SECONDS,
+    ProviderQuota,
+    QuotaExhausted,
+    reserve,
+)
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "quota-tests",
+    },
+}
+
+
+class _Clock:
+    """Stands in for the ``time`` module; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = WINDOW_SECONDS * 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _QuotaTestCase(SimpleTestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.clock = _Clock()
+        patcher = mock.patch.object(quota_module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(CACHES=LOCMEM)
+class ProviderQuotaTests(_QuotaTestCase):
+    def test_denies_requests_over_the_rpm_limit(self):
+        quota = ProviderQuota("model", rpm=2, tpm=0)
+
+        self.assertEqual(quota.try_acquire(10), 0.0)
+        self.assertEqual(quota.try_acquire(10), 0.0)
+        self.assertGreater(quota.try_acquire(10), 0)
+        # The denied reservation is rolled back
+        self.assertEqual(quota.usage()["rpm_used"], 2)
+
+    def test_denies_tokens_over_the_tpm_limit(self):
+        quota = ProviderQuota("model", rpm=0, tpm=1000)
+
+        self.assertEqual(quota.try_acquire(800), 0.0)
+        self.assertGreater(quota.try_acquire(300), 0)
+        self.assertEqual(quota.try_acquire(200), 0.0)
+
+    def test_previous_window_drains_as_the_window_slides(self):
+        quota = ProviderQuota("model", rpm=2, tpm=0)
+        quota.try_acquire(1)
+        quota.try_acquire(1)
+
+        # The whole previous minute still overlaps the window
+        self.clock.now += WINDOW_SECONDS
+        wait = quota.try_acquire(1)
+        self.assertEqual(wait, WINDOW_SECONDS / 2)
+
+        # Halfway through, half of it has drained
+        self.clock.now += wait
+        self.assertEqual(quota.try_acquire(1), 0.0)
+        self.assertGreater(quota.try_acquire(1), 0)
+
+    def test_a_fresh_window_refills_the_budget(self):
+        quota = ProviderQuota("model", rpm=1, tpm=0)
+        quota.try_acquire(1)
+        self.assertGreater(quota.try_acquire(1), 0)
+
+        self.clock.now += WINDOW_SECONDS * 2
+
+        self.assertEqual(quota.try_acquire(1), 0.0)
+
+    def test_acquire_sleeps_until_budget_frees(self):
+        quota = ProviderQuota("model", rpm=1, tpm=0)
+        quota.try_acquire(1)
+
+        self.assertTrue(quota.acquire(1, max_wait=WINDOW_SECONDS * 2))
+        self.assertGreater(self.clock.now, WINDOW_SECONDS * 1_000_000.0)
+
+    def test_acquire_gives_up_past_max_wait(self):
+        quota = ProviderQuota("model", rpm=1, tpm=0)
+        quota.try_acquire(1)
+
+        with self.assertRaises(QuotaExhausted) as ctx:
+            quota.acquire(1, max_wait=1)
+
+        self.assertGreater(ctx.exception.retry_after, 1)
+
+
+@override_settings(
+    CACHES=LOCMEM,
+    GEMINI_MODEL="primary",
+    GEMINI_QUOTA_RPM=1,
+    GEMINI_QUOTA_TPM=0,
+    GEMINI_FALLBACK_MODEL="fallback",
+    GEMINI_FALLBACK_QUOTA_RPM=1,
+    GEMINI_FALLBACK_QUOTA_TPM=0,
+)
+class ReservePolicyTests(_QuotaTestCase):
+    @override_settings(GEMINI_QUOTA_POLICY="fail_fast")
+    def test_fail_fast_rejects_once_spent(self):
+        self.assertEqual(reserve(1, max_wait=0), "primary")
+
+        with self.assertRaises(QuotaExhausted):
+            reserve(1, max_wait=WINDOW_SECONDS * 2)
+
+    @override_settings(GEMINI_QUOTA_POLICY="downgrade")
+    def test_downgrade_switches_to_the_fallback_model(self):
+        self.assertEqual(reserve(1, max_wait=0), "primary")
+        self.assertEqual(reserve(1, max_wait=0), "fallback")
+
+        with self.assertRaises(QuotaExhausted):
+            reserve(1, max_wait=0)
+
+    @override_settings(GEMINI_QUOTA_POLICY="wait")
+    def test_wait_blocks_for_the_primary_model(self):
+        self.assertEqual(reserve(1, max_wait=0), "primary")
+
+        self.assertEqual(reserve(1, max_wait=WINDOW_SECONDS * 2), "primary")
+
+        with self.assertRaises(QuotaExhausted):
+            reserve(1, max_wait=1)
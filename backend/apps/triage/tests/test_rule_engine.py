@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from apps.triage.services.rule_engine import RuleEngine
+
+
+def _rules(text: str) -> list[str]:
+    return [match["rule"] for match in RuleEngine.evaluate(text)["matches"]]
+
+
+class RuleEngineRedFlagTests(SimpleTestCase):
+    def test_suicidal_phrases_are_critical(self):
+        for text in (
+            "I have been feeling suicidal for weeks",
+            "I want to kill myself",
+            "Some days I want to hurt myself",
+            "I hurt myself on purpose last night",
+            "I keep having thoughts of hurting myself",
+            "I want to end my life",
+        ):
+            with self.subTest(text=text):
+                result = RuleEngine.evaluate(text)
+                self.assertEqual(result["severity"], "CRITICAL")
+                self.assertIn("mental_health_red_flag", _rules(text))
+
+    def test_accidental_injury_is_not_a_mental_health_red_flag(self):
+        for text in (
+            "I hurt myself falling off my bike, knee is scraped",
+            "Hurt myself lifting a box at work, lower back pain",
+            "I think I hurt my wrist playing football",
+        ):
+            with self.subTest(text=text):
+                self.assertNotIn("mental_health_red_flag", _rules(text))
+                self.assertFalse(RuleEngine.evaluate(text)["emergency"])
+
+    def test_negated_sign_does_not_match(self):
+        self.assertNotIn("fever", RuleEngine.evaluate("No fever, mild cough")["signs"])
+
+    def test_respiratory_emergency_from_vitals(self):
+        result = RuleEngine.evaluate("Short of breath, SpO2 84%")
+        self.assertEqual(result["severity"], "CRITICAL")
+        self.assertIn("quick_check_breathing", _rules("Short of breath, SpO2 84%"))
+        self.assertEqual(result["vitals"]["spo2"], 84)
+
+    def test_ordinary_symptoms_have_no_emergency(self):
+        result = RuleEngine.evaluate("Mild headache since this morning")
+        self.assertFalse(result["emergency"])
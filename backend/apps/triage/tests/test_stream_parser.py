@@ -0,0 +1,105 @@
+import json
+import random
+
+from django.test import SimpleTestCase
+
+from apps.triage.services.stream_parser import IncrementalJSONParser
+
+RESPONSE = {
+    "severity": "HIGH",
+    "diagnosis": 'Possible "pneumonia" \\ café \U0001f912\nSee a clinician.',
+    "confidence_score": 0.82,
+    "recommendations": ["Rest, fluids", "Chest X-ray [urgent]", "Return if worse"],
+    "differential_diagnoses": [
+        {"condition": "Bronchitis", "probability": 0.3},
+        {"condition": "COVID-19", "probability": 0.2},
+    ],
+    "explainability": {"factors": ["fever", "cough"], "notes": {"a": [1, {}]}},
+}
+
+
+def _payload(ensure_ascii: bool) -> str:
+    body = json.dumps(RESPONSE, indent=2, ensure_ascii=ensure_ascii)
+    return f"```json\n{body}\n```"
+
+
+def _random_chunks(text: str, rng: random.Random) -> list[str]:
+    chunks, pos = [], 0
+    while pos < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def _summarise(events: list[tuple]) -> tuple[dict, list[tuple]]:
+    """Concatenated deltas per key, and the item/field events in order."""
+    text, rest = {}, []
+    for kind, key, value in events:
+        if kind == "delta":
+            text[key] = text.get(key, "") + value
+        else:
+            rest.append((kind, key, value))
+    return text, rest
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    def _parse(self, chunks: list[str]) -> tuple[list[tuple], dict]:
+        parser = IncrementalJSONParser()
+        events = []
+        for chunk in chunks:
+            events.extend(parser.feed(chunk))
+        return events, parser.close()
+
+    def test_whole_payload(self):
+        events, fields = self._parse([_payload(ensure_ascii=False)])
+        text, rest = _summarise(events)
+
+        self.assertEqual(fields, RESPONSE)
+        self.assertEqual(
+            text,
+            {"severity": "HIGH", "diagnosis": RESPONSE["diagnosis"]},
+        )
+        items = [value for kind, key, value in rest if kind == "item"]
+        self.assertEqual(
+            items,
+            RESPONSE["recommendations"] + RESPONSE["differential_diagnoses"],
+        )
+        self.assertEqual(
+            [key for kind, key, _ in rest if kind == "field"], list(RESPONSE)
+        )
+
+    def test_random_chunk_splits_give_the_same_output(self):
+        rng = random.Random(20240917)
+        for ensure_ascii in (False, True):
+            payload = _payload(ensure_ascii)
+            expected = _summarise(self._parse([payload])[0])
+            for _ in range(200):
+                chunks = _random_chunks(payload, rng)
+                with self.subTest(ensure_ascii=ensure_ascii, chunks=chunks):
+                    events, fields = self._parse(chunks)
+                    self.assertEqual(fields, RESPONSE)
+                    self.assertEqual(_summarise(events), expected)
+
+    def test_single_character_chunks(self):
+        payload = _payload(ensure_ascii=True)
+        events, fields = self._parse(list(payload))
+
+        self.assertEqual(fields, RESPONSE)
+        self.assertEqual(_summarise(events), _summarise(self._parse([payload])[0]))
+
+    def test_truncated_output_does_not_close(self):
+        payload = _payload(ensure_ascii=False)
+        parser = IncrementalJSONParser()
+        parser.feed(payload[: len(payload) // 2])
+
+        self.assertFalse(parser.done)
+        with self.assertRaises(ValueError):
+            parser.close()
+
+    def test_output_without_an_object_does_not_close(self):
+        parser = IncrementalJSONParser()
+        parser.feed("I cannot help with that.")
+
+        with self.assertRaises(ValueError):
+            parser.close()
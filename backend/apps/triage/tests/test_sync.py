@@ -0,0 +1,59 @@
+from django.test import TransactionTestCase, override_settings
+
+from apps.common.models.job import Job
+from apps.common.services.job_queue import JobQueue
+from apps.triage.models import TriageSession
+from apps.triage.services.triage_service import TriageService
+from apps.users.models import User
+from apps.xai.models.explanation import Explanation
+
+RESULT = {
+    "diagnosis": "Common cold",
+    "severity": "LOW",
+    "confidence_score": 0.8,
+    "recommendations": [],
+    "differential_diagnoses": [],
+    "explainability": {},
+    "raw_model_output": {},
+}
+
+
+def _item(key: str, result=None) -> dict:
+    return {
+        "client_key": key,
+        "symptoms_text": "mild cough",
+        "source": TriageSession.Source.TEXT,
+        "model_version": "on-device-1",
+        "device_info": {},
+        "result": result,
+    }
+
+
+@override_settings(GEMINI_BACKEND="stub")
+class SyncClientSessionsTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="patient@example.com", password="pw12345!x",
+            first_name="A", last_name="B",
+        )
+
+    def test_session_without_a_result_is_queued_for_server_inference(self):
+        outcomes = TriageService.sync_client_sessions(self.user, [_item("k1")])
+
+        self.assertEqual(outcomes["k1"]["result"], "queued")
+        session = TriageSession.objects.get(client_key="k1")
+        self.assertEqual(session.status, TriageSession.Status.PENDING)
+        self.assertEqual(session.inference_mode, "SERVER")
+
+        JobQueue.run_next("worker-1", kinds=["triage.inference"])
+
+        session.refresh_from_db()
+        self.assertEqual(session.status, TriageSession.Status.COMPLETED)
+
+    def test_explanations_are_left_to_background_jobs(self):
+        outcomes = TriageService.sync_client_sessions(self.user, [_item("k1", RESULT)])
+
+        self.assertEqual(outcomes["k1"]["result"], "created")
+        self.assertEqual(Explanation.objects.count(), 0)
+        self.assertEqual(Job.objects.filter(kind="xai.explanation").count(), 1)
+        self.assertFalse(Job.objects.filter(kind="triage.inference").exists())
@@ -15,12 +15,31 @@ from apps.xai.services.xai_service import XAIService
 from apps.xai.services.prescription_service import PrescriptionService
 
 
+def _explanation_pending(request, session) -> Response:
+    """202 placeholder while the explanation job runs (queued if missing)."""
+    XAIService.enqueue_explanation(
+        session.result,
+        user=request.user,
+        ip_address=request.META.get("REMOTE_ADDR"),
+        user_agent=request.META.get("HTTP_USER_AGENT", ""),
+    )
+    return Response(
+        {
+            "session_id": str(session.id),
+            "status": "PENDING",
+            "detail": "Explanation is being generated. Retry shortly.",
+        },
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Retry-After": "2"},
+    )
+
+
 class ExplanationView(APIView):
     """
-    GET — Retrieve or generate an XAI explanation for a triage session.
+    GET — Retrieve the XAI explanation for a triage session.
 
-    If an explanation already exists, returns it.
-    If not, generates one on-the-fly using SHAP analysis.
+    Explanations are generated in the background after a result is
+    saved; until one exists this returns 202 with a placeholder.
     """
 
     permission_classes = [IsAuthenticated]
@@ -44,17 +63,9 @@ class ExplanationView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get or generate explanation
         explanation = XAIService.get_explanation(session.result)
         if not explanation:
-            explanation = XAIService.generate_explanation(
-                triage_result=session.result,
-                method="SHAP",
-                user=request.user,
-                ip_address=request.META.get("REMOTE_ADDR"),
-            )
-            # Reload with prefetched contributions
-            explanation = XAIService.get_explanation(session.result)
+            return _explanation_pending(request, session)
 
         serializer = ExplanationSerializer(explanation)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -90,16 +101,9 @@ class ClinicalExplanationView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get or generate explanation
         explanation = XAIService.get_explanation(session.result)
         if not explanation:
-            explanation = XAIService.generate_explanation(
-                triage_result=session.result,
-                method="SHAP",
-                user=request.user,
-                ip_address=request.META.get("REMOTE_ADDR"),
-            )
-            explanation = XAIService.get_explanation(session.result)
+            return _explanation_pending(request, session)
 
         clinical_data = XAIService.get_clinical_summary(explanation)
 
@@ -148,16 +152,9 @@ class FeatureContributionsView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get or generate explanation
         explanation = XAIService.get_explanation(session.result)
         if not explanation:
-            explanation = XAIService.generate_explanation(
-                triage_result=session.result,
-                method="SHAP",
-                user=request.user,
-                ip_address=request.META.get("REMOTE_ADDR"),
-            )
-            explanation = XAIService.get_explanation(session.result)
+            return _explanation_pending(request, session)
 
         contributions = explanation.feature_contributions.all()
 
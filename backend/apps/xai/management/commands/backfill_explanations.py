@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+
+from apps.triage.models.triage_session import TriageResult
+from apps.xai.services.xai_service import XAIService
+
+
+class Command(BaseCommand):
+    help = "Generate XAI explanations for triage results that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Results explained per bulk insert.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Stop after this many results (0 = all).",
+        )
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help=(
+                "Queue xai.explanation jobs for run_jobs instead of generating "
+                "inline."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        limit = options["limit"]
+        missing = (
+            TriageResult.objects.filter(
+                xai_explanation__isnull=True, is_deleted=False,
+            )
+            .select_related("session")
+            .order_by("created_at")
+        )
+
+        if options["enqueue"]:
+            queued = 0
+            pending = missing[:limit] if limit else missing
+            for result in pending.iterator(chunk_size=batch_size):
+                XAIService.enqueue_explanation(result)
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued} explanation jobs."))
+            return
+
+        done = 0
+        while not limit or done < limit:
+            size = min(batch_size, limit - done) if limit else batch_size
+            results = list(missing[:size])
+            if not results:
+                break
+
+            try:
+                with transaction.atomic():
+                    XAIService.generate_explanations_bulk(results)
+            except IntegrityError:
+                # A worker explained one of these meanwhile; go one by one
+                for result in results:
+                    XAIService.generate_explanation(result)
+            done += len(results)
+            self.stdout.write(f"Explained {done} results")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {done} explanations."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 07:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("triage", "0003_sync_feed_indexes"),
+        ("xai", "0002_firstaidprescription"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="firstaidprescription",
+            index=models.Index(
+                fields=["user", "updated_at", "id"],
+                name="xai_firstai_user_id_ca59a2_idx",
+            ),
+        ),
+    ]
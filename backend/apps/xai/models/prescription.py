@@ -62,6 +62,9 @@ class FirstAidPrescription(BaseModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "updated_at", "id"]),
+        ]
 
     def __str__(self):
         return f"First Aid Rx for {self.user} — {self.urgency}"
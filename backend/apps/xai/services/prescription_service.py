@@ -208,6 +208,14 @@ class PrescriptionService:
         "congestion": ["congestion", "stuffy nose", "blocked nose", "runny nose", "nasal"],
     }
 
+    HIGH_URGENCY_KEYWORDS = [
+        "severe", "intense", "unbearable", "emergency", "blood",
+        "chest pain", "can't breathe", "collapse", "faint",
+    ]
+    MODERATE_URGENCY_KEYWORDS = [
+        "moderate", "persistent", "constant", "worsening", "recurring",
+    ]
+
     # ------------------------------------------------------------------ #
     # Public API                                                          #
     # ------------------------------------------------------------------ #
@@ -227,7 +235,7 @@ class PrescriptionService:
         symptoms_lower = symptoms_text.lower()
 
         # 1. Fetch patient medical context for allergy/contraindication checks
-        medical_context = RecordService.get_patient_medical_context(user)
+        medical_context = RecordService.get_patient_medical_context(user, symptoms_text)
         patient_allergies = PrescriptionService._extract_allergies(user)
         patient_conditions = PrescriptionService._extract_conditions(user)
 
@@ -360,18 +368,11 @@ class PrescriptionService:
 
     @staticmethod
     def _assess_urgency(symptoms_lower: str, categories: list[str]) -> str:
-        high_urgency_keywords = [
-            "severe", "intense", "unbearable", "emergency", "blood",
-            "chest pain", "can't breathe", "collapse", "faint",
-        ]
-        for kw in high_urgency_keywords:
+        for kw in PrescriptionService.HIGH_URGENCY_KEYWORDS:
             if kw in symptoms_lower:
                 return "HIGH"
 
-        moderate_keywords = [
-            "moderate", "persistent", "constant", "worsening", "recurring",
-        ]
-        for kw in moderate_keywords:
+        for kw in PrescriptionService.MODERATE_URGENCY_KEYWORDS:
             if kw in symptoms_lower:
                 return "MODERATE"
 
@@ -1,6 +1,12 @@
 import time
 
+from django.db import IntegrityError, transaction
+
 from apps.audit.services.audit_service import AuditService
+from apps.common.models.job import Job
+from apps.common.singleflight import SingleFlight
+from apps.common.services.job_queue import JobQueue
+from apps.common.tracing import timed
 from apps.triage.models.triage_session import TriageResult
 from apps.xai.models.explanation import Explanation, FeatureContribution
 
@@ -116,13 +122,32 @@ class XAIService:
         existing explainability data to produce SHAP-style feature
         contributions.
         """
-        start = time.monotonic()
-
         # If explanation already exists, return it
         existing = Explanation.objects.filter(triage_result=triage_result).first()
         if existing:
             return existing
 
+        # Concurrent callers for the same result share one generation
+        explanation_id = SingleFlight("xai.explanation").run(
+            str(triage_result.id),
+            lambda: XAIService._create_explanation(
+                triage_result, method, user, ip_address
+            ),
+        )
+        return Explanation.objects.get(id=explanation_id)
+
+    @staticmethod
+    def build_explanation(
+        triage_result: TriageResult,
+        method: str,
+        user=None,
+    ) -> tuple[Explanation, list]:
+        """
+        Score a result's features and return an unsaved Explanation
+        together with its ranked contribution dicts.
+        """
+        start = time.monotonic()
+
         # Extract features from the triage session
         session = triage_result.session
         symptoms_text = session.symptoms_text.lower()
@@ -223,8 +248,7 @@ class XAIService:
 
         elapsed_ms = int((time.monotonic() - start) * 1000)
 
-        # Persist explanation
-        explanation = Explanation.objects.create(
+        explanation = Explanation(
             triage_result=triage_result,
             method=method,
             summary=summary,
@@ -239,39 +263,7 @@ class XAIService:
             },
             created_by=user or session.user,
         )
-
-        # Persist individual feature contributions
-        feature_objects = [
-            FeatureContribution(
-                explanation=explanation,
-                feature_name=c["feature_name"],
-                feature_category=c["feature_category"],
-                contribution_score=c["contribution_score"],
-                direction=c["direction"],
-                display_name=c["display_name"],
-                display_value=c["display_value"],
-                description=c["description"],
-                rank=c["rank"],
-            )
-            for c in contributions_data
-        ]
-        FeatureContribution.objects.bulk_create(feature_objects)
-
-        # Audit log
-        AuditService.log_action(
-            user_id=str(session.user_id),
-            action="CREATE",
-            resource_type="Explanation",
-            resource_id=str(explanation.id),
-            ip_address=ip_address,
-            changes={
-                "method": method,
-                "features_count": len(contributions_data),
-                "computation_time_ms": elapsed_ms,
-            },
-        )
-
-        return explanation
+        return explanation, contributions_data
 
     @staticmethod
     def get_explanation(triage_result: TriageResult) -> Explanation | None:
@@ -344,10 +336,178 @@ class XAIService:
             "generated_at": explanation.created_at.isoformat(),
         }
 
+    @staticmethod
+    @timed("xai.generate_bulk")
+    def generate_explanations_bulk(
+        triage_results: list,
+        method: str = "SHAP",
+        user=None,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> list:
+        """
+        Batch variant of generate_explanation() for newly saved results.
+        Explanations, feature contributions and audit rows are each
+        written with a single bulk insert.
+        """
+        built = [
+            XAIService.build_explanation(result, method, user)
+            for result in triage_results
+        ]
+        explanations = Explanation.objects.bulk_create([e for e, _ in built])
+
+        FeatureContribution.objects.bulk_create([
+            feature
+            for explanation, contributions_data in built
+            for feature in XAIService._feature_objects(explanation, contributions_data)
+        ])
+
+        AuditService.log_actions([
+            {
+                "user_id": str(result.session.user_id),
+                "action": "CREATE",
+                "resource_type": "Explanation",
+                "resource_id": str(explanation.id),
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "changes": XAIService._audit_changes(explanation),
+            }
+            for result, explanation in zip(triage_results, explanations)
+        ])
+
+        return explanations
+
+    @staticmethod
+    def enqueue_explanation(
+        triage_result: TriageResult,
+        user=None,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> Job:
+        """
+        Queue background generation of a result's explanation, reusing
+        a job that is already waiting for it.
+        """
+        def enqueue() -> str:
+            pending = Job.objects.filter(
+                kind="xai.explanation",
+                payload__triage_result_id=str(triage_result.id),
+                status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+            ).first()
+            if pending:
+                return str(pending.id)
+
+            return str(JobQueue.enqueue(
+                kind="xai.explanation",
+                payload={"triage_result_id": str(triage_result.id)},
+                user=user,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            ).id)
+
+        # The check-then-enqueue above is coalesced so concurrent views
+        # polling the same result cannot queue duplicate jobs
+        job_id = SingleFlight("xai.enqueue").run(str(triage_result.id), enqueue)
+        return Job.objects.get(id=job_id)
+
+    @staticmethod
+    def enqueue_explanations_bulk(
+        triage_results: list,
+        user=None,
+        ip_address: str = None,
+        user_agent: str = "",
+    ) -> list[Job]:
+        """
+        Queue explanation jobs for newly saved results with one insert.
+        New results cannot have a job yet, so nothing is coalesced.
+        """
+        return JobQueue.enqueue_many(
+            "xai.explanation",
+            [{"triage_result_id": str(result.id)} for result in triage_results],
+            user=user,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+
+    @staticmethod
+    def process_explanation_job(job) -> None:
+        """Job handler: generate the explanation if it is still missing."""
+        triage_result = (
+            TriageResult.objects.filter(id=job.payload["triage_result_id"])
+            .select_related("session")
+            .first()
+        )
+        if triage_result is None:
+            return
+
+        XAIService.generate_explanation(
+            triage_result=triage_result,
+            method="SHAP",
+            user=job.created_by,
+            ip_address=job.ip_address,
+        )
+
     # ------------------------------------------------------------------ #
     # Private helpers                                                     #
     # ------------------------------------------------------------------ #
 
+    @staticmethod
+    @timed("xai.generate")
+    def _create_explanation(triage_result, method, user, ip_address) -> str:
+        """Persist a new explanation and return its id (the winner's if it raced)."""
+        existing = Explanation.objects.filter(triage_result=triage_result).first()
+        if existing:
+            return str(existing.id)
+
+        explanation, contributions_data = XAIService.build_explanation(
+            triage_result, method, user,
+        )
+        try:
+            with transaction.atomic():
+                explanation.save()
+                FeatureContribution.objects.bulk_create(
+                    XAIService._feature_objects(explanation, contributions_data)
+                )
+        except IntegrityError:
+            # Another worker outside the single-flight window won the OneToOne
+            return str(Explanation.objects.get(triage_result=triage_result).id)
+
+        # Audit log
+        AuditService.log_action(
+            user_id=str(triage_result.session.user_id),
+            action="CREATE",
+            resource_type="Explanation",
+            resource_id=str(explanation.id),
+            ip_address=ip_address,
+            changes=XAIService._audit_changes(explanation),
+        )
+        return str(explanation.id)
+
+    @staticmethod
+    def _feature_objects(explanation: Explanation, contributions_data: list) -> list:
+        return [
+            FeatureContribution(
+                explanation=explanation,
+                feature_name=c["feature_name"],
+                feature_category=c["feature_category"],
+                contribution_score=c["contribution_score"],
+                direction=c["direction"],
+                display_name=c["display_name"],
+                display_value=c["display_value"],
+                description=c["description"],
+                rank=c["rank"],
+            )
+            for c in contributions_data
+        ]
+
+    @staticmethod
+    def _audit_changes(explanation: Explanation) -> dict:
+        return {
+            "method": explanation.method,
+            "features_count": explanation.metadata["total_features"],
+            "computation_time_ms": explanation.computation_time_ms,
+        }
+
     @staticmethod
     def _build_summary(
         triage_result: TriageResult,
@@ -50,6 +50,7 @@ LOCAL_APPS = [
     "apps.trials",
     "apps.triage",
     "apps.xai",
+    "apps.sync",
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -67,6 +68,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.audit.middleware.AuditBufferMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -182,6 +184,308 @@ CORS_ALLOW_CREDENTIALS = True
 FIELD_ENCRYPTION_KEY = config("FIELD_ENCRYPTION_KEY", default="")
 
 
+# ---------------------------------------------------------------------------
+# Caches
+# ---------------------------------------------------------------------------
+
+def _cache_backend(prefix: str, default_backend: str, max_entries: int = 300) -> dict:
+    """
+    Build a CACHES entry from <PREFIX>_BACKEND / <PREFIX>_LOCATION.
+    "locmem" is per worker (LRU), "file" is shared by the workers on one
+    host, "redis" is shared across hosts (use maxmemory-policy
+    allkeys-lru for LRU eviction).
+    """
+    backend = config(f"{prefix}_BACKEND", default=default_backend)
+    name = prefix.lower()
+    if backend == "redis":
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": config(
+                f"{prefix}_LOCATION", default="redis://127.0.0.1:6379/1"
+            ),
+            "KEY_PREFIX": name,
+        }
+    if backend == "file":
+        return {
+            # Atomic add/incr across the workers of this host
+            "BACKEND": "apps.common.cache.LockingFileBasedCache",
+            "LOCATION": config(
+                f"{prefix}_LOCATION", default=str(BASE_DIR / ".cache" / name)
+            ),
+            "OPTIONS": {"MAX_ENTRIES": max_entries},
+        }
+    return {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": name,
+        "OPTIONS": {"MAX_ENTRIES": max_entries},
+    }
+
+
+# Triage inference result cache
+INFERENCE_CACHE_ENABLED = config("INFERENCE_CACHE_ENABLED", default=True, cast=bool)
+INFERENCE_CACHE_BACKEND = config("INFERENCE_CACHE_BACKEND", default="locmem")
+INFERENCE_CACHE_TTL_SECONDS = config(
+    "INFERENCE_CACHE_TTL_SECONDS", default=3600, cast=int
+)
+INFERENCE_CACHE_MAX_ENTRIES = config(
+    "INFERENCE_CACHE_MAX_ENTRIES", default=5000, cast=int
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "inference": {
+        **_cache_backend("INFERENCE_CACHE", "locmem", INFERENCE_CACHE_MAX_ENTRIES),
+        "TIMEOUT": INFERENCE_CACHE_TTL_SECONDS,
+    },
+    # Small coordination state every worker must agree on (circuit breaker,
+    # provider quota, single-flight). Needs atomic add/incr: "file" on one
+    # host, "redis" across hosts; "locmem" would be per worker
+    "shared": _cache_backend("SHARED_CACHE", "file", max_entries=1000),
+}
+
+# Single-flight: identical concurrent calls (double-submits) share one
+# execution. The result is reused for WINDOW seconds; LOCK bounds how
+# long followers wait on a leader.
+SINGLE_FLIGHT_WINDOW_SECONDS = config(
+    "SINGLE_FLIGHT_WINDOW_SECONDS", default=10, cast=float
+)
+SINGLE_FLIGHT_LOCK_SECONDS = config(
+    "SINGLE_FLIGHT_LOCK_SECONDS", default=60, cast=float
+)
+
+
+# ---------------------------------------------------------------------------
+# Background jobs (drained by `manage.py run_jobs`)
+# ---------------------------------------------------------------------------
+
+JOB_HANDLERS = {
+    "triage.inference": (
+        "apps.triage.services.triage_service.TriageService.process_inference_job"
+    ),
+    "xai.explanation": (
+        "apps.xai.services.xai_service.XAIService.process_explanation_job"
+    ),
+    "records.extract_text": (
+        "apps.records.services.record_service.RecordService.process_extraction_job"
+    ),
+}
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", default=3, cast=int)
+# Workers refresh a running job's lock every third of this; a lock older
+# than this means the worker died and the job is requeued (or failed)
+JOB_LOCK_TIMEOUT_SECONDS = config("JOB_LOCK_TIMEOUT_SECONDS", default=300, cast=int)
+JOB_POLL_INTERVAL_SECONDS = config("JOB_POLL_INTERVAL_SECONDS", default=1.0, cast=float)
+JOB_RETENTION_HOURS = config("JOB_RETENTION_HOURS", default=24, cast=int)
+
+# PDF text extraction (records.extract_text jobs) runs in a process pool
+PDF_EXTRACTION_PROCESSES = config("PDF_EXTRACTION_PROCESSES", default=2, cast=int)
+PDF_EXTRACTION_TIMEOUT_SECONDS = config(
+    "PDF_EXTRACTION_TIMEOUT_SECONDS", default=120, cast=float
+)
+PDF_EXTRACTION_MAX_CHARS = config("PDF_EXTRACTION_MAX_CHARS", default=50000, cast=int)
+
+
+# ---------------------------------------------------------------------------
+# Device sync (change feed)
+# ---------------------------------------------------------------------------
+
+SYNC_PAGE_SIZE = config("SYNC_PAGE_SIZE", default=200, cast=int)
+SYNC_MAX_PAGE_SIZE = config("SYNC_MAX_PAGE_SIZE", default=1000, cast=int)
+# Hold back very recent rows so late-committing writes are not skipped
+SYNC_SAFETY_LAG_SECONDS = config("SYNC_SAFETY_LAG_SECONDS", default=2, cast=float)
+
+
+# ---------------------------------------------------------------------------
+# Resumable chunked uploads
+# ---------------------------------------------------------------------------
+
+# purpose → "Class.method" called with (upload, file) once all bytes arrived
+UPLOAD_HANDLERS = {
+    "document": "apps.records.services.record_service.RecordService.finalize_upload",
+    "triage_image": (
+        "apps.triage.services.triage_service.TriageService.finalize_image_upload"
+    ),
+}
+UPLOAD_MAX_SIZE_BYTES = config(
+    "UPLOAD_MAX_SIZE_BYTES", default=20 * 1024 * 1024, cast=int
+)
+UPLOAD_MAX_CHUNK_BYTES = config(
+    "UPLOAD_MAX_CHUNK_BYTES", default=5 * 1024 * 1024, cast=int
+)
+UPLOAD_EXPIRY_HOURS = config("UPLOAD_EXPIRY_HOURS", default=24, cast=int)
+UPLOAD_TEMP_DIR = config(
+    "UPLOAD_TEMP_DIR", default=str(BASE_DIR / ".cache" / "uploads")
+)
+
+
+# ---------------------------------------------------------------------------
+# Audit log writes
+# ---------------------------------------------------------------------------
+
+# "sync" writes each commit's / request's entries with one bulk insert on
+# the request thread; "async" hands them to a per-process flusher thread
+AUDIT_WRITE_MODE = config("AUDIT_WRITE_MODE", default="sync")
+AUDIT_FLUSH_BATCH_SIZE = config("AUDIT_FLUSH_BATCH_SIZE", default=500, cast=int)
+AUDIT_FLUSH_INTERVAL_SECONDS = config(
+    "AUDIT_FLUSH_INTERVAL_SECONDS", default=1.0, cast=float
+)
+# Batches the flusher may hold before callers write inline instead
+AUDIT_QUEUE_MAX_BATCHES = config("AUDIT_QUEUE_MAX_BATCHES", default=1000, cast=int)
+AUDIT_SHUTDOWN_TIMEOUT_SECONDS = config(
+    "AUDIT_SHUTDOWN_TIMEOUT_SECONDS", default=10, cast=float
+)
+
+# Monthly partitions: created this many months ahead (PostgreSQL) and, once
+# older than AUDIT_RETENTION_MONTHS, exported to gzip JSONL and dropped
+AUDIT_PARTITION_MONTHS_AHEAD = config(
+    "AUDIT_PARTITION_MONTHS_AHEAD", default=3, cast=int
+)
+AUDIT_RETENTION_MONTHS = config("AUDIT_RETENTION_MONTHS", default=12, cast=int)
+AUDIT_ARCHIVE_DIR = config(
+    "AUDIT_ARCHIVE_DIR", default=str(BASE_DIR / "archives" / "audit_logs")
+)
+AUDIT_ARCHIVE_CHUNK_ROWS = config("AUDIT_ARCHIVE_CHUNK_ROWS", default=5000, cast=int)
+# Entries per Merkle checkpoint of the audit hash chain
+AUDIT_CHECKPOINT_INTERVAL = config("AUDIT_CHECKPOINT_INTERVAL", default=1024, cast=int)
+# Rows per server-side cursor fetch (and response chunk) in audit exports
+AUDIT_EXPORT_CHUNK_ROWS = config("AUDIT_EXPORT_CHUNK_ROWS", default=2000, cast=int)
+
+
+# ---------------------------------------------------------------------------
+# Observability
+# ---------------------------------------------------------------------------
+
+# Bearer token for the Prometheus endpoint (GET /metrics); empty disables it
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+# Each gunicorn worker writes its metrics here every
+# METRICS_WRITE_INTERVAL_SECONDS so /metrics sums all workers;
+# empty serves only the worker that answers the scrape
+METRICS_MULTIPROCESS_DIR = config(
+    "METRICS_MULTIPROCESS_DIR", default=str(BASE_DIR / ".cache" / "metrics")
+)
+METRICS_WRITE_INTERVAL_SECONDS = config(
+    "METRICS_WRITE_INTERVAL_SECONDS", default=5, cast=float
+)
+# Share of triage requests whose per-stage timings are stored in
+# TriageResult.timings (stage histograms always cover every request)
+TRACE_SAMPLE_RATE = config("TRACE_SAMPLE_RATE", default=0.05, cast=float)
+
+
+# ---------------------------------------------------------------------------
+# AI inference (Gemini)
+# ---------------------------------------------------------------------------
+
+GEMINI_MODEL = config("GEMINI_MODEL", default="gemini-2.5-flash")
+# "genai" calls Google's API; "stub" returns canned JSON offline (load tests).
+GEMINI_BACKEND = config("GEMINI_BACKEND", default="genai")
+GEMINI_STUB_LATENCY_MS = config("GEMINI_STUB_LATENCY_MS", default=0, cast=int)
+
+# Per-process pool of long-lived clients with keep-alive HTTP connections
+GEMINI_CLIENT_POOL_SIZE = config("GEMINI_CLIENT_POOL_SIZE", default=4, cast=int)
+GEMINI_CLIENT_POOL_TIMEOUT_SECONDS = config(
+    "GEMINI_CLIENT_POOL_TIMEOUT_SECONDS", default=10, cast=float
+)
+GEMINI_HTTP_TIMEOUT_MS = config("GEMINI_HTTP_TIMEOUT_MS", default=30000, cast=int)
+GEMINI_KEEPALIVE_CONNECTIONS = config(
+    "GEMINI_KEEPALIVE_CONNECTIONS", default=10, cast=int
+)
+GEMINI_KEEPALIVE_EXPIRY_SECONDS = config(
+    "GEMINI_KEEPALIVE_EXPIRY_SECONDS", default=120, cast=float
+)
+# Build the pool (and open connections) when a gunicorn worker boots
+GEMINI_WARM_UP = config("GEMINI_WARM_UP", default=True, cast=bool)
+GEMINI_STUB_FAILURE_RATE = config("GEMINI_STUB_FAILURE_RATE", default=0.0, cast=float)
+
+# Per-request time budget, split across retry attempts
+GEMINI_DEADLINE_SECONDS = config("GEMINI_DEADLINE_SECONDS", default=20, cast=float)
+GEMINI_MAX_ATTEMPTS = config("GEMINI_MAX_ATTEMPTS", default=3, cast=int)
+GEMINI_MIN_ATTEMPT_SECONDS = config("GEMINI_MIN_ATTEMPT_SECONDS", default=2, cast=float)
+GEMINI_RETRY_BASE_DELAY_SECONDS = config(
+    "GEMINI_RETRY_BASE_DELAY_SECONDS", default=0.25, cast=float
+)
+GEMINI_RETRY_MAX_DELAY_SECONDS = config(
+    "GEMINI_RETRY_MAX_DELAY_SECONDS", default=2, cast=float
+)
+
+# Circuit breaker (state in the "shared" cache so all workers agree)
+GEMINI_BREAKER_FAILURE_THRESHOLD = config(
+    "GEMINI_BREAKER_FAILURE_THRESHOLD", default=5, cast=int
+)
+GEMINI_BREAKER_RESET_SECONDS = config(
+    "GEMINI_BREAKER_RESET_SECONDS", default=30, cast=float
+)
+
+# Provider quota shared by all workers via the "shared" cache. When the
+# budget is spent: "wait" (up to GEMINI_QUOTA_MAX_WAIT_SECONDS),
+# "downgrade" (to GEMINI_FALLBACK_MODEL) or "fail_fast" (rule-based fallback).
+# A limit of 0 disables that dimension.
+GEMINI_QUOTA_RPM = config("GEMINI_QUOTA_RPM", default=1000, cast=int)
+GEMINI_QUOTA_TPM = config("GEMINI_QUOTA_TPM", default=1_000_000, cast=int)
+GEMINI_QUOTA_POLICY = config("GEMINI_QUOTA_POLICY", default="wait")
+GEMINI_QUOTA_MAX_WAIT_SECONDS = config(
+    "GEMINI_QUOTA_MAX_WAIT_SECONDS", default=5, cast=float
+)
+GEMINI_FALLBACK_MODEL = config(
+    "GEMINI_FALLBACK_MODEL", default="gemini-2.5-flash-lite"
+)
+GEMINI_FALLBACK_QUOTA_RPM = config("GEMINI_FALLBACK_QUOTA_RPM", default=4000, cast=int)
+GEMINI_FALLBACK_QUOTA_TPM = config(
+    "GEMINI_FALLBACK_QUOTA_TPM", default=4_000_000, cast=int
+)
+
+# Bulk triage (inference/batch/): max entries per request and parallel model calls
+TRIAGE_BATCH_MAX_ENTRIES = config("TRIAGE_BATCH_MAX_ENTRIES", default=50, cast=int)
+TRIAGE_BATCH_CONCURRENCY = config("TRIAGE_BATCH_CONCURRENCY", default=4, cast=int)
+# Offline sync (sessions/sync/): max queued sessions flushed per request
+TRIAGE_SYNC_MAX_ITEMS = config("TRIAGE_SYNC_MAX_ITEMS", default=200, cast=int)
+
+# Patient history in triage prompts: BM25-ranked passages packed into a
+# token budget (allergies are always included)
+MEDICAL_CONTEXT_TOKEN_BUDGET = config(
+    "MEDICAL_CONTEXT_TOKEN_BUDGET", default=1500, cast=int
+)
+MEDICAL_CONTEXT_CHUNK_CHARS = config(
+    "MEDICAL_CONTEXT_CHUNK_CHARS", default=800, cast=int
+)
+
+# Clinical guideline grounding: top sections of the WHO IMAI extract per prompt
+CLINICAL_GUIDELINES_PATH = config(
+    "CLINICAL_GUIDELINES_PATH",
+    default=str(BASE_DIR.parent / "docs" / "Clinical_Guidelines.md"),
+)
+GUIDELINE_TOP_K = config("GUIDELINE_TOP_K", default=2, cast=int)
+GUIDELINE_TOKEN_BUDGET = config("GUIDELINE_TOKEN_BUDGET", default=600, cast=int)
+
+# Guideline rule engine: answer clear emergencies without a model call, and
+# raise on-device results the rules consider under-triaged
+TRIAGE_RULE_PRESCREEN = config("TRIAGE_RULE_PRESCREEN", default=True, cast=bool)
+TRIAGE_RULE_ESCALATE_CLIENT_RESULTS = config(
+    "TRIAGE_RULE_ESCALATE_CLIENT_RESULTS", default=True, cast=bool
+)
+
+# Admission control for synchronous / streaming inference (per process):
+# concurrent model calls, queued waiters, and how long each may wait.
+# Waiters block request threads, so at most GUNICORN_THREADS - slots can
+# ever be queued (gunicorn.conf.py reads the same variable)
+GUNICORN_THREADS = config("GUNICORN_THREADS", default=8, cast=int)
+TRIAGE_ADMISSION_SLOTS = config("TRIAGE_ADMISSION_SLOTS", default=4, cast=int)
+TRIAGE_ADMISSION_QUEUE_SIZE = config(
+    "TRIAGE_ADMISSION_QUEUE_SIZE",
+    default=max(GUNICORN_THREADS - TRIAGE_ADMISSION_SLOTS, 0),
+    cast=int,
+)
+TRIAGE_ADMISSION_MAX_WAIT_SECONDS = config(
+    "TRIAGE_ADMISSION_MAX_WAIT_SECONDS", default=15, cast=float
+)
+TRIAGE_ADMISSION_LOW_MAX_WAIT_SECONDS = config(
+    "TRIAGE_ADMISSION_LOW_MAX_WAIT_SECONDS", default=3, cast=float
+)
+TRIAGE_ADMISSION_RETRY_AFTER_SECONDS = config(
+    "TRIAGE_ADMISSION_RETRY_AFTER_SECONDS", default=5, cast=int
+)
+
+
 # ---------------------------------------------------------------------------
 # Internationalization
 # ---------------------------------------------------------------------------
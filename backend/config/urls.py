@@ -5,6 +5,8 @@ URL configuration for Cavista AG.
 from django.contrib import admin
 from django.urls import include, path
 
+from apps.common.api.views import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/auth/", include("apps.users.api.urls")),
@@ -14,4 +16,7 @@ urlpatterns = [
     path("api/v1/xai/", include("apps.xai.api.urls")),
     path("api/v1/records/", include("apps.records.api.urls")),
     path("api/v1/clinicians/", include("apps.clinicians.api.urls")),
+    path("api/v1/sync/", include("apps.sync.api.urls")),
+    path("api/v1/uploads/", include("apps.common.api.urls")),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration.
+
+Gunicorn loads ./gunicorn.conf.py automatically, so this applies to both
+the Docker image and the Render start command (both run from backend/).
+"""
+
+import os
+
+# Threaded workers: requests waiting in the inference admission queue
+# (apps/triage/services/admission.py) must not block a whole worker.
+# The admission queue is sized from the same GUNICORN_THREADS, so queued
+# requests never exceed the threads that can serve them.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+
+def on_starting(server):
+    """Drop metrics written by the previous server's workers."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    from django.conf import settings
+
+    from apps.common.metrics import clear_states
+
+    if settings.METRICS_MULTIPROCESS_DIR:
+        clear_states(settings.METRICS_MULTIPROCESS_DIR)
+
+
+def post_worker_init(worker):
+    """
+    Warm the Gemini client pool and guideline index once Django is loaded,
+    and start writing this worker's metrics for /metrics to aggregate.
+    """
+    from django.conf import settings
+
+    from apps.common.metrics import start_writer
+    from apps.triage.services.gemini_client import GeminiClientPool
+    from apps.triage.services.guideline_index import GuidelineIndex
+
+    # Never inherit sockets from the master if the app was preloaded
+    GeminiClientPool.reset()
+    if settings.GEMINI_WARM_UP:
+        GeminiClientPool.warm_up()
+    GuidelineIndex.load()
+    if settings.METRICS_MULTIPROCESS_DIR:
+        start_writer(
+            settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_WRITE_INTERVAL_SECONDS,
+        )
+
+
+def worker_exit(server, worker):
+    from django.conf import settings
+
+    from apps.audit.services.audit_writer import AuditWriter
+    from apps.common.metrics import write_state
+    from apps.triage.services.gemini_client import GeminiClientPool
+
+    GeminiClientPool.reset()
+    # Write audit entries still queued for the background flusher
+    AuditWriter.flush(settings.AUDIT_SHUTDOWN_TIMEOUT_SECONDS)
+    if settings.METRICS_MULTIPROCESS_DIR:
+        # Final counts; this worker's gauges no longer apply
+        write_state(settings.METRICS_MULTIPROCESS_DIR, include_gauges=False)
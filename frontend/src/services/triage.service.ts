@@ -28,8 +28,11 @@ export interface TriageSessionResponse {
 }
 
 export const triageService = {
-    getSessions: (): Promise<{ data: { results: TriageSessionResponse[] } }> =>
-        api.get("/triage/sessions/"),
+    // Pass the previous page's `next` URL (which carries the cursor) as is
+    getSessions: (
+        next?: string | null
+    ): Promise<{ data: { next: string | null; results: TriageSessionResponse[] } }> =>
+        api.get(next || "/triage/sessions/"),
 
     getSession: (id: string): Promise<{ data: TriageSessionResponse }> =>
         api.get(`/triage/sessions/${id}/`),